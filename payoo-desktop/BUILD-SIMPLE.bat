@@ -86,7 +86,7 @@ pyinstaller --onefile --windowed --name=PayooDesktop ^
     --hidden-import=cryptography ^
     --hidden-import=pandas ^
     --hidden-import=openpyxl ^
-    --hidden-import=matplotlib ^
+    --exclude-module=matplotlib ^
     --hidden-import=numpy ^
     --hidden-import=PIL ^
     --hidden-import=tkinter ^
@@ -0,0 +1,2 @@
+# Benchmarks cho Payoo Desktop
+# Chạy từ thư mục payoo-desktop: python -m benchmarks.<tên_module>
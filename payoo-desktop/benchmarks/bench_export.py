@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark xuất lịch sử/báo cáo thanh toán: thời gian và bộ nhớ đỉnh theo số giao dịch
+
+Chạy: python -m benchmarks.bench_export --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.utils.excel_processor import ExcelProcessor
+
+
+def legacy_export_payment_history(payments: list, file_path: str):
+    """Bản cũ: dict theo từng giao dịch, pd.ExcelWriter và tính lại tổng nhiều lần"""
+    export_data = [{
+        'Mã giao dịch': p.get('transaction_id', ''),
+        'Mã khách hàng': p.get('customer_id', ''),
+        'Tên khách hàng': p.get('customer_name', ''),
+        'Loại hóa đơn': p.get('bill_type', ''),
+        'Nhà cung cấp': p.get('provider', ''),
+        'Số tiền': p.get('amount', 0),
+        'Phương thức': p.get('payment_method', ''),
+        'Trạng thái': p.get('status', ''),
+        'Ngày thanh toán': p.get('payment_date', ''),
+        'Mô tả': p.get('description', '')
+    } for p in payments]
+
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        pd.DataFrame(export_data).to_excel(writer, sheet_name='Payment History', index=False)
+        success = len([p for p in payments if p.get('status') == 'success'])
+        pd.DataFrame({
+            'Thống kê': ['Tổng số giao dịch', 'Tổng số tiền', 'Giao dịch thành công',
+                         'Giao dịch thất bại', 'Tỷ lệ thành công'],
+            'Giá trị': [len(payments), sum([p.get('amount', 0) for p in payments]), success,
+                        len([p for p in payments if p.get('status') == 'failed']),
+                        f"{success / len(payments) * 100:.1f}%"]
+        }).to_excel(writer, sheet_name='Statistics', index=False)
+
+
+def make_payments(count: int, seed: int = 42) -> list:
+    """Tạo danh sách giao dịch giả lập"""
+    rng = random.Random(seed)
+    bill_types = ["electric", "water", "internet", "tv"]
+    methods = ["momo", "zalopay", "visa", "bidv"]
+    return [{
+        "transaction_id": f"TXN{i:08d}",
+        "customer_id": f"PE{rng.randrange(10**9, 10**10)}",
+        "customer_name": f"Khách hàng {i % 1000}",
+        "bill_type": rng.choice(bill_types),
+        "provider": "EVN",
+        "amount": rng.randrange(50_000, 5_000_000),
+        "payment_method": rng.choice(methods),
+        "status": "success" if rng.random() < 0.9 else "failed",
+        "payment_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00",
+        "description": "Thanh toán hóa đơn"
+    } for i in range(count)]
+
+
+def measure(func, *args):
+    """Chạy func, trả về (giây, MB bộ nhớ đỉnh)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export_payment_history/create_payment_report")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="Bỏ qua bản cũ với số giao dịch lớn hơn giá trị này")
+    args = parser.parse_args()
+
+    processor = ExcelProcessor()
+    output_path = os.path.join(tempfile.mkdtemp(), "history.xlsx")
+    print(f"{'Rows':>10}{'legacy (s/MB)':>18}{'export (s/MB)':>18}{'report (s/MB)':>18}{'µs/row':>9}")
+
+    for size in args.sizes:
+        payments = make_payments(size)
+
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy_time, legacy_peak = measure(legacy_export_payment_history, payments, output_path)
+            legacy = f"{legacy_time:.2f}/{legacy_peak:.0f}"
+
+        export_time, export_peak = measure(processor.export_payment_history, payments, output_path)
+
+        report_file = []
+        report_time, report_peak = measure(lambda: report_file.append(processor.create_payment_report(payments)))
+        if report_file and report_file[0].get("file_path"):
+            os.unlink(report_file[0]["file_path"])
+
+        print(f"{size:>10}{legacy:>18}{export_time:>12.2f}/{export_peak:<5.0f}"
+              f"{report_time:>12.2f}/{report_peak:<5.0f}{export_time / size * 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
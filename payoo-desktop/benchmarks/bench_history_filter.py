@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark lọc lịch sử: bản cũ (list comprehension + strptime) so với HistoryIndex
+
+Chạy: python -m benchmarks.bench_history_filter --rows 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.utils.history_index import HistoryIndex
+
+STATUSES = ["success", "failed", "pending"]
+METHODS = ["momo", "bidv", "zalopay", "visa"]
+BILL_TYPES = ["electric", "water", "internet", "tv"]
+
+
+def date_in_range(date_str, start_date, end_date):
+    """Bản cũ của HistoryFrame.date_in_range"""
+    try:
+        date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").date()
+        if start_date and date < datetime.strptime(start_date, "%Y-%m-%d").date():
+            return False
+        if end_date and date > datetime.strptime(end_date, "%Y-%m-%d").date():
+            return False
+        return True
+    except Exception:
+        return True
+
+
+def legacy_filter(history_data, start_date=None, end_date=None, status=None, method=None):
+    """Bản cũ của HistoryFrame.filter_history: copy list rồi lọc tuyến tính từng tiêu chí"""
+    filtered = history_data.copy()
+    if start_date or end_date:
+        filtered = [t for t in filtered if date_in_range(t["payment_date"], start_date, end_date)]
+    if status:
+        filtered = [t for t in filtered if t["status"] == status]
+    if method:
+        filtered = [t for t in filtered if t["payment_method"] == method]
+    return filtered
+
+
+def make_rows(count, seed=42):
+    """Tạo dòng như PaymentStore.changed_since trong 365 ngày gần nhất"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        (i + 1, (now - timedelta(seconds=rng.randrange(365 * 86400))).strftime("%Y-%m-%d %H:%M:%S"),
+         rng.choice(STATUSES), rng.choice(METHODS), float(rng.randrange(50_000, 5_000_000)),
+         f"TX{i + 1:010d}", f"Khách hàng {rng.randrange(count // 10 + 1)}", rng.choice(BILL_TYPES))
+        for i in range(count)
+    ]
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lọc lịch sử giao dịch")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="Không chạy bản cũ (chậm)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    now = datetime.now()
+    week_ago = (now - timedelta(days=7)).strftime("%Y-%m-%d")
+    month_ago = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+    today = now.strftime("%Y-%m-%d")
+
+    index = HistoryIndex()
+    _, build_ms = timed(lambda: index.build(rows))
+    print(f"{args.rows:,} giao dịch, xây index: {build_ms:.0f} ms\n")
+
+    history_data = None
+    if not args.skip_legacy:
+        history_data = [
+            {"id": r[0], "payment_date": r[1], "status": r[2], "payment_method": r[3], "amount": r[4]}
+            for r in rows
+        ]
+
+    # Mỗi bước đổi một control như người dùng thao tác trên HistoryFrame
+    steps = [
+        ("Trạng thái = success", {"status": "success"}),
+        ("+ Phương thức = visa", {"status": "success", "payment_method": "visa"}),
+        ("+ Từ ngày (30 ngày)", {"status": "success", "payment_method": "visa", "start_date": month_ago}),
+        ("Từ ngày -> 7 ngày", {"status": "success", "payment_method": "visa", "start_date": week_ago}),
+        ("+ Đến ngày hôm nay", {"status": "success", "payment_method": "visa", "start_date": week_ago, "end_date": today}),
+        ("Bỏ trạng thái", {"payment_method": "visa", "start_date": week_ago, "end_date": today}),
+        ("Bỏ tất cả", {}),
+    ]
+
+    print(f"{'Bước':<28}{'Khớp':>10}{'bản cũ (ms)':>14}{'index (ms)':>12}")
+    current = {"start_date": None, "end_date": None, "status": None, "payment_method": None}
+    for label, criteria in steps:
+        update = {key: criteria.get(key) for key in current}
+        ids, index_ms = timed(lambda: index.set_filter(**update))
+        current = update
+
+        legacy_ms = "-"
+        if history_data is not None:
+            legacy, elapsed = timed(lambda: legacy_filter(
+                history_data, criteria.get("start_date"), criteria.get("end_date"),
+                criteria.get("status"), criteria.get("payment_method")
+            ))
+            assert sorted(t["id"] for t in legacy) == sorted(ids.tolist()), "Kết quả khác bản cũ"
+            legacy_ms = f"{elapsed:.1f}"
+
+        print(f"{label:<28}{len(ids):>10,}{legacy_ms:>14}{index_ms:>12.2f}")
+
+    _, summary_ms = timed(index.summary, repeat=5)
+    print(f"\nThống kê trên kết quả lọc: {summary_ms:.2f} ms")
+
+    # Sắp xếp toàn bộ kết quả (bấm tiêu đề cột): lần đầu tính hạng của cột, các lần sau dùng lại
+    print(f"\n{'Sắp xếp theo':<28}{'lần đầu (ms)':>14}{'lần sau (ms)':>14}")
+    for column in ("amount", "customer_name", "transaction_id", "status"):
+        _, first_ms = timed(lambda: index.sorted_ids(column))
+        _, again_ms = timed(lambda: index.sorted_ids(column, descending=False), repeat=3)
+        print(f"{column:<28}{first_ms:>14.1f}{again_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark sinh mã đơn hàng: tốc độ và kiểm tra không trùng giữa thread và process
+
+Chạy: python -m benchmarks.bench_order_id --count 1000000 --threads 8 --processes 4
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api.order_id import OrderIdGenerator, get_order_id_generator
+
+
+def legacy_order_id() -> str:
+    """Bản cũ: trùng khi hai đơn được tạo trong cùng một giây"""
+    return f"PAYOO_{int(time.time())}"
+
+
+def measure(name, func, count):
+    start = time.perf_counter()
+    ids = func(count)
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "count": len(ids),
+        "ids_per_second": len(ids) / elapsed,
+        "unique": len(set(ids))
+    }
+
+
+def threaded_ids(generator, count, threads):
+    per_thread = count // threads
+
+    def worker(_):
+        return [generator.next_id("PAYOO") for _ in range(per_thread)]
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return [order_id for ids in executor.map(worker, range(threads)) for order_id in ids]
+
+
+def process_worker(count, kind="next_id"):
+    generator = get_order_id_generator()
+    if kind == "next_numeric_id":
+        return [generator.next_numeric_id() for _ in range(count)]
+    if kind == "next_stan":
+        # STAN chỉ không trùng trong 10.000 mã liên tiếp của mỗi process
+        return [generator.next_stan() for _ in range(min(count, 10_000))]
+    return [generator.next_id("PAYOO") for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark order ID generator")
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    generator = OrderIdGenerator()
+    results = [
+        measure("legacy time()", lambda n: [legacy_order_id() for _ in range(n)], args.count),
+        measure("next_id", lambda n: [generator.next_id("PAYOO") for _ in range(n)], args.count),
+        measure("next_dated_id", lambda n: [generator.next_dated_id() for _ in range(n)], args.count),
+        measure("next_numeric_id", lambda n: [generator.next_numeric_id() for _ in range(n)], args.count),
+        measure("next_ids (batch)", lambda n: generator.next_ids(n, "PAYOO"), args.count),
+        measure(f"next_id x{args.threads} threads", lambda n: threaded_ids(generator, n, args.threads), args.count),
+    ]
+
+    def multi_process(n, kind):
+        per_process = n // args.processes
+        # maxtasksperchild=1: mỗi phần việc chạy trong một process riêng, như các worker CLI song song
+        with multiprocessing.Pool(args.processes, maxtasksperchild=1) as pool:
+            return [order_id for ids in pool.starmap(process_worker, [(per_process, kind)] * args.processes)
+                    for order_id in ids]
+
+    for kind in ("next_id", "next_numeric_id", "next_stan"):
+        results.append(measure(f"{kind} x{args.processes} processes",
+                               lambda n, kind=kind: multi_process(n, kind), args.count))
+
+    print(f"{'Case':<32}{'IDs/s':>14}{'unique':>12}{'dupes':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<32}{result['ids_per_second']:>14,.0f}"
+            f"{result['unique']:>12,}{result['count'] - result['unique']:>10,}"
+        )
+    print(f"Ví dụ: {generator.next_id('PAYOO')}  {generator.next_dated_id()}  {generator.next_numeric_id()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark khởi động ứng dụng: thời gian import (-X importtime) và thời gian tới frame đầu tiên
+
+Mỗi lần đo chạy một process Python mới với HOME tạm (cấu hình mặc định, lịch sử trống) để kết quả
+lặp lại được. Thời gian tính từ lúc tạo process nên gồm cả khởi động interpreter.
+
+- import: `import main` (mọi module được import ở cấp module)
+- first_frame: tạo PayooDesktopApp và vẽ xong cửa sổ (root.update()); cần màn hình và customtkinter
+
+Máy không có customtkinter (CI/server) dùng --placeholder-gui: thay customtkinter/CTkMessagebox bằng
+module rỗng để đo phần import không thuộc GUI (first_frame bị bỏ qua).
+
+Chạy:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10 --top 15
+    python -m benchmarks.bench_startup --placeholder-gui --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module nặng cần kiểm tra có bị import lúc khởi động hay không
+HEAVY_MODULES = [
+    "pandas", "numpy", "openpyxl", "matplotlib", "requests", "urllib3", "asyncio", "PIL",
+    "src.utils.excel_processor", "src.api.bidv_service", "src.api.momo_service",
+    "src.api.zalopay_service", "src.api.visa_service", "src.gui.history_frame", "src.gui.status_frame"
+]
+
+PLACEHOLDER_GUI = """
+import sys, types
+def _placeholder(name):
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: (lambda *args, **kwargs: None)
+    sys.modules[name] = module
+for _name in ("customtkinter", "CTkMessagebox"):
+    try:
+        __import__(_name)
+    except ImportError:
+        _placeholder(_name)
+"""
+
+IMPORT_SCRIPT = """
+import sys, time
+import main
+print(time.time())
+print(" ".join(sorted(sys.modules)))
+"""
+
+FIRST_FRAME_SCRIPT = """
+import sys, time
+import main
+app = main.PayooDesktopApp()
+app.root.update()
+print(time.time())
+print(" ".join(sorted(sys.modules)))
+app.root.destroy()
+"""
+
+
+def run_child(script: str, home: str, placeholder_gui: bool, importtime: bool = False):
+    """Chạy script trong process mới, trả về (giây từ lúc tạo process, module đã import, stderr)"""
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-c", (PLACEHOLDER_GUI if placeholder_gui else "") + script]
+
+    start = time.time()
+    result = subprocess.run(args, cwd=APP_DIR, env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "lỗi không rõ")
+
+    lines = result.stdout.strip().splitlines()
+    return float(lines[-2]) - start, set(lines[-1].split()), result.stderr
+
+
+def parse_importtime(stderr: str):
+    """Đọc output -X importtime: [(tên module, self µs, cumulative µs, độ sâu)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part for part in line.replace("import time:", "|", 1).split("|"))
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def summarize(samples):
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "first": samples[0],
+        "runs": len(samples)
+    }
+
+
+def has_display() -> bool:
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark khởi động Payoo Desktop")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Số module import chậm nhất được in ra")
+    parser.add_argument("--placeholder-gui", action="store_true",
+                        help="Thay customtkinter/CTkMessagebox bằng module rỗng (máy không có GUI)")
+    parser.add_argument("--json", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "placeholder_gui": args.placeholder_gui}
+
+    with tempfile.TemporaryDirectory(prefix="payoo-startup-") as home:
+        # Lần chạy đầu gần với cold start nhất (cache .pyc/ổ đĩa còn lạnh)
+        try:
+            samples = []
+            modules = set()
+            for _ in range(args.repeat):
+                elapsed, modules, _ = run_child(IMPORT_SCRIPT, home, args.placeholder_gui)
+                samples.append(elapsed)
+        except RuntimeError as e:
+            print(f"Không import được main: {e}")
+            print("Máy không có customtkinter thì chạy với --placeholder-gui")
+            sys.exit(1)
+        report["import"] = summarize(samples)
+        report["heavy_modules_loaded"] = [name for name in HEAVY_MODULES if name in modules]
+
+        _, _, stderr = run_child(IMPORT_SCRIPT, home, args.placeholder_gui, importtime=True)
+        rows = parse_importtime(stderr)
+        report["import_total_us"] = next((cumulative for name, _, cumulative, _ in rows if name == "main"), None)
+        report["slowest_imports"] = [
+            {"module": name, "cumulative_us": cumulative}
+            for name, _, cumulative, depth in sorted(rows, key=lambda row: -row[2])
+            if depth <= 1 and name != "main"
+        ][:args.top]
+
+        if args.placeholder_gui or not has_display():
+            report["first_frame"] = None
+        else:
+            try:
+                samples = [run_child(FIRST_FRAME_SCRIPT, home, False)[0] for _ in range(args.repeat)]
+                report["first_frame"] = summarize(samples)
+            except RuntimeError as e:
+                print(f"Không tạo được cửa sổ: {e}")
+                report["first_frame"] = None
+
+    print(f"Python {report['python']}{' (GUI giữ chỗ)' if args.placeholder_gui else ''}")
+    for key, label in (("import", "import main"), ("first_frame", "Tới frame đầu tiên")):
+        stats = report[key]
+        if stats:
+            print(f"{label:<20} median {stats['median'] * 1000:7.0f} ms   min {stats['min'] * 1000:7.0f} ms"
+                  f"   lần đầu {stats['first'] * 1000:7.0f} ms")
+        else:
+            print(f"{label:<20} bỏ qua (không có màn hình/customtkinter)")
+
+    if report["import_total_us"] is not None:
+        print(f"\n-X importtime: main {report['import_total_us'] / 1000:.0f} ms, chậm nhất:")
+    for row in report["slowest_imports"]:
+        print(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+    loaded = report["heavy_modules_loaded"]
+    print(f"\nModule nặng đã import lúc khởi động: {', '.join(loaded) if loaded else 'không có'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
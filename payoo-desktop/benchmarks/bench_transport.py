@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark tầng HTTP: requests.post (mỗi lần một kết nối mới) so với HTTPTransport (keep-alive)
+
+Chạy: python -m benchmarks.bench_transport --requests 2000 --threads 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from src.api.transport import HTTPTransport
+
+
+def run_case(name, send, url, total, threads, server):
+    """Gửi total request với số thread cho trước, trả về kết quả đo"""
+    server.connections = 0
+    payload = '{"billNumber": "PD29007350490"}'
+
+    def worker(_):
+        response = send(url, data=payload, headers={"Content-Type": "application/json"})
+        response.content
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(total)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": name,
+        "requests": total,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "tcp_connections": server.connections,
+        "connections_per_second": server.connections / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark connection pooling")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    server = StubServer().start()
+    # Benchmark chỉ đo tầng kết nối: request không ký nên stub trả 401, không ảnh hưởng kết quả
+    url = f"{server.base_url}/bills/lookup"
+
+    try:
+        baseline = run_case(
+            "requests.post", lambda u, **kw: requests.post(u, timeout=30, **kw),
+            url, args.requests, args.threads, server
+        )
+
+        transport = HTTPTransport(pool_maxsize=args.threads)
+        pooled = run_case(
+            "HTTPTransport", lambda u, **kw: transport.post("bidv", u, **kw),
+            url, args.requests, args.threads, server
+        )
+        transport.close()
+    finally:
+        server.stop()
+
+    print(f"{'Case':<16}{'req/s':>10}{'TCP conns':>12}{'conn/s':>10}")
+    for result in (baseline, pooled):
+        print(
+            f"{result['name']:<16}{result['requests_per_second']:>10.0f}"
+            f"{result['tcp_connections']:>12}{result['connections_per_second']:>10.0f}"
+        )
+    print(f"Tăng tốc: {pooled['requests_per_second'] / baseline['requests_per_second']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
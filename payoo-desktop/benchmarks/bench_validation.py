@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark ExcelProcessor.validate_bill_data: bản duyệt từng dòng (iterrows) so với bản vectorized
+
+Chạy: python -m benchmarks.bench_validation --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.excel_processor import ExcelProcessor
+
+
+def legacy_validate_bill_data(df: pd.DataFrame) -> dict:
+    """Bản cũ dùng df.iterrows(), giữ lại để so sánh kết quả và tốc độ"""
+    validation_result = {"valid": True, "errors": [], "warnings": [], "processed_rows": 0}
+
+    # Đọc số tiền từ ô gốc: iterrows của pandas mới đổi None thành NaN khi tạo Series cho dòng
+    amounts = df['amount'].to_numpy(dtype=object)
+    for position, (index, row) in enumerate(df.iterrows()):
+        row_errors = []
+        if pd.isna(row['customer_id']) or str(row['customer_id']).strip() == '':
+            row_errors.append("Thiếu mã khách hàng")
+        if pd.isna(row['bill_type']) or str(row['bill_type']).strip() == '':
+            row_errors.append("Thiếu loại hóa đơn")
+        try:
+            amount = float(amounts[position])
+            if amount <= 0:
+                row_errors.append("Số tiền phải lớn hơn 0")
+        except (ValueError, TypeError):
+            row_errors.append("Số tiền không hợp lệ")
+
+        if row_errors:
+            validation_result["errors"].append(f"Dòng {index + 2}: {', '.join(row_errors)}")
+        else:
+            validation_result["processed_rows"] += 1
+
+    if validation_result["errors"]:
+        validation_result["valid"] = False
+    return validation_result
+
+
+def make_frame(rows: int, error_rate: float = 0.01, seed: int = 42) -> pd.DataFrame:
+    """Tạo DataFrame giống file EVN, có một tỷ lệ nhỏ dòng lỗi"""
+    rng = np.random.default_rng(seed)
+    customer_ids = np.char.add("PE", rng.integers(10**9, 10**10, rows).astype(str)).astype(object)
+    bill_types = rng.choice(["electric", "water", "internet", "tv"], rows).astype(object)
+    amounts = rng.integers(50_000, 5_000_000, rows).astype(object)
+
+    error_rows = rng.choice(rows, int(rows * error_rate), replace=False)
+    for i, position in enumerate(error_rows):
+        kind = i % 7
+        if kind == 0:
+            customer_ids[position] = None
+        elif kind == 1:
+            bill_types[position] = "   "
+        elif kind == 2:
+            amounts[position] = "abc"
+        elif kind == 3:
+            amounts[position] = -1000
+        elif kind == 4:
+            amounts[position] = None
+        elif kind == 5:
+            amounts[position] = ""
+        else:
+            amounts[position] = "0"
+
+    return pd.DataFrame({"customer_id": customer_ids, "bill_type": bill_types, "amount": amounts})
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validate_bill_data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=1_000_000,
+                        help="Bỏ qua bản cũ với số dòng lớn hơn giá trị này")
+    args = parser.parse_args()
+
+    processor = ExcelProcessor()
+    print(f"{'Rows':>10}{'iterrows (s)':>15}{'vectorized (s)':>17}{'speedup':>10}")
+
+    for size in args.sizes:
+        df = make_frame(size)
+        new_result, new_time = timed(processor.validate_bill_data, df)
+
+        if size <= args.legacy_max:
+            old_result, old_time = timed(legacy_validate_bill_data, df)
+            assert old_result == new_result, "Kết quả validate khác với bản cũ"
+            print(f"{size:>10}{old_time:>15.3f}{new_time:>17.3f}{old_time / new_time:>9.1f}x")
+        else:
+            print(f"{size:>10}{'-':>15}{new_time:>17.3f}{'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Load test tầng service (BIDV/MoMo/ZaloPay/Visa) theo tốc độ đến cố định (open-loop)
+
+Request được lên lịch theo thời điểm dự kiến, không chờ request trước xong; độ trễ tính từ thời
+điểm dự kiến nên thời gian xếp hàng khi client quá tải cũng được tính (tránh coordinated omission).
+
+Chạy với stub tự khởi động (process riêng):
+    python -m benchmarks.loadtest --rate 200 --duration 30 --stub-latency 40
+Chạy với stub/máy chủ có sẵn:
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8099 --rate 500 --mix bidv_lookup=80,momo_create=20
+So sánh với lần chạy trước:
+    python -m benchmarks.loadtest --rate 200 --compare loadtest-20240101-120000.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+
+from benchmarks.stub_server import configure_services
+from src.api.bidv_service import BIDVService
+from src.api.metrics import LatencyHistogram
+from src.api.momo_service import MoMoService
+from src.api.transport import configure_transport
+from src.api.visa_service import VisaService
+from src.api.zalopay_service import ZaloPayService
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_MIX = "bidv_lookup=60,momo_create=10,momo_query=10,zalopay_create=10,zalopay_query=5,visa_push=5"
+REPORT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class ServiceDriver:
+    """Các thao tác load test; mỗi op_<tên> gọi service thật và trả về dict kết quả của service"""
+
+    def __init__(self, base_url: str, bill_pool: int, use_cache: bool):
+        self.bidv = BIDVService()
+        self.momo = MoMoService()
+        self.zalopay = ZaloPayService()
+        self.visa = VisaService()
+        configure_services(base_url, bidv=self.bidv, momo=self.momo, zalopay=self.zalopay, visa=self.visa)
+
+        self.bills = [f"PD{random.Random(i).randint(10 ** 10, 10 ** 11 - 1)}" for i in range(bill_pool)]
+        self.use_cache = use_cache
+        # Mã đơn vừa tạo, dùng cho các thao tác query
+        self.created = {name: collections.deque(maxlen=10000) for name in ("momo", "zalopay", "visa")}
+
+    def operations(self) -> List[str]:
+        return [name[3:] for name in dir(self) if name.startswith("op_")]
+
+    def pick(self, provider: str) -> str:
+        created = self.created[provider]
+        return created[random.randrange(len(created))] if created else "UNKNOWN"
+
+    def op_bidv_lookup(self):
+        return self.bidv.lookup_bill(random.choice(self.bills), use_cache=self.use_cache)
+
+    def op_momo_create(self):
+        result = self.momo.create_payment(random.randint(10, 500) * 1000, "Load test")
+        if result.get("success"):
+            self.created["momo"].append(result["order_id"])
+        return result
+
+    def op_momo_query(self):
+        return self.momo.query_payment(self.pick("momo"))
+
+    def op_zalopay_create(self):
+        result = self.zalopay.create_order(random.randint(10, 500) * 1000, "Load test", {"name": "Load test"})
+        if result.get("success"):
+            self.created["zalopay"].append(result["app_trans_id"])
+        return result
+
+    def op_zalopay_query(self):
+        return self.zalopay.query_order(self.pick("zalopay"))
+
+    def op_zalopay_banks(self):
+        return self.zalopay.get_bank_list()
+
+    def op_visa_push(self):
+        result = self.visa.funds_transfer(random.randint(10, 500) * 1000, "4111111111111111", "Load Test", "HCM")
+        if result.get("success"):
+            self.created["visa"].append(result["transaction_id"])
+        return result
+
+    def op_visa_query(self):
+        return self.visa.query_transaction(self.pick("visa"))
+
+
+class Recorder:
+    """Histogram độ trễ theo thao tác và đếm lỗi (thread-safe)"""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        self.service_time: Dict[str, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        self.success: Dict[str, int] = collections.Counter()
+        self.errors: Dict[str, int] = collections.Counter()
+        self.max_start_lag_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, latency_ms: float, service_ms: float, error: Optional[str]):
+        with self._lock:
+            self.latency[operation].record(latency_ms)
+            self.service_time[operation].record(service_ms)
+            self.max_start_lag_ms = max(self.max_start_lag_ms, latency_ms - service_ms)
+            if error is None:
+                self.success[operation] += 1
+            else:
+                self.errors[f"{operation}: {error}"] += 1
+
+
+def summarize(histogram: LatencyHistogram) -> Dict[str, Any]:
+    result = {
+        "count": histogram.count,
+        "avg": histogram.total / histogram.count if histogram.count else None,
+        "min": histogram.min,
+        "max": histogram.max
+    }
+    for q in REPORT_PERCENTILES:
+        result[f"p{q:g}"] = histogram.percentile(q)
+    return result
+
+
+def parse_mix(mix: str, available: List[str]) -> Tuple[List[str], List[float]]:
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in available:
+            raise SystemExit(f"Thao tác không hợp lệ: {name} (có: {', '.join(available)})")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(args) -> Tuple[subprocess.Popen, str]:
+    """Chạy stub ở process riêng để CPU/bộ nhớ đo được chỉ là của client"""
+    port = free_port()
+    command = [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port),
+               "--latency", str(args.stub_latency), "--error-rate", str(args.stub_error_rate),
+               "--rate-limit", str(args.stub_rate_limit), "--tail-ratio", str(args.stub_tail_ratio)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, cwd=os.path.dirname(os.path.dirname(__file__)))
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            requests.head(base_url, timeout=0.5)
+            return process, base_url
+        except requests.exceptions.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("Không khởi động được stub server")
+
+
+def run(driver: ServiceDriver, names: List[str], weights: List[float], rate: float, duration: float,
+        concurrency: int, poisson: bool, max_queue: int, recorder: Recorder) -> Dict[str, Any]:
+    """Sinh request theo lịch cố định và chờ tất cả xong"""
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+    pending = threading.Semaphore(max_queue)
+    dropped = collections.Counter()
+
+    def execute(operation: str, intended: float):
+        try:
+            started = time.perf_counter()
+            try:
+                result = getattr(driver, f"op_{operation}")()
+                error = None if result.get("success") else str(result.get("message") or result.get("return_message") or "failed")[:80]
+            except Exception as e:
+                error = type(e).__name__
+            finished = time.perf_counter()
+            recorder.record(operation, (finished - intended) * 1000, (finished - started) * 1000, error)
+        finally:
+            pending.release()
+
+    rng = random.Random(42)
+    operations = rng.choices(names, weights, k=int(rate * duration) + 1)
+    start = time.perf_counter()
+    intended = start
+    sent = 0
+    for operation in operations:
+        intended += rng.expovariate(rate) if poisson else 1 / rate
+        if intended - start > duration:
+            break
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if not pending.acquire(blocking=False):
+            # Client không theo kịp: ghi nhận thay vì âm thầm giảm tốc độ gửi
+            dropped[operation] += 1
+            continue
+        executor.submit(execute, operation, intended)
+        sent += 1
+
+    send_seconds = time.perf_counter() - start
+    executor.shutdown(wait=True)
+    return {"sent": sent, "dropped": dict(dropped), "send_seconds": send_seconds,
+            "total_seconds": time.perf_counter() - start}
+
+
+def client_usage() -> Dict[str, Any]:
+    usage = {"cpu_seconds": time.process_time()}
+    if resource is not None:
+        # ru_maxrss: KB trên Linux, byte trên macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        usage["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+    return usage
+
+
+def print_report(report: Dict[str, Any]):
+    summary = report["summary"]
+    print(f"Gửi {summary['sent']} request trong {summary['duration']:.1f}s "
+          f"(mục tiêu {summary['target_rate']:.0f}/s, đạt {summary['achieved_rate']:.1f}/s, "
+          f"thông lượng thành công {summary['throughput']:.1f}/s)")
+    if summary["dropped"]:
+        print(f"Bỏ qua do client quá tải: {summary['dropped']}")
+
+    columns = [f"p{q:g}" for q in REPORT_PERCENTILES]
+    print(f"\n{'Thao tác':<18}{'count':>8}{'ok':>8}" + "".join(f"{c:>10}" for c in columns))
+    for operation, data in report["operations"].items():
+        latency = data["latency"]
+        print(f"{operation:<18}{latency['count']:>8}{data['success']:>8}" +
+              "".join(f"{latency[c]:>10.1f}" if latency[c] is not None else f"{'-':>10}" for c in columns))
+
+    if report["errors"]:
+        print("\nLỗi:")
+        for error, count in sorted(report["errors"].items(), key=lambda item: -item[1])[:15]:
+            print(f"  {count:>7}  {error}")
+
+    client = report["client"]
+    memory = f", RSS tối đa {client['max_rss_mb']:.0f} MB" if "max_rss_mb" in client else ""
+    print(f"\nClient: CPU {client['cpu_seconds']:.1f}s ({client['cpu_percent']:.0f}% một lõi){memory}, "
+          f"trễ lập lịch tối đa {report['summary']['max_start_lag_ms']:.1f} ms")
+
+
+def compare(report: Dict[str, Any], baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if new is not None and old else "-"
+
+    print(f"\nSo với {baseline_path}:")
+    print(f"  thông lượng  {baseline['summary']['throughput']:.1f} -> {report['summary']['throughput']:.1f}/s "
+          f"({change(report['summary']['throughput'], baseline['summary']['throughput'])})")
+    for operation, data in report["operations"].items():
+        old = baseline["operations"].get(operation)
+        if old:
+            print(f"  {operation:<18} p50 {change(data['latency']['p50'], old['latency']['p50']):>8}"
+                  f"  p99 {change(data['latency']['p99'], old['latency']['p99']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test open-loop cho tầng service")
+    parser.add_argument("--base-url", help="URL stub/máy chủ thử nghiệm; bỏ trống để tự chạy stub cục bộ")
+    parser.add_argument("--rate", type=float, default=100, help="Số request/giây")
+    parser.add_argument("--duration", type=float, default=30, help="Số giây gửi request")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Tỷ trọng thao tác, vd. bidv_lookup=80,momo_create=20")
+    parser.add_argument("--poisson", action="store_true", help="Khoảng cách giữa các request theo phân phối mũ")
+    parser.add_argument("--concurrency", type=int, default=256, help="Số thread gửi request tối đa")
+    parser.add_argument("--max-queue", type=int, default=10000, help="Số request chờ tối đa trước khi bỏ qua")
+    parser.add_argument("--retries", type=int, default=None, help="Ghi đè retry_count của transport")
+    parser.add_argument("--bill-pool", type=int, default=1000, help="Số mã hóa đơn khác nhau")
+    parser.add_argument("--use-cache", action="store_true", help="Cho phép tra cứu dùng LookupCache")
+    parser.add_argument("--stub-latency", type=float, default=30)
+    parser.add_argument("--stub-error-rate", type=float, default=0)
+    parser.add_argument("--stub-rate-limit", type=float, default=0)
+    parser.add_argument("--stub-tail-ratio", type=float, default=0)
+    parser.add_argument("--output", help="File JSON kết quả (mặc định loadtest-<thời gian>.json)")
+    parser.add_argument("--compare", help="File JSON của lần chạy trước để so sánh")
+    args = parser.parse_args()
+
+    stub = None
+    base_url = args.base_url
+    if not base_url:
+        stub, base_url = start_stub(args)
+
+    try:
+        configure_transport({"concurrent_requests": args.concurrency, "retry_count": args.retries})
+        driver = ServiceDriver(base_url, args.bill_pool, args.use_cache)
+        names, weights = parse_mix(args.mix, driver.operations())
+
+        recorder = Recorder()
+        cpu_start = time.process_time()
+        result = run(driver, names, weights, args.rate, args.duration, args.concurrency,
+                     args.poisson, args.max_queue, recorder)
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    usage = client_usage()
+    usage["cpu_seconds"] -= cpu_start
+    usage["cpu_percent"] = usage["cpu_seconds"] / result["total_seconds"] * 100
+
+    completed = sum(h.count for h in recorder.latency.values())
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "base_url": base_url,
+        "summary": {
+            "target_rate": args.rate,
+            "sent": result["sent"],
+            "completed": completed,
+            "dropped": result["dropped"],
+            "duration": result["total_seconds"],
+            "achieved_rate": result["sent"] / result["send_seconds"],
+            "throughput": sum(recorder.success.values()) / result["total_seconds"],
+            "error_rate": (completed - sum(recorder.success.values())) / completed * 100 if completed else 0,
+            "max_start_lag_ms": recorder.max_start_lag_ms
+        },
+        "operations": {
+            operation: {
+                "success": recorder.success[operation],
+                "latency": summarize(recorder.latency[operation]),
+                "service_time": summarize(recorder.service_time[operation])
+            }
+            for operation in sorted(recorder.latency)
+        },
+        "errors": dict(recorder.errors),
+        "client": usage
+    }
+
+    overall = LatencyHistogram()
+    for histogram in recorder.latency.values():
+        overall.merge(histogram)
+    report["summary"]["latency"] = summarize(overall)
+
+    print_report(report)
+    if args.compare:
+        compare(report, args.compare)
+
+    output = args.output or f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nĐã lưu kết quả: {output}")
+
+
+if __name__ == "__main__":
+    main()
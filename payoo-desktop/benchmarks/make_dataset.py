@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Sinh bộ dữ liệu giả lập cho benchmark/load test (xem src/utils/synthetic_data.py)
+
+Đuôi file quyết định định dạng: .csv, .xlsx (file upload hóa đơn), .json (file backup lịch sử),
+.db (PaymentStore). Cùng --seed luôn cho cùng dữ liệu.
+
+Chạy:
+    python -m benchmarks.make_dataset bills 1000000 data/bills_1m.csv
+    python -m benchmarks.make_dataset bills 10000 data/bills_errors.xlsx --error-rate 0.01
+    python -m benchmarks.make_dataset payments 2000000 data/payments.db --customers 500000
+"""
+
+import argparse
+import sys
+import time
+
+from src.utils.synthetic_data import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sinh dữ liệu hóa đơn/giao dịch giả lập")
+    parser.add_argument("kind", choices=["bills", "payments"])
+    parser.add_argument("count", type=int)
+    parser.add_argument("path", help="File đích (.csv, .xlsx, .json, .db)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--start-date", default="2024-01-01")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Tỷ lệ dòng lỗi (chỉ với bills)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = generate_dataset(
+        args.kind, args.count, args.path,
+        seed=args.seed, error_rate=args.error_rate,
+        customers=args.customers, start_date=args.start_date, days=args.days
+    )
+    elapsed = time.perf_counter() - start
+
+    print(result["message"])
+    if not result["success"]:
+        sys.exit(1)
+    print(f"{result['file_path']}: {result['rows'] / elapsed:,.0f} dòng/s ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
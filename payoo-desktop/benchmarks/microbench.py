@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark các đường xử lý tốn CPU, so với baseline lưu trong benchmarks/baseline.json
+
+Dữ liệu đầu vào tổng hợp với seed cố định nên kết quả so sánh được giữa các lần chạy.
+Mỗi case được chạy lặp (tự chọn số lần để mỗi lượt >= --min-time) và lấy trung vị của --repeat lượt.
+
+Chạy:
+    python -m benchmarks.microbench                      # chạy và so với baseline
+    python -m benchmarks.microbench --filter excel       # chỉ các case có "excel" trong tên
+    python -m benchmarks.microbench --check              # exit 1 nếu có case chậm hơn ngưỡng
+    python -m benchmarks.microbench --update-baseline    # ghi kết quả làm baseline mới
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Tuple
+
+from benchmarks.bench_export import make_payments
+from benchmarks.bench_validation import make_frame
+from src.api.bidv_service import BIDVService
+from src.api.momo_service import MoMoService
+from src.api.visa_service import VisaService
+from src.api.zalopay_service import ZaloPayService
+from src.utils.excel_processor import ExcelProcessor
+from src.utils.payment_store import PaymentStore
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_THRESHOLD = 1.25
+
+# case: (tên, hàm setup trả về callable cần đo)
+CASES: List[Tuple[str, Callable[[], Callable[[], Any]]]] = []
+
+
+def case(name: str):
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+# ---------- ExcelProcessor ----------
+
+def register_excel_cases(sizes: List[int], workdir: str):
+    processor = ExcelProcessor(max_file_size_mb=1024)
+
+    for size in sizes:
+        def write_bills(size=size):
+            path = os.path.join(workdir, f"bills_{size}.xlsx")
+            if not os.path.exists(path):
+                make_frame(size, error_rate=0).to_excel(path, index=False, engine="openpyxl")
+            return path
+
+        case(f"excel.read_excel_file[{size}]")(
+            lambda write_bills=write_bills: (lambda path=write_bills(): processor.read_excel_file(path)))
+        case(f"excel.validate_bill_data[{size}]")(
+            lambda size=size: (lambda df=make_frame(size): processor.validate_bill_data(df)))
+        case(f"excel.process_bill_upload[{size}]")(
+            lambda write_bills=write_bills: (lambda path=write_bills(): processor.process_bill_upload(path)))
+
+        def export_history(size=size):
+            payments = make_payments(size)
+            path = os.path.join(workdir, "history.xlsx")
+            return lambda: processor.export_payment_history(payments, path)
+
+        def payment_report(size=size):
+            payments = make_payments(size)
+
+            def run():
+                result = processor.create_payment_report(payments)
+                if result.get("file_path"):
+                    os.unlink(result["file_path"])
+            return run
+
+        case(f"excel.export_payment_history[{size}]")(export_history)
+        case(f"excel.create_payment_report[{size}]")(payment_report)
+
+
+# ---------- Chữ ký và kiểm tra thẻ ----------
+
+@case("signature.bidv")
+def bench_bidv_signature():
+    service = BIDVService()
+    service.configure("bench-key", "bench-secret")
+    data = json.dumps({"billNumber": "PD29007350490", "billType": "electric", "provider": "EVN"})
+    return lambda: service.create_signature(data, "1700000000000")
+
+
+@case("signature.momo")
+def bench_momo_signature():
+    service = MoMoService()
+    service.configure("MOMOBENCH", "bench-access", "bench-secret")
+    raw = ("accessKey=bench-access&amount=150000&extraData=&ipnUrl=https://payoo.vn/api/momo/ipn&"
+           "orderId=PAYOO65E1DF75AF4A6907E8&orderInfo=Thanh toán hóa đơn&partnerCode=MOMOBENCH&"
+           "redirectUrl=https://payoo.vn/payment/success&requestId=5f0c2a3e&requestType=captureWallet")
+    return lambda: service.create_signature(raw)
+
+
+@case("signature.zalopay")
+def bench_zalopay_signature():
+    service = ZaloPayService()
+    service.configure("2553", "bench-key1", "bench-key2")
+    raw = '2553|261018_65E1DF75AF4A7907E8|Customer|150000|1700000000000|{"redirecturl": ""}|[{"itemid": "payoo_bill"}]'
+    return lambda: service.create_signature(raw, service.key1)
+
+
+@case("signature.visa_auth_header")
+def bench_visa_auth_header():
+    service = VisaService()
+    service.configure("bench-user", "bench-password")
+    return service.create_auth_header
+
+
+@case("visa.validate_card_number")
+def bench_validate_card_number():
+    service = VisaService()
+    cards = ["4111 1111 1111 1111", "4012-8888-8888-1881", "4222222222222", "5500 0000 0000 0004", "1234"]
+
+    def run():
+        for card in cards:
+            service.validate_card_number(card)
+    return run
+
+
+# ---------- ConfigManager ----------
+
+def config_manager(workdir: str):
+    """ConfigManager ghi vào ~/.payoo: trỏ HOME sang thư mục tạm để không đụng cấu hình thật"""
+    home = os.path.join(workdir, "home")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+    from src.utils.config_manager import ConfigManager
+    return ConfigManager()
+
+
+def register_config_cases(workdir: str):
+    @case("config.get_setting")
+    def bench_get_setting():
+        manager = config_manager(workdir)
+        return lambda: manager.get_setting("performance_settings.cache_size", 100)
+
+    @case("config.set_setting")
+    def bench_set_setting():
+        manager = config_manager(workdir)
+        return lambda: manager.set_setting("api_settings.timeout", 30)
+
+
+# ---------- HistoryFrame (không dựng Tk) ----------
+
+class FakeWidget:
+    """Thay cho CTkEntry/CTkComboBox/CTkLabel: chỉ giữ giá trị"""
+
+    def __init__(self, value: str = ""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def configure(self, **kwargs):
+        self.value = kwargs.get("text", self.value)
+
+
+class FakeTable:
+    """Thay cho VirtualTable: chỉ lấy khối dòng đầu tiên như khi bảng hiển thị"""
+
+    def __init__(self):
+        self.empty_text = ""
+        self.empty_label = FakeWidget()
+
+    def set_source(self, total: int, fetch_rows):
+        self.total = total
+        self.rows = fetch_rows(0, 50) if total else []
+
+
+def load_history_frame_class():
+    """Import HistoryFrame; máy không có customtkinter (CI, worker) thì dùng module giữ chỗ vì
+    benchmark không tạo widget nào"""
+    try:
+        import customtkinter  # noqa: F401
+    except ImportError:
+        sys.modules["customtkinter"] = types.ModuleType("customtkinter")
+    from src.gui.history_frame import HistoryFrame
+    return HistoryFrame
+
+
+def make_history_frame(workdir: str, size: int, use_index: bool):
+    HistoryFrame = load_history_frame_class()
+    store_path = os.path.join(workdir, f"history_{size}.db")
+    fresh = not os.path.exists(store_path)
+    store = PaymentStore(store_path)
+    if fresh:
+        store.add_payments(
+            dict(payment, payment_date=f"{payment['payment_date']}:00") for payment in make_payments(size)
+        )
+
+    frame = HistoryFrame.__new__(HistoryFrame)
+    frame.app = types.SimpleNamespace(payment_store=store)
+    frame.filters = {}
+    frame.sort_column = "payment_date"
+    frame.sort_descending = True
+    frame.history_table = FakeTable()
+    frame.start_date_entry = FakeWidget()
+    frame.end_date_entry = FakeWidget()
+    frame.status_combo = FakeWidget("Tất cả")
+    frame.method_combo = FakeWidget("Tất cả")
+    for name in ("total_count_label", "total_amount_label", "success_rate_label", "expired_count_label", "today_count_label"):
+        setattr(frame, name, FakeWidget())
+
+    from src.utils.history_index import HistoryIndex
+    frame.history_index = HistoryIndex()
+    frame.index_ready = False
+    if use_index:
+        frame.sync_index()
+    return frame
+
+
+# Các bộ lọc được xoay vòng (filter_history bỏ qua khi bộ lọc không đổi)
+HISTORY_FILTERS = [
+    ("2024-03-01", "2024-06-30", "Thành công", "Tất cả"),
+    ("", "", "Tất cả", "MoMo"),
+    ("2024-01-01", "", "Thất bại", "Visa"),
+    ("", "", "Tất cả", "Tất cả"),
+]
+
+
+def register_history_cases(sizes: List[int], workdir: str):
+    for size in sizes:
+        for use_index in (False, True):
+            mode = "index" if use_index else "sqlite"
+
+            def filter_history(size=size, use_index=use_index):
+                frame = make_history_frame(workdir, size, use_index)
+                state = {"next": 0}
+
+                def run():
+                    start, end, status, method = HISTORY_FILTERS[state["next"] % len(HISTORY_FILTERS)]
+                    state["next"] += 1
+                    frame.start_date_entry.set(start)
+                    frame.end_date_entry.set(end)
+                    frame.status_combo.set(status)
+                    frame.method_combo.set(method)
+                    frame.filter_history()
+                return run
+
+            def update_summary(size=size, use_index=use_index):
+                frame = make_history_frame(workdir, size, use_index)
+                frame.filters = {"status": "success"}
+                return frame.update_summary
+
+            case(f"history.filter_history[{size},{mode}]")(filter_history)
+            case(f"history.update_summary[{size},{mode}]")(update_summary)
+
+
+# ---------- Đo và so sánh ----------
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Tự chọn số lần lặp để mỗi lượt >= min_time, trả về thời gian mỗi lần gọi (giây)"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"median": statistics.median(timings), "best": min(timings), "number": number, "repeat": repeat}
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark các đường xử lý tốn CPU")
+    parser.add_argument("--filter", default="*", help="Glob/chuỗi con lọc tên case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Thời gian tối thiểu mỗi lượt (giây)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Tỷ lệ chậm hơn baseline bị coi là regression")
+    parser.add_argument("--check", action="store_true", help="Exit 1 nếu có regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="payoo-bench-")
+    register_excel_cases(args.sizes, workdir)
+    register_config_cases(workdir)
+    register_history_cases(args.sizes, workdir)
+
+    pattern = args.filter if any(c in args.filter for c in "*?[") else f"*{args.filter}*"
+    selected = [(name, setup) for name, setup in CASES if fnmatch.fnmatch(name, pattern)]
+
+    baseline = load_baseline(args.baseline)
+    baseline_cases = baseline.get("cases", {})
+    results = {}
+    regressions = []
+
+    print(f"{'Case':<44}{'median':>12}{'best':>12}{'baseline':>12}{'ratio':>8}")
+    for name, setup in selected:
+        result = measure(setup(), args.repeat, args.min_time)
+        results[name] = result
+
+        old = baseline_cases.get(name)
+        ratio = result["median"] / old["median"] if old else None
+        flag = ""
+        if ratio is not None and ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio is not None and ratio < 1 / args.threshold:
+            flag = "  faster"
+        print(f"{name:<44}{format_time(result['median']):>12}{format_time(result['best']):>12}"
+              f"{format_time(old['median']) if old else '-':>12}"
+              f"{f'{ratio:.2f}x' if ratio else '-':>8}{flag}")
+
+    if args.update_baseline:
+        baseline_cases.update(results)
+        baseline = {
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cases": dict(sorted(baseline_cases.items()))
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"\nĐã cập nhật baseline: {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case chậm hơn baseline quá {args.threshold:.2f}x: {', '.join(regressions)}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if regressions and args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
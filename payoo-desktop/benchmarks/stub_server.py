@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Stub server cục bộ thay cho BIDV/MoMo/ZaloPay/Visa khi benchmark (không gọi API thật)
+
+- Cài đặt đúng các endpoint mà service gọi, mỗi provider một tiền tố: /bidv, /momo, /zalopay, /visa
+- Kiểm tra chữ ký/xác thực như provider thật (sai chữ ký -> lỗi như provider trả về)
+- Giả lập độ trễ (lognormal + đuôi chậm), tỷ lệ lỗi 5xx và throttle 429 theo từng provider
+- Đơn tạo qua /create chuyển sang thành công/thất bại sau complete_after giây (cho /query)
+
+Chạy riêng: python -m benchmarks.stub_server --port 8099 --latency 50 --error-rate 0.01 --rate-limit 200
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.api.status_poller import TokenBucket
+
+DEFAULT_CREDENTIALS = {
+    "bidv": {"api_key": "stub-bidv-key", "api_secret": "stub-bidv-secret"},
+    "momo": {"partner_code": "MOMOSTUB", "access_key": "stub-momo-access", "secret_key": "stub-momo-secret"},
+    "zalopay": {"app_id": "2553", "key1": "stub-zalopay-key1", "key2": "stub-zalopay-key2"},
+    "visa": {"user_id": "stub-visa-user", "password": "stub-visa-password"}
+}
+
+PROVIDERS = ["bidv", "momo", "zalopay", "visa"]
+
+ZALOPAY_BANKS = {
+    "38": [{"bankcode": "VCB", "name": "Vietcombank"}, {"bankcode": "BIDV", "name": "BIDV"},
+           {"bankcode": "VTB", "name": "VietinBank"}, {"bankcode": "TCB", "name": "Techcombank"}],
+    "36": [{"bankcode": "CC", "name": "Visa/Master/JCB"}]
+}
+
+
+class ProviderProfile:
+    """Hành vi giả lập của một provider
+
+    latency_ms là trung vị, sigma là độ lệch của lognormal (0 = cố định); tail_ratio phần request
+    bị chậm thêm tail_ms; error_rate phần request trả 503; rate_limit request/giây trước khi trả 429
+    (0 = không giới hạn); đơn mới hoàn tất sau complete_after giây, fail_ratio phần đơn thất bại.
+    """
+
+    FIELDS = ("latency_ms", "sigma", "tail_ratio", "tail_ms", "error_rate", "rate_limit",
+              "complete_after", "fail_ratio")
+
+    def __init__(self, latency_ms: float = 0, sigma: float = 0.3, tail_ratio: float = 0,
+                 tail_ms: float = 1000, error_rate: float = 0, rate_limit: float = 0,
+                 complete_after: float = 2, fail_ratio: float = 0.05):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.tail_ratio = tail_ratio
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.complete_after = complete_after
+        self.fail_ratio = fail_ratio
+        self._bucket = TokenBucket(rate_limit, max(1, int(rate_limit))) if rate_limit else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProviderProfile":
+        return cls(**{key: value for key, value in data.items() if key in cls.FIELDS})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def sample_latency(self) -> float:
+        """Độ trễ (giây) cho một request"""
+        latency = self.latency_ms
+        if latency and self.sigma:
+            latency *= math.exp(random.gauss(0, self.sigma))
+        if self.tail_ratio and random.random() < self.tail_ratio:
+            latency += self.tail_ms
+        return latency / 1000
+
+    def throttle(self) -> float:
+        """0 nếu được phục vụ, ngược lại số giây client nên chờ (Retry-After)"""
+        if self._bucket is None:
+            return 0
+        with self._lock:
+            return self._bucket.take()
+
+    def inject_error(self) -> bool:
+        return bool(self.error_rate) and random.random() < self.error_rate
+
+
+def hmac_sha256(key: str, data: str) -> str:
+    return hmac.new(key.encode("utf-8"), data.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Định tuyến theo tiền tố provider, hỗ trợ keep-alive (HTTP/1.1)"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    ROUTES = {
+        ("POST", "bidv", "/bills/lookup"): "bidv_lookup",
+        ("POST", "momo", "/create"): "momo_create",
+        ("POST", "momo", "/query"): "momo_query",
+        ("POST", "momo", "/refund"): "momo_refund",
+        ("POST", "zalopay", "/create"): "zalopay_create",
+        ("POST", "zalopay", "/query"): "zalopay_query",
+        ("POST", "zalopay", "/refund"): "zalopay_refund",
+        ("POST", "zalopay", "/quickpay"): "zalopay_quickpay",
+        ("GET", "zalopay", "/getbanklist"): "zalopay_banks",
+        ("POST", "visa", "/pushfundstransactions"): "visa_push",
+        ("POST", "visa", "/pullfundstransactions"): "visa_pull",
+        ("POST", "visa", "/transactionquery"): "visa_query",
+    }
+
+    def setup(self):
+        super().setup()
+        self.server.record_connection()
+
+    def do_HEAD(self):
+        # Probe sức khỏe (HealthChecker) chỉ cần status line
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def dispatch(self, method: str):
+        length = int(self.headers.get("Content-Length", 0))
+        self.body = self.rfile.read(length) if length else b""
+
+        path = urlsplit(self.path).path
+        provider = path.strip("/").split("/", 1)[0]
+        if provider not in PROVIDERS:
+            # Đường dẫn không có tiền tố (benchmark cũ): coi như BIDV
+            provider = "bidv"
+        route = next((handler for (route_method, route_provider, suffix), handler in self.ROUTES.items()
+                      if route_method == method and route_provider == provider and path.endswith(suffix)), None)
+        if route is None:
+            self.server.record(provider, 404)
+            return self.send_json({"message": f"Không có endpoint {method} {path}"}, 404)
+
+        profile = self.server.profile(provider)
+        retry_after = profile.throttle()
+        if retry_after:
+            self.server.record(provider, 429)
+            return self.send_json({"message": "Too Many Requests"}, 429,
+                                  {"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+        time.sleep(profile.sample_latency())
+        if profile.inject_error():
+            self.server.record(provider, 503)
+            return self.send_json({"message": "Service Unavailable"}, 503)
+
+        status, payload = getattr(self, route)(self.server.credentials[provider])
+        self.server.record(provider, status)
+        self.send_json(payload, status)
+
+    # ---------- Đọc request ----------
+
+    def json_body(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            return {}
+
+    def form_body(self) -> Dict[str, str]:
+        return {key: values[0] for key, values in parse_qs(self.body.decode("utf-8"), keep_blank_values=True).items()}
+
+    # ---------- BIDV ----------
+
+    def bidv_lookup(self, creds) -> Tuple[int, Dict[str, Any]]:
+        body = self.body.decode("utf-8")
+        expected = hmac_sha256(creds["api_secret"], f"{body}{self.headers.get('X-Timestamp', '')}{creds['api_key']}")
+        if self.headers.get("Authorization") != f"Bearer {creds['api_key']}" or \
+                not hmac.compare_digest(self.headers.get("X-Signature", ""), expected):
+            return 401, {"message": "Invalid signature"}
+
+        request = self.json_body()
+        bill_number = str(request.get("billNumber", ""))
+        rng = random.Random(bill_number)
+        old_index = rng.randint(1000, 9000)
+        consumption = rng.randint(50, 600)
+        amount = consumption * 2500
+        return 200, {
+            "billNumber": bill_number,
+            "billType": request.get("billType", "electric"),
+            "provider": request.get("provider", "EVN"),
+            "period": time.strftime("%m/%Y"),
+            "dueDate": time.strftime("%Y-%m-28"),
+            "status": "paid" if self.server.is_paid(bill_number) else "unpaid",
+            "oldIndex": old_index,
+            "newIndex": old_index + consumption,
+            "consumption": consumption,
+            "taxes": amount * 0.08,
+            "fees": 0,
+            "amount": amount * 1.08,
+            "description": f"Hóa đơn điện kỳ {time.strftime('%m/%Y')}",
+            "customer": {"id": f"KH{rng.randint(100000, 999999)}", "name": "Khách hàng thử nghiệm",
+                         "address": "TP.HCM", "phone": "0900000000", "email": "stub@payoo.vn"}
+        }
+
+    # ---------- MoMo (lỗi trả HTTP 400 kèm resultCode như tài liệu MoMo) ----------
+
+    def momo_signed(self, creds, request: Dict[str, Any], fields) -> bool:
+        raw = "&".join(f"{field}={request.get(field, '')}" for field in fields)
+        return hmac.compare_digest(str(request.get("signature", "")), hmac_sha256(creds["secret_key"], raw))
+
+    def momo_create(self, creds):
+        request = self.json_body()
+        fields = ("accessKey", "amount", "extraData", "ipnUrl", "orderId", "orderInfo",
+                  "partnerCode", "redirectUrl", "requestId", "requestType")
+        if request.get("partnerCode") != creds["partner_code"] or not self.momo_signed(creds, request, fields):
+            return 400, {"resultCode": 11007, "message": "Chữ ký không hợp lệ"}
+
+        order_id = request["orderId"]
+        if not self.server.create_order("momo", order_id, request.get("amount")):
+            return 400, {"resultCode": 41, "message": "Trùng orderId", "orderId": order_id}
+        return 200, {
+            "partnerCode": creds["partner_code"], "orderId": order_id, "requestId": request["requestId"],
+            "amount": request["amount"], "resultCode": 0, "message": "Thành công.",
+            "payUrl": f"{self.server.base_url}/momo/pay/{order_id}",
+            "deeplink": f"momo://app?orderId={order_id}",
+            "qrCodeUrl": f"2|99|{order_id}"
+        }
+
+    def momo_query(self, creds):
+        request = self.json_body()
+        if not self.momo_signed(creds, request, ("accessKey", "orderId", "partnerCode", "requestId")):
+            return 400, {"resultCode": 11007, "message": "Chữ ký không hợp lệ"}
+
+        order = self.server.order_state("momo", request.get("orderId"))
+        if order is None:
+            return 400, {"resultCode": 42, "message": "Không tìm thấy đơn", "orderId": request.get("orderId")}
+        code = {"pending": 1000, "success": 0, "failed": 1006}[order["status"]]
+        return 200, {"resultCode": code, "message": order["status"], "orderId": order["order_id"],
+                     "amount": order["amount"], "transId": order["trans_id"]}
+
+    def momo_refund(self, creds):
+        request = self.json_body()
+        fields = ("accessKey", "amount", "description", "orderId", "partnerCode", "requestId", "transId")
+        if not self.momo_signed(creds, request, fields):
+            return 400, {"resultCode": 11007, "message": "Chữ ký không hợp lệ"}
+        return 200, {"resultCode": 0, "message": "Thành công.", "orderId": request.get("orderId"),
+                     "refundId": self.server.next_trans_id()}
+
+    # ---------- ZaloPay (luôn HTTP 200, lỗi nằm ở return_code) ----------
+
+    def zalopay_signed(self, creds, request: Dict[str, str], fields) -> bool:
+        raw = "|".join(str(request.get(field, "")) for field in fields)
+        return hmac.compare_digest(request.get("mac", ""), hmac_sha256(creds["key1"], raw))
+
+    def zalopay_create(self, creds):
+        request = self.form_body()
+        fields = ("app_id", "app_trans_id", "app_user", "amount", "app_time", "embed_data", "item")
+        if request.get("app_id") != creds["app_id"] or not self.zalopay_signed(creds, request, fields):
+            return 200, {"return_code": 2, "return_message": "Giao dịch thất bại",
+                         "sub_return_code": -402, "sub_return_message": "Chữ ký không hợp lệ"}
+
+        app_trans_id = request["app_trans_id"]
+        if not self.server.create_order("zalopay", app_trans_id, request.get("amount")):
+            return 200, {"return_code": 2, "return_message": "Giao dịch thất bại",
+                         "sub_return_code": -68, "sub_return_message": "Trùng app_trans_id"}
+        token = hashlib.sha1(app_trans_id.encode("utf-8")).hexdigest()
+        return 200, {"return_code": 1, "return_message": "Giao dịch thành công", "sub_return_code": 1,
+                     "order_url": f"{self.server.base_url}/zalopay/pay/{app_trans_id}",
+                     "zp_trans_token": token, "order_token": token, "qr_code": f"00020101{token}"}
+
+    def zalopay_query(self, creds):
+        request = self.form_body()
+        expected = hmac_sha256(creds["key1"], f"{request.get('app_id')}|{request.get('app_trans_id')}|{creds['key1']}")
+        if not hmac.compare_digest(request.get("mac", ""), expected):
+            return 200, {"return_code": 2, "return_message": "Giao dịch thất bại",
+                         "sub_return_code": -402, "sub_return_message": "Chữ ký không hợp lệ"}
+
+        order = self.server.order_state("zalopay", request.get("app_trans_id"))
+        if order is None:
+            return 200, {"return_code": 2, "return_message": "Không tìm thấy đơn", "sub_return_code": -92,
+                         "is_processing": False}
+        return_code = {"pending": 3, "success": 1, "failed": 2}[order["status"]]
+        return 200, {"return_code": return_code, "return_message": order["status"], "sub_return_code": return_code,
+                     "is_processing": order["status"] == "pending", "amount": order["amount"],
+                     "zp_trans_id": order["trans_id"]}
+
+    def zalopay_refund(self, creds):
+        request = self.form_body()
+        if not self.zalopay_signed(creds, request, ("app_id", "zp_trans_id", "amount", "description", "timestamp")):
+            return 200, {"return_code": 2, "return_message": "Chữ ký không hợp lệ", "sub_return_code": -402}
+        return 200, {"return_code": 3, "return_message": "Đang hoàn tiền", "sub_return_code": 3,
+                     "refund_id": self.server.next_trans_id()}
+
+    def zalopay_quickpay(self, creds):
+        request = self.form_body()
+        if not self.zalopay_signed(creds, request, ("app_id", "app_trans_id", "amount", "payment_code")):
+            return 200, {"return_code": 2, "return_message": "Chữ ký không hợp lệ", "sub_return_code": -402}
+        self.server.create_order("zalopay", request.get("app_trans_id"), request.get("amount"))
+        return 200, {"return_code": 1, "return_message": "Giao dịch thành công", "sub_return_code": 1,
+                     "order_token": hashlib.sha1(request.get("app_trans_id", "").encode("utf-8")).hexdigest()}
+
+    def zalopay_banks(self, creds):
+        return 200, {"return_code": 1, "return_message": "", "banks": ZALOPAY_BANKS}
+
+    # ---------- Visa Direct ----------
+
+    def visa_authorized(self, creds) -> bool:
+        token = base64.b64encode(f"{creds['user_id']}:{creds['password']}".encode()).decode()
+        return hmac.compare_digest(self.headers.get("Authorization", ""), f"Basic {token}")
+
+    def visa_push(self, creds):
+        return self.visa_transfer(creds)
+
+    def visa_pull(self, creds):
+        return self.visa_transfer(creds)
+
+    def visa_transfer(self, creds):
+        if not self.visa_authorized(creds):
+            return 401, {"responseStatus": {"status": 401, "code": "9124", "message": "Expected input credential was not present"}}
+
+        request = self.json_body()
+        transaction_id = str(request.get("transactionIdentifier", ""))
+        stan = str(request.get("systemsTraceAuditNumber", ""))
+        rrn = str(request.get("retrievalReferenceNumber", ""))
+        if not (stan.isdigit() and len(stan) == 6):
+            return 400, {"responseStatus": {"status": 400, "code": "3001", "message": "Invalid systemsTraceAuditNumber"}}
+        if not (rrn.isdigit() and len(rrn) == 12):
+            return 400, {"responseStatus": {"status": 400, "code": "3001", "message": "Invalid retrievalReferenceNumber"}}
+        if not (transaction_id.isdigit() and len(transaction_id) <= 15):
+            return 400, {"responseStatus": {"status": 400, "code": "3001", "message": "Invalid transactionIdentifier"}}
+        if not self.server.create_order("visa", transaction_id, request.get("amount")):
+            return 400, {"responseStatus": {"status": 400, "code": "3002", "message": "Duplicate transactionIdentifier"}}
+        return 200, {"transactionIdentifier": transaction_id, "actionCode": "00", "responseCode": "5",
+                     "approvalCode": f"{random.randint(0, 999999):06d}",
+                     "transmissionDateTime": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    def visa_query(self, creds):
+        if not self.visa_authorized(creds):
+            return 401, {"responseStatus": {"status": 401, "code": "9124", "message": "Expected input credential was not present"}}
+
+        request = self.json_body()
+        order = self.server.order_state("visa", str(request.get("transactionIdentifier", "")))
+        if order is None:
+            return 404, {"responseStatus": {"status": 404, "code": "3004", "message": "Transaction not found"}}
+        status = {"pending": "PENDING", "success": "APPROVED", "failed": "DECLINED"}[order["status"]]
+        return 200, {"transactionStatus": status, "amount": order["amount"], "transactionCurrencyCode": "VND",
+                     "approvalCode": f"{order['trans_id'] % 1000000:06d}" if status == "APPROVED" else None}
+
+    # ---------- Phản hồi ----------
+
+    def send_json(self, payload, status: int = 200, headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server giả lập provider, đếm số kết nối TCP và số response theo (provider, status)"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), handler=StubHandler,
+                 profiles: Dict[str, ProviderProfile] = None, credentials: Dict[str, Dict[str, str]] = None):
+        super().__init__(address, handler)
+        self.connections = 0
+        self.credentials = {provider: dict(values) for provider, values in (credentials or DEFAULT_CREDENTIALS).items()}
+        self.profiles = {provider: ProviderProfile() for provider in PROVIDERS}
+        self.profiles.update(profiles or {})
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.orders: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.paid_bills = set()
+        self._trans_ids = iter(range(240000000, 2 ** 62))
+        self._counter_lock = threading.Lock()
+
+    def record_connection(self):
+        with self._counter_lock:
+            self.connections += 1
+
+    def record(self, provider: str, status: int):
+        with self._counter_lock:
+            key = (provider, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def profile(self, provider: str) -> ProviderProfile:
+        return self.profiles[provider]
+
+    def set_profile(self, provider: str = None, **settings):
+        """Đổi hành vi của một provider (hoặc tất cả nếu provider=None) khi đang chạy"""
+        for name in ([provider] if provider else PROVIDERS):
+            self.profiles[name] = ProviderProfile.from_dict(dict(self.profiles[name].to_dict(), **settings))
+
+    def next_trans_id(self) -> int:
+        with self._counter_lock:
+            return next(self._trans_ids)
+
+    def create_order(self, provider: str, order_id: str, amount) -> bool:
+        """Ghi nhận đơn mới; False nếu mã đơn đã tồn tại (provider thật từ chối mã trùng)"""
+        profile = self.profile(provider)
+        with self._counter_lock:
+            if (provider, order_id) in self.orders:
+                return False
+            self.orders[(provider, order_id)] = {
+                "order_id": order_id,
+                "amount": int(float(amount or 0)),
+                "trans_id": next(self._trans_ids),
+                "done_at": time.monotonic() + profile.complete_after,
+                "final": "failed" if random.random() < profile.fail_ratio else "success"
+            }
+        return True
+
+    def order_state(self, provider: str, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._counter_lock:
+            order = self.orders.get((provider, order_id))
+        if order is None:
+            return None
+        status = order["final"] if time.monotonic() >= order["done_at"] else "pending"
+        return dict(order, status=status)
+
+    def is_paid(self, bill_number: str) -> bool:
+        return bill_number in self.paid_bills
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            return {
+                "connections": self.connections,
+                "orders": len(self.orders),
+                "responses": {f"{provider} {status}": count for (provider, status), count in sorted(self.responses.items())}
+            }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure_services(self, bidv=None, momo=None, zalopay=None, visa=None):
+        """Trỏ service của ứng dụng vào stub với thông tin xác thực của stub"""
+        configure_services(self.base_url, self.credentials, bidv, momo, zalopay, visa)
+
+    def start(self) -> "StubServer":
+        """Chạy server trong thread nền"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def configure_services(base_url: str, credentials: Dict[str, Dict[str, str]] = None,
+                       bidv=None, momo=None, zalopay=None, visa=None):
+    """Trỏ service vào một stub server (có thể chạy ở máy/process khác) theo bố cục tiền tố provider"""
+    credentials = credentials or DEFAULT_CREDENTIALS
+    base_url = base_url.rstrip("/")
+    if bidv is not None:
+        bidv.configure(**credentials["bidv"], api_url=f"{base_url}/bidv")
+    if momo is not None:
+        momo.configure(**credentials["momo"])
+        momo.endpoint = f"{base_url}/momo/v2/gateway/api"
+    if zalopay is not None:
+        zalopay.configure(**credentials["zalopay"])
+        zalopay.endpoint = f"{base_url}/zalopay/v2"
+    if visa is not None:
+        visa.configure(**credentials["visa"])
+        visa.sandbox_url = f"{base_url}/visa"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub server giả lập BIDV/MoMo/ZaloPay/Visa")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0, help="Độ trễ trung vị (ms)")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Độ lệch lognormal của độ trễ")
+    parser.add_argument("--tail-ratio", type=float, default=0, help="Phần request bị chậm thêm --tail-ms")
+    parser.add_argument("--tail-ms", type=float, default=1000)
+    parser.add_argument("--error-rate", type=float, default=0, help="Phần request trả 503")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Request/giây mỗi provider trước khi trả 429")
+    parser.add_argument("--complete-after", type=float, default=2, help="Số giây trước khi đơn hoàn tất")
+    parser.add_argument("--profiles", help='JSON theo provider, vd. {"bidv": {"latency_ms": 200}}')
+    args = parser.parse_args()
+
+    base = ProviderProfile(args.latency, args.sigma, args.tail_ratio, args.tail_ms, args.error_rate,
+                           args.rate_limit, args.complete_after).to_dict()
+    overrides = json.loads(args.profiles) if args.profiles else {}
+    profiles = {provider: ProviderProfile.from_dict(dict(base, **overrides.get(provider, {}))) for provider in PROVIDERS}
+
+    server = StubServer((args.host, args.port), profiles=profiles)
+    print(f"Stub server: {server.base_url}")
+    print(json.dumps(server.credentials, indent=2))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2, ensure_ascii=False))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -59,7 +59,6 @@ a = Analysis(
         'cryptography',
         'pandas',
         'openpyxl',
-        'matplotlib',
         'numpy',
         'PIL',
         'tkinter',
@@ -70,7 +69,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['matplotlib'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -125,7 +124,7 @@ exe = EXE(
             "--hidden-import=cryptography",
             "--hidden-import=pandas",
             "--hidden-import=openpyxl",
-            "--hidden-import=matplotlib",
+            "--exclude-module=matplotlib",
             "--hidden-import=numpy",
             "--hidden-import=PIL",
             "--hidden-import=tkinter",
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Payoo Desktop - Chạy tác vụ hàng loạt không cần giao diện
+
+Không import tkinter/customtkinter nên chạy được trên server không có màn hình (cron, CI).
+Dùng chung cấu hình ~/.payoo (config.json, thông tin API đã lưu, payments.db) với ứng dụng.
+
+Tiến độ và kết quả in ra stdout dạng JSON Lines, mỗi dòng một sự kiện:
+    {"event": "progress", "command": "lookup", "processed": 1200, "total": 5000, ...}
+    {"event": "result", "command": "lookup", "success": true, ...}
+
+Mã thoát: 0 thành công, 1 lỗi, 2 sai tham số, 3 hoàn tất nhưng có dòng lỗi/thất bại
+
+Chạy:
+    python cli.py lookup hoa_don.xlsx ket_qua.xlsx
+    python cli.py pay hoa_don.xlsx thanh_toan.xlsx --method momo
+    python cli.py report --start-date 2024-01-01 --end-date 2024-01-31 --output bao_cao.xlsx
+    python cli.py export lich_su.xlsx --status success --method visa
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, Any, List
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+
+PAYMENT_METHODS = ["momo", "zalopay", "visa"]
+
+PAY_OUTPUT_COLUMNS = [
+    'row_number', 'customer_id', 'bill_type', 'amount', 'provider', 'payment_method',
+    'status', 'order_id', 'pay_url', 'message'
+]
+
+
+def emit(event: str, command: str, **data):
+    """In một sự kiện JSON trên một dòng (flush ngay để tiến trình cha đọc được)"""
+    print(json.dumps(dict(event=event, command=command, **data), ensure_ascii=False, default=str), flush=True)
+
+
+class BatchContext:
+    """Cấu hình và service dùng chung cho một lần chạy, service chỉ được tạo khi command cần tới"""
+
+    def __init__(self, config_manager=None, db_path: str = None):
+        from src.utils.config_manager import ConfigManager
+
+        self.config_manager = config_manager or ConfigManager()
+        self.db_path = db_path
+
+    def setting(self, key: str, default: Any = None) -> Any:
+        return self.config_manager.get_setting(key, default)
+
+    def _transport(self):
+        from src.api.transport import configure_transport
+        return configure_transport(self.setting("api_settings", {}))
+
+    @cached_property
+    def excel_processor(self):
+        from src.utils.excel_processor import ExcelProcessor
+        return ExcelProcessor(
+            max_file_size_mb=self.setting("performance_settings.max_upload_size_mb", 10),
+            max_stream_file_size_mb=self.setting("performance_settings.max_stream_upload_size_mb", 1024)
+        )
+
+    @cached_property
+    def payment_store(self):
+        from src.utils.payment_store import PaymentStore
+        return PaymentStore(self.db_path)
+
+    @cached_property
+    def bidv_service(self):
+        from src.api.bidv_service import BIDVService
+        service = BIDVService(self._transport())
+        config = self.config_manager.get_api_config("bidv")
+        if config:
+            service.configure(
+                api_key=config.get("api_key", ""),
+                api_secret=config.get("api_secret", ""),
+                api_url=config.get("api_url", "")
+            )
+        self._configure_lookup_cache(service.cache)
+        return service
+
+    def _configure_lookup_cache(self, cache):
+        """Cùng cache trên đĩa với ứng dụng: tra cứu dùng lại kết quả, thanh toán xóa entry cũ"""
+        from src.api.disk_cache import DiskCache
+
+        disk_mb = self.setting("performance_settings.disk_cache_size", 50)
+        if disk_mb:
+            try:
+                cache.disk = DiskCache(
+                    os.path.join(self.config_manager.config_dir, "lookup_cache.db"),
+                    self.config_manager.encryption_key
+                )
+            except Exception as e:
+                print(f"Lỗi khởi tạo cache trên đĩa: {e}", file=sys.stderr)
+        cache.configure(
+            enabled=self.setting("performance_settings.enable_cache", True),
+            max_bytes=self.setting("performance_settings.cache_size", 100) * 1024 * 1024,
+            disk_max_bytes=disk_mb * 1024 * 1024 if disk_mb else None
+        )
+
+    @cached_property
+    def momo_service(self):
+        from src.api.momo_service import MoMoService
+        service = MoMoService(self._transport())
+        config = self.config_manager.get_api_config("momo")
+        if config:
+            service.configure(
+                partner_code=config.get("partner_code", ""),
+                access_key=config.get("access_key", ""),
+                secret_key=config.get("secret_key", ""),
+                sandbox=config.get("sandbox", True)
+            )
+        return service
+
+    @cached_property
+    def zalopay_service(self):
+        from src.api.zalopay_service import ZaloPayService
+        service = ZaloPayService(self._transport())
+        config = self.config_manager.get_api_config("zalopay")
+        if config:
+            service.configure(
+                app_id=config.get("app_id", ""),
+                key1=config.get("key1", ""),
+                key2=config.get("key2", ""),
+                sandbox=config.get("sandbox", True)
+            )
+        return service
+
+    @cached_property
+    def visa_service(self):
+        from src.api.visa_service import VisaService
+        service = VisaService(self._transport())
+        config = self.config_manager.get_api_config("visa")
+        if config:
+            service.configure(
+                user_id=config.get("user_id", ""),
+                password=config.get("password", ""),
+                cert_path=config.get("cert_path", ""),
+                key_path=config.get("key_path", ""),
+                sandbox=config.get("sandbox", True)
+            )
+        return service
+
+
+class Progress:
+    """Phát sự kiện progress tối đa mỗi interval giây"""
+
+    def __init__(self, command: str, interval: float, total: int = None):
+        self.command = command
+        self.interval = interval
+        self.total = total
+        self.start_time = time.monotonic()
+        self.last_report = 0.0
+
+    def update(self, processed: int, force: bool = False, **counts):
+        now = time.monotonic()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+
+        elapsed = now - self.start_time
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = max(self.total - processed, 0) / rate if self.total and rate > 0 else None
+        emit("progress", self.command, processed=processed, total=self.total, rate=round(rate, 1),
+             elapsed=round(elapsed, 2), eta=round(eta, 1) if eta is not None else None, **counts)
+
+
+def open_upload(ctx: BatchContext, input_path: str) -> Dict[str, Any]:
+    """Kiểm tra và mở file hóa đơn ở chế độ stream (giống tra cứu hàng loạt trên giao diện)"""
+    excel_processor = ctx.excel_processor
+    file_check = excel_processor.validate_file_format(input_path, streaming=True)
+    if not file_check["valid"]:
+        return {"success": False, "message": file_check["message"]}
+
+    return excel_processor.process_bill_upload(
+        input_path,
+        stream=True,
+        batch_size=ctx.setting("performance_settings.upload_batch_size", 5000)
+    )
+
+
+def finish(command: str, result: Dict[str, Any], partial: bool = False) -> int:
+    emit("result", command, **result)
+    if not result.get("success"):
+        return EXIT_ERROR
+    return EXIT_PARTIAL if partial else EXIT_OK
+
+
+def cmd_lookup(ctx: BatchContext, args) -> int:
+    """Tra cứu hàng loạt hóa đơn qua BIDV, ghi kết quả ra .xlsx"""
+    from src.utils.bulk_lookup import BulkLookupPipeline
+
+    upload = open_upload(ctx, args.input)
+    if not upload["success"]:
+        return finish("lookup", upload)
+
+    pipeline = BulkLookupPipeline(
+        ctx.bidv_service,
+        concurrency=args.concurrency or ctx.setting("api_settings.concurrent_requests", 5),
+        progress_callback=lambda progress: emit("progress", "lookup", **progress),
+        progress_interval=args.progress_interval
+    )
+    bills = (bill for batch in upload["batches"] for bill in batch)
+    result = pipeline.run(bills, args.output, total=upload["estimated_rows"])
+
+    result["skipped_rows"] = len(upload["errors"])
+    result["row_errors"] = upload["errors"][:args.max_errors]
+    return finish("lookup", result, partial=bool(result.get("failed") or upload["errors"]))
+
+
+def pay_bill(ctx: BatchContext, method: str, bill: Dict[str, Any], card: Dict[str, str]) -> Dict[str, Any]:
+    """Tạo thanh toán cho một hóa đơn, trả về bản ghi PaymentStore"""
+    amount = bill["amount"]
+    description = f"Thanh toán hóa đơn {bill['customer_id']}"
+    try:
+        if method == "momo":
+            result = ctx.momo_service.create_payment(
+                amount=int(amount),
+                order_info=description,
+                extra_data=json.dumps({"customer_id": bill["customer_id"]})
+            )
+        elif method == "zalopay":
+            result = ctx.zalopay_service.create_order(amount=int(amount), description=description)
+            if result.get("success"):
+                result["pay_url"] = result.get("order_url")
+        else:
+            result = ctx.visa_service.funds_transfer(
+                amount=float(amount),
+                card_number=card["number"],
+                recipient_name=card["holder"],
+                recipient_address="",
+                currency="VND"
+            )
+    except Exception as e:
+        result = {"success": False, "message": f"Lỗi {method}: {str(e)}"}
+
+    order_id = result.get("order_id") or result.get("app_trans_id") or result.get("transaction_id") or ""
+    # Ví/cổng thanh toán (có pay_url) chỉ hoàn tất khi khách xác nhận; ứng dụng theo dõi tiếp khi mở lên.
+    # Cùng quy tắc với GUI: không có mã đơn thì không theo dõi được nên không để pending
+    if not result.get("success"):
+        status = "failed"
+    elif result.get("pay_url") and order_id:
+        status = "pending"
+    else:
+        status = "success"
+
+    return {
+        "transaction_id": order_id or None,
+        "order_id": order_id,
+        "customer_id": bill["customer_id"],
+        "bill_number": str(bill.get("bill_number") or ""),
+        "bill_type": bill["bill_type"],
+        "provider": bill["provider"],
+        "amount": amount,
+        "payment_method": method,
+        "status": status,
+        "payment_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "description": result.get("message", ""),
+        "pay_url": result.get("pay_url") or "",
+        "row_number": bill["row_number"]
+    }
+
+
+def cmd_pay(ctx: BatchContext, args) -> int:
+    """Tạo thanh toán hàng loạt, lưu vào lịch sử và ghi kết quả ra .xlsx"""
+    from openpyxl import Workbook
+
+    card = {"number": (args.card_number or "").strip(), "holder": (args.card_holder or "").strip()}
+    if args.method == "visa":
+        if not card["number"] or not card["holder"]:
+            return finish("pay", {"success": False, "message": "Thanh toán Visa cần --card-number và --card-holder"})
+        card_check = ctx.visa_service.validate_card_number(card["number"])
+        if not card_check.get("valid"):
+            return finish("pay", {"success": False, "message": card_check.get("message", "Số thẻ không hợp lệ")})
+
+    upload = open_upload(ctx, args.input)
+    if not upload["success"]:
+        return finish("pay", upload)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Payment Results')
+    sheet.append(PAY_OUTPUT_COLUMNS)
+
+    counts = {"paid": 0, "pending": 0, "failed": 0}
+    progress = Progress("pay", args.progress_interval, upload["estimated_rows"])
+    concurrency = args.concurrency or ctx.setting("api_settings.concurrent_requests", 5)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for batch in upload["batches"]:
+                records = list(executor.map(lambda bill: pay_bill(ctx, args.method, bill, card), batch))
+                ctx.payment_store.add_payments(records)
+
+                for record in records:
+                    sheet.append([record.get(column, "") for column in PAY_OUTPUT_COLUMNS])
+                    counts["paid" if record["status"] == "success" else record["status"]] += 1
+                    # Hóa đơn đã/sắp được thanh toán: lần tra cứu sau (theo mã hóa đơn hoặc mã khách hàng)
+                    # phải lấy dữ liệu mới
+                    if record["status"] != "failed":
+                        for key in (record["bill_number"], record["customer_id"]):
+                            if key:
+                                ctx.bidv_service.cache.invalidate(key)
+                progress.update(sum(counts.values()), **counts)
+
+        workbook.save(args.output)
+    except Exception as e:
+        return finish("pay", {"success": False, "message": f"Lỗi thanh toán hàng loạt: {str(e)}", **counts})
+
+    total = sum(counts.values())
+    progress.total = total
+    progress.update(total, force=True, **counts)
+    return finish("pay", {
+        "success": True,
+        "file_path": args.output,
+        "processed": total,
+        **counts,
+        "skipped_rows": len(upload["errors"]),
+        "row_errors": upload["errors"][:args.max_errors],
+        "elapsed": round(time.monotonic() - progress.start_time, 2),
+        "message": f"Đã tạo {total} thanh toán ({counts['paid']} thành công, "
+                   f"{counts['pending']} chờ xác nhận, {counts['failed']} thất bại)"
+    }, partial=bool(counts["failed"] or upload["errors"]))
+
+
+def history_filters(args) -> Dict[str, Any]:
+    return {
+        "start_date": args.start_date,
+        "end_date": args.end_date,
+        "status": args.status,
+        "payment_method": args.method
+    }
+
+
+def cmd_report(ctx: BatchContext, args) -> int:
+    """Tạo báo cáo thanh toán từ lịch sử"""
+    payments = ctx.payment_store.iter_payments(newest_first=True, **history_filters(args))
+    result = ctx.excel_processor.create_payment_report(payments, start_date=args.start_date, end_date=args.end_date)
+    if result["success"] and args.output:
+        shutil.move(result["file_path"], args.output)
+        result["file_path"] = args.output
+    return finish("report", result)
+
+
+def cmd_export(ctx: BatchContext, args) -> int:
+    """Xuất lịch sử thanh toán ra Excel"""
+    payments = ctx.payment_store.iter_payments(newest_first=True, **history_filters(args))
+    return finish("export", ctx.excel_processor.export_payment_history(payments, args.output))
+
+
+def date_arg(value: str) -> str:
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ngày không hợp lệ (yyyy-mm-dd): {value}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Payoo Desktop - tác vụ hàng loạt không cần giao diện")
+    parser.add_argument("--db", help="File lịch sử giao dịch (mặc định ~/.payoo/payments.db)")
+    parser.add_argument("--progress-interval", type=float, default=1.0, help="Giây giữa hai sự kiện progress")
+    parser.add_argument("--max-errors", type=int, default=20, help="Số dòng lỗi tối đa in trong kết quả")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    lookup = commands.add_parser("lookup", help="Tra cứu hàng loạt hóa đơn từ file Excel/CSV")
+    lookup.add_argument("input")
+    lookup.add_argument("output", help="File kết quả .xlsx")
+    lookup.add_argument("--concurrency", type=int, help="Số request đồng thời (mặc định theo cấu hình)")
+    lookup.set_defaults(handler=cmd_lookup)
+
+    pay = commands.add_parser("pay", help="Thanh toán hàng loạt hóa đơn từ file Excel/CSV")
+    pay.add_argument("input")
+    pay.add_argument("output", help="File kết quả .xlsx")
+    pay.add_argument("--method", choices=PAYMENT_METHODS, required=True)
+    pay.add_argument("--card-number", help="Số thẻ nhận (Visa)")
+    pay.add_argument("--card-holder", help="Tên chủ thẻ (Visa)")
+    pay.add_argument("--concurrency", type=int, help="Số request đồng thời (mặc định theo cấu hình)")
+    pay.set_defaults(handler=cmd_pay)
+
+    for name, handler, help_text in (("report", cmd_report, "Tạo báo cáo thanh toán"),
+                                     ("export", cmd_export, "Xuất lịch sử thanh toán ra Excel")):
+        sub = commands.add_parser(name, help=help_text)
+        if name == "export":
+            sub.add_argument("output", help="File .xlsx")
+        else:
+            sub.add_argument("--output", help="File .xlsx (mặc định file tạm)")
+        sub.add_argument("--start-date", type=date_arg)
+        sub.add_argument("--end-date", type=date_arg)
+        sub.add_argument("--status", choices=["success", "failed", "pending", "expired"])
+        sub.add_argument("--method", choices=["momo", "bidv", "zalopay", "visa"])
+        sub.set_defaults(handler=handler)
+
+    return parser
+
+
+def main(argv: List[str] = None, ctx: BatchContext = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        ctx = ctx or BatchContext(db_path=args.db)
+        return args.handler(ctx, args)
+    except KeyboardInterrupt:
+        return finish(args.command, {"success": False, "message": "Đã hủy"})
+    except Exception as e:
+        return finish(args.command, {"success": False, "message": f"Lỗi: {str(e)}"})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
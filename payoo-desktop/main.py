@@ -1,27 +1,38 @@
 import os
 import sys
+import importlib
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import customtkinter as ctk
-from CTkMessagebox import CTkMessagebox
 import json
 import threading
-from datetime import datetime
+from datetime import datetime, timedelta
 import webbrowser
 
-# Import các modules của ứng dụng
-from src.api.bidv_service import BIDVService
-from src.api.momo_service import MoMoService
-from src.api.visa_service import VisaService
-from src.api.zalopay_service import ZaloPayService
-from src.gui.bill_lookup_frame import BillLookupFrame
-from src.gui.payment_frame import PaymentFrame
-from src.gui.history_frame import HistoryFrame
-from src.gui.settings_frame import SettingsFrame
-from src.gui.admin_frame import AdminFrame
-from src.gui.status_frame import StatusFrame
+# Import các modules của ứng dụng; service API (requests), ExcelProcessor (pandas) và các frame
+# được import khi dùng lần đầu để cửa sổ hiện lên nhanh
+from src.api.catalog import CatalogService
+from src.api.status_poller import PaymentStatusPoller, classify_momo, classify_zalopay, classify_visa
 from src.utils.config_manager import ConfigManager
-from src.utils.excel_processor import ExcelProcessor
+from src.utils.payment_store import PaymentStore
+
+# Service API: thuộc tính -> (module, class)
+SERVICES = {
+    "bidv_service": ("src.api.bidv_service", "BIDVService"),
+    "momo_service": ("src.api.momo_service", "MoMoService"),
+    "visa_service": ("src.api.visa_service", "VisaService"),
+    "zalopay_service": ("src.api.zalopay_service", "ZaloPayService")
+}
+
+# Các tab chính: tên tab -> (thuộc tính, module, class); nội dung tab được tạo khi mở lần đầu
+TABS = {
+    "🔍 Tra cứu hóa đơn": ("bill_lookup_frame", "src.gui.bill_lookup_frame", "BillLookupFrame"),
+    "💳 Thanh toán": ("payment_frame", "src.gui.payment_frame", "PaymentFrame"),
+    "📋 Lịch sử": ("history_frame", "src.gui.history_frame", "HistoryFrame"),
+    "📊 Trạng thái API": ("status_frame", "src.gui.status_frame", "StatusFrame"),
+    "⚙️ Quản trị": ("admin_frame", "src.gui.admin_frame", "AdminFrame"),
+    "🔧 Cài đặt": ("settings_frame", "src.gui.settings_frame", "SettingsFrame")
+}
 
 # Cấu hình CustomTkinter
 ctk.set_appearance_mode("light")
@@ -41,7 +52,8 @@ class PayooDesktopApp:
         
         # Khởi tạo services
         self.config_manager = ConfigManager()
-        self.excel_processor = ExcelProcessor()
+        self._excel_processor = None
+        self.payment_store = PaymentStore()
         self.init_services()
         
         # Tạo giao diện
@@ -50,16 +62,161 @@ class PayooDesktopApp:
         # Tải cấu hình
         self.load_config()
         
+        # Việc nền (làm mới danh mục, theo dõi giao dịch chờ) chạy sau khi cửa sổ đã hiện
+        self.root.after(200, self.start_background_tasks)
+    
+    @property
+    def excel_processor(self):
+        """ExcelProcessor (kéo theo pandas) chỉ được tạo ở thao tác Excel đầu tiên"""
+        if self._excel_processor is None:
+            from src.utils.excel_processor import ExcelProcessor
+            self._excel_processor = ExcelProcessor(
+                max_file_size_mb=self.config_manager.get_setting("performance_settings.max_upload_size_mb", 10),
+                max_stream_file_size_mb=self.config_manager.get_setting("performance_settings.max_stream_upload_size_mb", 1024)
+            )
+        return self._excel_processor
+    
+    @property
+    def bidv_service(self):
+        return self.get_service("bidv_service")
+    
+    @property
+    def momo_service(self):
+        return self.get_service("momo_service")
+    
+    @property
+    def visa_service(self):
+        return self.get_service("visa_service")
+    
+    @property
+    def zalopay_service(self):
+        return self.get_service("zalopay_service")
+    
+    def get_service(self, name):
+        """Lấy service API; lần đầu mới import module và khởi tạo (gọi được từ nhiều thread)"""
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        
+        with self._services_lock:
+            service = self._services.get(name)
+            if service is None:
+                if not self._services:
+                    # Transport dùng chung (keep-alive, timeout theo api_settings)
+                    from src.api.transport import configure_transport
+                    configure_transport(self.config_manager.get_setting("api_settings", {}))
+                
+                module_name, class_name = SERVICES[name]
+                service = getattr(importlib.import_module(module_name), class_name)()
+                if name == "bidv_service":
+                    self.configure_lookup_cache(service.cache)
+                self._services[name] = service
+        return service
+        
     def init_services(self):
-        """Khởi tạo các service API"""
+        """Khởi tạo danh mục và bộ theo dõi giao dịch (service API được tạo khi dùng lần đầu)"""
+        self._services = {}
+        self._services_lock = threading.RLock()
         try:
-            self.bidv_service = BIDVService()
-            self.momo_service = MoMoService()
-            self.visa_service = VisaService()
-            self.zalopay_service = ZaloPayService()
+            self.init_catalogs()
+            self.init_status_poller()
         except Exception as e:
             print(f"Lỗi khởi tạo services: {e}")
     
+    def start_background_tasks(self):
+        """Làm mới danh mục đã cũ và tiếp tục theo dõi giao dịch chờ"""
+        try:
+            self.catalog_service.warm()
+            self.resume_pending_payments()
+            self.status_poller.start()
+        except Exception as e:
+            print(f"Lỗi khởi động tác vụ nền: {e}")
+    
+    def init_status_poller(self):
+        """Theo dõi các giao dịch đang chờ (ví/cổng thanh toán) tới khi có trạng thái cuối"""
+        self.status_poller = PaymentStatusPoller()
+        self.status_poller.register_provider("momo", lambda order_id: self.momo_service.query_payment(order_id), classify_momo)
+        self.status_poller.register_provider("zalopay", lambda order_id: self.zalopay_service.query_order(order_id), classify_zalopay)
+        self.status_poller.register_provider("visa", lambda order_id: self.visa_service.query_transaction(order_id), classify_visa)
+        self.status_poller.add_listener(self.on_payment_status)
+    
+    def resume_pending_payments(self):
+        """Tiếp tục theo dõi giao dịch còn chờ từ lần chạy trước
+        
+        Giao dịch đã quá max_age được hỏi provider một lần rồi có trạng thái cuối (expired nếu vẫn
+        chưa xác nhận); giao dịch không theo dõi được (không có mã, provider không hỗ trợ) là expired.
+        """
+        cutoff = datetime.now() - timedelta(seconds=self.status_poller.max_age)
+        for batch in self.payment_store.iter_payments(status="pending"):
+            for payment in batch:
+                paid_at = datetime.strptime(payment["payment_date"], "%Y-%m-%d %H:%M:%S")
+                stale = paid_at < cutoff
+                tracked = self.status_poller.track(
+                    payment["payment_method"],
+                    payment["order_id"] or payment["transaction_id"],
+                    transaction_id=payment["transaction_id"],
+                    delay=0 if stale else None,
+                    max_age=0 if stale else (paid_at - cutoff).total_seconds()
+                )
+                if not tracked:
+                    self.payment_store.update_status(payment["transaction_id"], "expired")
+    
+    def on_payment_status(self, transaction_id, provider, status, result):
+        """Cập nhật lịch sử khi giao dịch đang chờ có trạng thái cuối (gọi từ thread nền)"""
+        # expired: quá max_age mà chưa xác nhận, không phải thất bại (khách có thể vẫn thanh toán)
+        if status not in ("success", "failed", "expired"):
+            return
+        
+        self.payment_store.update_status(transaction_id, status)
+        if status == "success":
+            payment = self.payment_store.get_payment(transaction_id)
+            if payment and payment.get("bill_number"):
+                self.bidv_service.cache.invalidate(payment["bill_number"])
+    
+    def init_catalogs(self):
+        """Danh mục nhà cung cấp/phương thức thanh toán/ngân hàng: đọc bản đã lưu, làm mới trong nền"""
+        self.catalog_service = CatalogService(os.path.join(self.config_manager.config_dir, "catalogs.json"))
+        
+        # Danh mục tĩnh trong code: không bao giờ cũ, không ghi ra file
+        self.catalog_service.register("bidv_providers", lambda: self.bidv_service.get_providers(), ttl=None, persist=False)
+        self.catalog_service.register("momo_payment_methods", lambda: self.momo_service.get_payment_methods(), ttl=None, persist=False)
+        self.catalog_service.register("zalopay_payment_methods", lambda: self.zalopay_service.get_payment_methods(), ttl=None, persist=False)
+        self.catalog_service.register("zalopay_banks", self.load_zalopay_banks)
+    
+    def load_zalopay_banks(self):
+        """Loader danh mục ngân hàng ZaloPay; lỗi thì raise để giữ bản cũ"""
+        result = self.zalopay_service.get_bank_list()
+        if not result.get("success"):
+            raise RuntimeError(result.get("message"))
+        return self.zalopay_service.normalize_banks(result.get("banks"))
+    
+    def configure_lookup_cache(self, cache=None):
+        """Áp dụng performance_settings cho cache tra cứu (bộ nhớ + đĩa)"""
+        from src.api.disk_cache import DiskCache
+        
+        if cache is None:
+            cache = self.bidv_service.cache
+        disk_mb = self.config_manager.get_setting("performance_settings.disk_cache_size", 50)
+        
+        try:
+            if disk_mb and cache.disk is None:
+                # Tầng đĩa dùng chung key mã hóa với cấu hình bảo mật
+                cache.disk = DiskCache(
+                    os.path.join(self.config_manager.config_dir, "lookup_cache.db"),
+                    self.config_manager.encryption_key
+                )
+            elif not disk_mb and cache.disk is not None:
+                cache.disk.close()
+                cache.disk = None
+        except Exception as e:
+            print(f"Lỗi khởi tạo cache trên đĩa: {e}")
+        
+        cache.configure(
+            enabled=self.config_manager.get_setting("performance_settings.enable_cache", True),
+            max_bytes=self.config_manager.get_setting("performance_settings.cache_size", 100) * 1024 * 1024,
+            disk_max_bytes=disk_mb * 1024 * 1024 if disk_mb else None
+        )
+    
     def create_ui(self):
         """Tạo giao diện chính"""
         # Main container
@@ -122,37 +279,38 @@ class PayooDesktopApp:
     def create_content_area(self):
         """Tạo khu vực nội dung chính"""
         # Tabview
-        self.tabview = ctk.CTkTabview(self.main_frame, width=1000, height=600)
+        self.tabview = ctk.CTkTabview(self.main_frame, width=1000, height=600, command=self.on_tab_changed)
         self.tabview.pack(fill="both", expand=True, pady=10)
         
         # Các tab
         self.create_tabs()
     
     def create_tabs(self):
-        """Tạo các tab chính"""
-        # Tab tra cứu hóa đơn
-        bill_tab = self.tabview.add("🔍 Tra cứu hóa đơn")
-        self.bill_lookup_frame = BillLookupFrame(bill_tab, self)
-        
-        # Tab thanh toán
-        payment_tab = self.tabview.add("💳 Thanh toán")
-        self.payment_frame = PaymentFrame(payment_tab, self)
-        
-        # Tab lịch sử
-        history_tab = self.tabview.add("📋 Lịch sử")
-        self.history_frame = HistoryFrame(history_tab, self)
-        
-        # Tab trạng thái API
-        status_tab = self.tabview.add("📊 Trạng thái API")
-        self.status_frame = StatusFrame(status_tab, self)
-        
-        # Tab quản trị
-        admin_tab = self.tabview.add("⚙️ Quản trị")
-        self.admin_frame = AdminFrame(admin_tab, self)
-        
-        # Tab cài đặt
-        settings_tab = self.tabview.add("🔧 Cài đặt")
-        self.settings_frame = SettingsFrame(settings_tab, self)
+        """Tạo các tab chính; chỉ dựng nội dung tab đầu tiên, các tab khác dựng khi được mở"""
+        self.frames = {}
+        for tab_name in TABS:
+            self.tabview.add(tab_name)
+        self.show_tab(next(iter(TABS)))
+    
+    def on_tab_changed(self):
+        """Người dùng chọn tab: dựng nội dung nếu là lần đầu"""
+        self.get_frame(self.tabview.get())
+    
+    def get_frame(self, tab_name):
+        """Lấy frame của tab, lần đầu thì import module và tạo frame"""
+        frame = self.frames.get(tab_name)
+        if frame is None:
+            attribute, module_name, class_name = TABS[tab_name]
+            frame_class = getattr(importlib.import_module(module_name), class_name)
+            frame = frame_class(self.tabview.tab(tab_name), self)
+            self.frames[tab_name] = frame
+            setattr(self, attribute, frame)
+        return frame
+    
+    def show_tab(self, tab_name):
+        """Chuyển sang tab (dựng nội dung nếu cần) và trả về frame của tab"""
+        self.tabview.set(tab_name)
+        return self.get_frame(tab_name)
     
     def create_footer(self):
         """Tạo footer"""
@@ -226,6 +384,8 @@ class PayooDesktopApp:
     
     def show_message(self, title, message, msg_type="info"):
         """Hiển thị thông báo"""
+        from CTkMessagebox import CTkMessagebox
+        
         if msg_type == "info":
             CTkMessagebox(title=title, message=message, icon="info")
         elif msg_type == "warning":
@@ -1,12 +1,49 @@
 # API Services Module
-from .bidv_service import BIDVService
-from .momo_service import MoMoService
-from .visa_service import VisaService
-from .zalopay_service import ZaloPayService
-
-__all__ = [
-    "BIDVService",
-    "MoMoService", 
-    "VisaService",
-    "ZaloPayService"
-]
\ No newline at end of file
+# Các class chỉ được import khi dùng tới (PEP 562): import src.api.catalog hay src.api.status_poller
+# không kéo theo requests/asyncio, service của provider chỉ được nạp khi dùng lần đầu
+import importlib
+
+_EXPORTS = {
+    "BIDVService": ".bidv_service",
+    "MoMoService": ".momo_service",
+    "VisaService": ".visa_service",
+    "ZaloPayService": ".zalopay_service",
+    "HTTPTransport": ".transport",
+    "get_transport": ".transport",
+    "configure_transport": ".transport",
+    "MetricsRegistry": ".metrics",
+    "LatencyHistogram": ".metrics",
+    "get_metrics": ".metrics",
+    "HealthChecker": ".health",
+    "RetryPolicy": ".retry",
+    "CircuitBreaker": ".retry",
+    "CircuitOpenError": ".retry",
+    "Hedger": ".hedging",
+    "LookupCache": ".lookup_cache",
+    "DiskCache": ".disk_cache",
+    "CatalogService": ".catalog",
+    "PaymentStatusPoller": ".status_poller",
+    "TokenBucket": ".status_poller",
+    "OrderIdGenerator": ".order_id",
+    "get_order_id_generator": ".order_id",
+    "AsyncBIDVService": ".async_clients",
+    "AsyncMoMoService": ".async_clients",
+    "AsyncVisaService": ".async_clients",
+    "AsyncZaloPayService": ".async_clients",
+    "lookup_bills": ".async_clients"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
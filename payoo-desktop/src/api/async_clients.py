@@ -0,0 +1,181 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, Iterable, AsyncIterator, Callable, Awaitable, Tuple, TypeVar
+
+from .bidv_service import BIDVService
+from .momo_service import MoMoService
+from .visa_service import VisaService
+from .zalopay_service import ZaloPayService
+
+T = TypeVar("T")
+
+
+class AsyncServiceClient:
+    """Bọc service đồng bộ để gọi từ asyncio
+
+    Mỗi lời gọi chạy trên thread pool riêng của client, dùng chung HTTPTransport
+    (keep-alive) của service. Số worker mặc định lấy từ api_settings.concurrent_requests.
+    """
+
+    def __init__(self, service, concurrency: int = None):
+        self.service = service
+        self.concurrency = concurrency or service.transport.concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix=f"{type(self.service).__name__}-worker"
+            )
+        return self._executor
+
+    async def _call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    async def test_connection(self, force: bool = False) -> Dict[str, Any]:
+        """Kiểm tra kết nối API"""
+        return await self._call(self.service.test_connection, force=force)
+
+    def close(self):
+        """Dừng thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class AsyncBIDVService(AsyncServiceClient):
+    """Phiên bản asyncio của BIDVService"""
+
+    def __init__(self, service: BIDVService = None, concurrency: int = None):
+        super().__init__(service or BIDVService(), concurrency)
+
+    async def lookup_bill(self, bill_number: str) -> Dict[str, Any]:
+        """Tra cứu hóa đơn qua BIDV API"""
+        return await self._call(self.service.lookup_bill, bill_number)
+
+    def lookup_bills(self, bill_numbers: Iterable[str],
+                     concurrency: int = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Tra cứu nhiều hóa đơn, trả về (mã hóa đơn, kết quả) theo thứ tự hoàn thành"""
+        return run_bounded(self.lookup_bill, bill_numbers, concurrency or self.concurrency)
+
+
+class AsyncMoMoService(AsyncServiceClient):
+    """Phiên bản asyncio của MoMoService"""
+
+    def __init__(self, service: MoMoService = None, concurrency: int = None):
+        super().__init__(service or MoMoService(), concurrency)
+
+    async def create_payment(self, amount: int, order_info: str, extra_data: str = "") -> Dict[str, Any]:
+        """Tạo thanh toán MoMo"""
+        return await self._call(self.service.create_payment, amount, order_info, extra_data)
+
+    async def query_payment(self, order_id: str) -> Dict[str, Any]:
+        """Truy vấn trạng thái thanh toán"""
+        return await self._call(self.service.query_payment, order_id)
+
+    async def refund_payment(self, order_id: str, amount: int) -> Dict[str, Any]:
+        """Hoàn tiền"""
+        return await self._call(self.service.refund_payment, order_id, amount)
+
+
+class AsyncZaloPayService(AsyncServiceClient):
+    """Phiên bản asyncio của ZaloPayService"""
+
+    def __init__(self, service: ZaloPayService = None, concurrency: int = None):
+        super().__init__(service or ZaloPayService(), concurrency)
+
+    async def create_order(self, amount: int, description: str,
+                           user_info: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Tạo đơn hàng ZaloPay"""
+        return await self._call(self.service.create_order, amount, description, user_info)
+
+    async def query_order(self, app_trans_id: str) -> Dict[str, Any]:
+        """Truy vấn trạng thái đơn hàng"""
+        return await self._call(self.service.query_order, app_trans_id)
+
+    async def refund_order(self, zp_trans_id: str, amount: int, description: str = "") -> Dict[str, Any]:
+        """Hoàn tiền đơn hàng"""
+        return await self._call(self.service.refund_order, zp_trans_id, amount, description)
+
+    async def get_bank_list(self) -> Dict[str, Any]:
+        """Lấy danh sách ngân hàng hỗ trợ"""
+        return await self._call(self.service.get_bank_list)
+
+    async def quick_pay(self, amount: int, payment_code: str) -> Dict[str, Any]:
+        """Thanh toán nhanh"""
+        return await self._call(self.service.quick_pay, amount, payment_code)
+
+
+class AsyncVisaService(AsyncServiceClient):
+    """Phiên bản asyncio của VisaService"""
+
+    def __init__(self, service: VisaService = None, concurrency: int = None):
+        super().__init__(service or VisaService(), concurrency)
+
+    async def funds_transfer(self, amount: float, card_number: str, recipient_name: str,
+                             recipient_address: str, currency: str = "VND") -> Dict[str, Any]:
+        """Chuyển tiền qua Visa Direct"""
+        return await self._call(
+            self.service.funds_transfer, amount, card_number, recipient_name, recipient_address, currency
+        )
+
+    async def pull_funds(self, amount: float, card_number: str, currency: str = "VND") -> Dict[str, Any]:
+        """Rút tiền từ thẻ"""
+        return await self._call(self.service.pull_funds, amount, card_number, currency)
+
+    async def query_transaction(self, transaction_id: str) -> Dict[str, Any]:
+        """Truy vấn trạng thái giao dịch"""
+        return await self._call(self.service.query_transaction, transaction_id)
+
+
+async def run_bounded(func: Callable[[T], Awaitable[Any]], items: Iterable[T],
+                      concurrency: int) -> AsyncIterator[Tuple[T, Any]]:
+    """Chạy func cho từng item, tối đa concurrency lời gọi cùng lúc
+
+    Kết quả được trả về ngay khi xong (không giữ thứ tự đầu vào). Chỉ tạo task khi còn
+    chỗ trống nên bộ nhớ không tăng theo số lượng item.
+    """
+    concurrency = max(1, concurrency)
+    iterator = iter(items)
+    pending = {}
+
+    def schedule_next() -> bool:
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return False
+        pending[asyncio.ensure_future(func(item))] = item
+        return True
+
+    try:
+        while len(pending) < concurrency and schedule_next():
+            pass
+
+        while pending:
+            done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                yield item, task.result()
+                schedule_next()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def lookup_bills(bill_numbers: Iterable[str], concurrency: int = None,
+                       client: AsyncBIDVService = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Tra cứu hàng loạt hóa đơn BIDV với số request đồng thời giới hạn
+
+    concurrency mặc định theo api_settings.concurrent_requests.
+    """
+    owns_client = client is None
+    client = client or AsyncBIDVService(concurrency=concurrency)
+    try:
+        async for bill_number, result in client.lookup_bills(bill_numbers, concurrency):
+            yield bill_number, result
+    finally:
+        if owns_client:
+            client.close()
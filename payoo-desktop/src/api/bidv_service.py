@@ -1,4 +1,3 @@
-import requests
 import json
 import hmac
 import hashlib
@@ -8,10 +7,17 @@ from typing import Dict, Any, Optional
 import ssl
 import urllib3
 
+from .transport import HTTPTransport, get_transport
+from .health import HealthChecker
+from .lookup_cache import LookupCache
+
 class BIDVService:
     """Service tích hợp BIDV API thật"""
     
-    def __init__(self):
+    def __init__(self, transport: HTTPTransport = None):
+        self.transport = transport or get_transport()
+        self.health = HealthChecker(self.transport)
+        self.cache = LookupCache()
         self.api_key = ""
         self.api_secret = ""
         self.api_url = "https://openapi.bidv.com.vn/bidv/sandbox/open-banking/ibank/billPayment/inquiryBills/v1"
@@ -22,6 +28,7 @@ class BIDVService:
     
     def configure(self, api_key: str, api_secret: str, api_url: str = None):
         """Cấu hình thông tin API"""
+        self.health.invalidate()
         self.api_key = api_key
         self.api_secret = api_secret
         if api_url:
@@ -36,8 +43,22 @@ class BIDVService:
             hashlib.sha256
         ).hexdigest()
     
-    def lookup_bill(self, bill_number: str) -> Dict[str, Any]:
-        """Tra cứu hóa đơn qua BIDV API"""
+    def lookup_bill(self, bill_number: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Tra cứu hóa đơn qua BIDV API, dùng kết quả trong cache nếu còn hạn"""
+        key = self.cache.make_key(bill_number, "electric", "EVN")
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+        
+        result = self._lookup_bill(bill_number)
+        if result.get("success"):
+            self.cache.put(key, result)
+        return result
+    
+    def _lookup_bill(self, bill_number: str) -> Dict[str, Any]:
+        """Gọi BIDV API tra cứu hóa đơn (không qua cache)"""
         try:
             timestamp = str(int(time.time() * 1000))
             request_data = {
@@ -56,12 +77,14 @@ class BIDVService:
                 "X-Timestamp": timestamp
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "bidv",
                 f"{self.api_url}/bills/lookup",
+                idempotent=True,
+                hedge=True,
                 headers=headers,
                 data=data_string,
-                verify=True,
-                timeout=30
+                verify=True
             )
             
             if response.status_code == 200:
@@ -114,21 +137,10 @@ class BIDVService:
             ]
         }
     
-    def test_connection(self) -> Dict[str, Any]:
-        """Kiểm tra kết nối API"""
-        try:
-            # Test với một bill number giả
-            result = self.lookup_bill("TEST123456")
-            return {
-                "success": True,
-                "status": "operational",
-                "message": "Kết nối BIDV API thành công",
-                "response_time": "120ms"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "status": "error",
-                "message": f"Lỗi kết nối BIDV API: {str(e)}",
-                "response_time": "timeout"
-            }
\ No newline at end of file
+    def test_connection(self, force: bool = False) -> Dict[str, Any]:
+        """Kiểm tra kết nối API bằng probe nhẹ (HEAD), kết quả được cache theo trạng thái provider"""
+        return self.health.check(
+            "bidv",
+            self.api_url,
+            force=force
+        )
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+DEFAULT_CATALOG_TTL = 24 * 3600
+
+
+class CatalogService:
+    """Danh mục ít thay đổi (nhà cung cấp, phương thức thanh toán, ngân hàng) theo stale-while-revalidate
+
+    - get() trả ngay bản đang có (kể cả đã cũ); bản cũ thì làm mới trong nền, mỗi danh mục
+      chỉ một lần làm mới tại một thời điểm
+    - Bản tốt gần nhất được lưu ra ~/.payoo/catalogs.json nên khởi động khi mất mạng vẫn có dữ liệu
+    - Làm mới lỗi thì giữ bản cũ; danh mục tĩnh (persist=False) không ghi ra file
+    """
+
+    def __init__(self, cache_path: str = None, max_workers: int = 2):
+        if cache_path is None:
+            cache_path = os.path.join(os.path.expanduser("~"), ".payoo", "catalogs.json")
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+
+        self._loaders: Dict[str, Dict[str, Any]] = {}
+        # name -> {"value", "fetched_at"} (fetched_at theo time.time())
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._refreshing: Dict[str, bool] = {}
+        self._listeners: Dict[str, List[Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._load_persisted()
+
+    def register(self, name: str, loader: Callable[[], Any], ttl: Optional[float] = DEFAULT_CATALOG_TTL,
+                 persist: bool = True):
+        """Đăng ký danh mục; loader trả về dữ liệu hoặc raise khi lỗi; ttl=None là không bao giờ cũ"""
+        with self._lock:
+            self._loaders[name] = {"loader": loader, "ttl": ttl, "persist": persist}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="catalog")
+        return self._executor
+
+    def is_stale(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            ttl = self._loaders.get(name, {}).get("ttl")
+        if entry is None:
+            return True
+        return ttl is not None and time.time() - entry["fetched_at"] > ttl
+
+    def get(self, name: str, on_update: Callable[[Any], None] = None, default: Any = None) -> Any:
+        """Lấy danh mục ngay lập tức
+
+        Chưa có dữ liệu hoặc dữ liệu đã cũ thì làm mới trong nền; on_update(value) được gọi (từ
+        thread nền) khi có bản mới.
+        """
+        if on_update is not None:
+            self.subscribe(name, on_update)
+
+        with self._lock:
+            entry = self._entries.get(name)
+        if self.is_stale(name):
+            self.refresh(name)
+        return entry["value"] if entry else default
+
+    def get_sync(self, name: str, default: Any = None) -> Any:
+        """Như get nhưng nếu chưa có dữ liệu thì chờ tải xong (dùng cho CLI/thread nền)"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            self._refresh(name)
+            with self._lock:
+                entry = self._entries.get(name)
+        elif self.is_stale(name):
+            self.refresh(name)
+        return entry["value"] if entry else default
+
+    def subscribe(self, name: str, listener: Callable[[Any], None]):
+        with self._lock:
+            listeners = self._listeners.setdefault(name, [])
+            if listener not in listeners:
+                listeners.append(listener)
+
+    def refresh(self, name: str):
+        """Làm mới trong nền (bỏ qua nếu đang làm mới)"""
+        with self._lock:
+            if name not in self._loaders or self._refreshing.get(name):
+                return
+            self._refreshing[name] = True
+        self._get_executor().submit(self._refresh, name, True)
+
+    def warm(self):
+        """Làm mới mọi danh mục đã cũ trong nền (gọi khi khởi động)"""
+        for name in list(self._loaders):
+            if self.is_stale(name):
+                self.refresh(name)
+
+    def _refresh(self, name: str, claimed: bool = False):
+        with self._lock:
+            config = self._loaders.get(name)
+            if config is None:
+                return
+            if not claimed:
+                self._refreshing[name] = True
+        try:
+            value = config["loader"]()
+        except Exception as e:
+            print(f"Lỗi làm mới danh mục {name}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._refreshing[name] = False
+
+        with self._lock:
+            changed = self._entries.get(name, {}).get("value") != value
+            self._entries[name] = {"value": value, "fetched_at": time.time()}
+            listeners = list(self._listeners.get(name, []))
+        if config["persist"]:
+            self._persist()
+
+        if changed:
+            for listener in listeners:
+                try:
+                    listener(value)
+                except Exception as e:
+                    print(f"Lỗi cập nhật danh mục {name}: {e}")
+
+    def _load_persisted(self):
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+        except Exception as e:
+            print(f"Lỗi đọc danh mục đã lưu: {e}")
+            self._entries = {}
+
+    def _persist(self):
+        """Ghi file tạm rồi thay thế để không bao giờ để lại file hỏng
+        
+        Các lần làm mới ghi lần lượt (_persist_lock) và lấy dữ liệu ngay trước khi ghi, nên bản
+        ghi sau luôn mới hơn; file tạm có tên riêng cho mỗi lần ghi.
+        """
+        with self._persist_lock:
+            with self._lock:
+                data = {name: entry for name, entry in self._entries.items()
+                        if self._loaders.get(name, {}).get("persist", True)}
+            tmp_path = None
+            try:
+                cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+                os.makedirs(cache_dir, exist_ok=True)
+                with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_dir, suffix=".tmp",
+                                                 prefix=os.path.basename(self.cache_path), delete=False) as f:
+                    tmp_path = f.name
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+            except Exception as e:
+                print(f"Lỗi lưu danh mục: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,162 @@
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+DEFAULT_DISK_MAX_MB = 50
+
+
+class DiskCache:
+    """Tầng cache trên đĩa (SQLite) cho kết quả tra cứu, nằm sau LookupCache trong bộ nhớ
+
+    - Giá trị: JSON nén zlib rồi mã hóa bằng Fernet key của ConfigManager (encryption_key)
+    - Key và mã hóa đơn chỉ lưu dạng HMAC nên file cache không lộ mã hóa đơn
+    - Giới hạn theo byte: vượt ngân sách thì xóa entry ít dùng nhất (index theo accessed_at)
+    - Hết hạn theo giờ hệ thống nên còn hiệu lực sau khi khởi động lại ứng dụng
+    """
+
+    def __init__(self, db_path: str, encryption_key: bytes, max_bytes: int = DEFAULT_DISK_MAX_MB * 1024 * 1024):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.fernet = Fernet(encryption_key)
+        self.max_bytes = max_bytes
+        self._hmac_key = hashlib.sha256(b"payoo-lookup-cache" + encryption_key).digest()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS lookup_cache (
+                        key BLOB PRIMARY KEY,
+                        bill BLOB NOT NULL,
+                        payload BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        expires_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    ) WITHOUT ROWID
+                """)
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lookup_cache_bill ON lookup_cache(bill)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lookup_cache_accessed ON lookup_cache(accessed_at)")
+                self._conn.execute("DELETE FROM lookup_cache WHERE expires_at <= ?", (time.time(),))
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM lookup_cache").fetchone()[0]
+
+    def _digest(self, value: str) -> bytes:
+        return hmac.new(self._hmac_key, value.encode("utf-8"), hashlib.sha256).digest()[:16]
+
+    def _key(self, key: Tuple) -> bytes:
+        return self._digest("\x1f".join(key))
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, float]]:
+        """Trả về (JSON đã giải mã, expires_at theo time.time()) hoặc None"""
+        digest = self._key(key)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM lookup_cache WHERE key = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._delete(digest)
+                return None
+
+            try:
+                payload = zlib.decompress(self.fernet.decrypt(row[0]))
+            except (InvalidToken, zlib.error):
+                # Key mã hóa đã đổi hoặc dữ liệu hỏng: coi như miss
+                self._delete(digest)
+                return None
+
+            with self._conn:
+                self._conn.execute("UPDATE lookup_cache SET accessed_at = ? WHERE key = ?", (now, digest))
+        return payload, row[1]
+
+    def put(self, key: Tuple, payload: bytes, expires_at: float):
+        """Lưu JSON đã mã hóa UTF-8; expires_at theo time.time()"""
+        blob = self.fernet.encrypt(zlib.compress(payload))
+        digest = self._key(key)
+        size = len(blob) + len(digest) + 40
+
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._conn.execute("SELECT size FROM lookup_cache WHERE key = ?", (digest,)).fetchone()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO lookup_cache (key, bill, payload, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, self._digest(key[0]), blob, size, expires_at, time.time())
+                )
+            self._bytes += size - (old[0] if old else 0)
+            self._evict()
+
+    def configure(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max(0, max_bytes)
+            self._evict()
+
+    def _evict(self):
+        """Xóa entry hết hạn rồi entry ít dùng nhất tới khi dưới ngân sách"""
+        if self._bytes <= self.max_bytes:
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM lookup_cache WHERE expires_at <= ?", (time.time(),))
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM lookup_cache").fetchone()[0]
+
+            # Xóa theo lô để ít lần ghi; cursor đi theo index accessed_at
+            target = self.max_bytes * 0.9
+            while self._bytes > target:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM lookup_cache ORDER BY accessed_at LIMIT 100"
+                ).fetchall()
+                if not rows:
+                    break
+                self._conn.executemany("DELETE FROM lookup_cache WHERE key = ?", [(row[0],) for row in rows])
+                self._bytes -= sum(row[1] for row in rows)
+
+    def _delete(self, digest: bytes):
+        row = self._conn.execute("SELECT size FROM lookup_cache WHERE key = ?", (digest,)).fetchone()
+        if row:
+            with self._conn:
+                self._conn.execute("DELETE FROM lookup_cache WHERE key = ?", (digest,))
+            self._bytes -= row[0]
+
+    def invalidate(self, bill_number: str) -> int:
+        bill = self._digest(str(bill_number).strip())
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM lookup_cache WHERE bill = ?", (bill,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM lookup_cache WHERE bill = ?", (bill,))
+            self._bytes -= removed[0]
+        return removed[1]
+
+    def clear(self) -> int:
+        with self._lock:
+            with self._conn:
+                count = self._conn.execute("SELECT COUNT(*) FROM lookup_cache").fetchone()[0]
+                self._conn.execute("DELETE FROM lookup_cache")
+            self._bytes = 0
+            self._conn.execute("VACUUM")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM lookup_cache").fetchone()[0]
+            return {"entries": entries, "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,153 @@
+import socket
+import ssl
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .transport import HTTPTransport, get_transport
+
+DEFAULT_PROBE_TIMEOUT = 5
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 120
+DEFAULT_SLOW_MS = 2000
+DEFAULT_MIN_SUCCESS_RATE = 95.0
+
+
+class HealthChecker:
+    """Kiểm tra sống/chết provider bằng probe nhẹ thay cho giao dịch nghiệp vụ có ký HMAC
+
+    Chế độ probe:
+        - tcp: chỉ mở kết nối TCP tới host
+        - tls: TCP + bắt tay TLS (dùng chứng chỉ client nếu có)
+        - head: HEAD qua HTTPTransport (kết nối keep-alive), mọi phản hồi HTTP < 500 là sống
+
+    Kết quả được cache theo provider. Provider ổn định thì khoảng probe tăng gấp đôi tới
+    max_interval; khi chậm, lỗi hoặc tỷ lệ thành công trong cửa sổ metrics giảm thì quay về
+    min_interval để phát hiện sự cố/hồi phục nhanh.
+    """
+
+    def __init__(self, transport: HTTPTransport = None,
+                 probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 slow_ms: float = DEFAULT_SLOW_MS,
+                 min_success_rate: float = DEFAULT_MIN_SUCCESS_RATE):
+        self.transport = transport or get_transport()
+        self.probe_timeout = probe_timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.slow_ms = slow_ms
+        self.min_success_rate = min_success_rate
+
+        # provider -> {"result", "interval", "next_due"}
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._probe_locks: Dict[str, threading.Lock] = {}
+
+    def check(self, provider: str, url: str, mode: str = "head",
+              cert: Optional[Tuple[str, str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Trả về trạng thái provider; chỉ probe thật khi hết hạn cache hoặc force=True"""
+        with self._lock:
+            probe_lock = self._probe_locks.setdefault(provider, threading.Lock())
+
+        # Nhiều màn hình cùng hỏi một provider thì chỉ một probe chạy, các bên còn lại dùng kết quả đó
+        with probe_lock:
+            state = self._state.get(provider)
+            if state and not force and time.monotonic() < state["next_due"]:
+                return {**state["result"], "cached": True}
+
+            result = self.probe(provider, url, mode, cert)
+            self._schedule(provider, result)
+            return result
+
+    def probe(self, provider: str, url: str, mode: str = "head",
+              cert: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+        """Chạy một probe, không dùng cache"""
+        parts = urlsplit(url)
+        host = parts.hostname
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        start = time.perf_counter()
+
+        try:
+            if mode == "head":
+                response = self.transport.request(
+                    provider, "HEAD", url,
+                    cert=cert,
+                    timeout=self.probe_timeout,
+                    operation="health",
+                    retries=0,
+                    use_breaker=False,
+                    allow_redirects=False
+                )
+                success = response.status_code < 500
+                detail = f"HTTP {response.status_code}"
+            else:
+                with socket.create_connection((host, port), timeout=self.probe_timeout) as sock:
+                    detail = "TCP OK"
+                    if mode == "tls":
+                        context = ssl.create_default_context()
+                        if cert:
+                            context.load_cert_chain(cert[0], cert[1] or None)
+                        with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+                            detail = f"TLS OK ({tls_sock.version()})"
+                success = True
+        except Exception as e:
+            success = False
+            detail = str(e)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        return self._result(provider, success, latency_ms, detail, mode)
+
+    def _result(self, provider: str, success: bool, latency_ms: float,
+                detail: str, mode: str) -> Dict[str, Any]:
+        window = self.transport.metrics.snapshot(provider)["window"]
+        success_rate = window["success_rate"]
+
+        if not success:
+            status = "down"
+            message = f"{provider.upper()} không phản hồi: {detail}"
+        elif latency_ms > self.slow_ms or (success_rate is not None and success_rate < self.min_success_rate):
+            status = "degraded"
+            message = f"{provider.upper()} phản hồi chậm hoặc lỗi nhiều ({detail})"
+        else:
+            status = "operational"
+            message = f"Kết nối {provider.upper()} API thành công ({detail})"
+
+        return {
+            "success": success,
+            "status": status,
+            "message": message,
+            "response_time": f"{latency_ms:.0f}ms",
+            "latency_ms": round(latency_ms),
+            "probe": mode,
+            "success_rate": success_rate,
+            "circuit": self.transport.get_breaker(provider).snapshot()["state"],
+            "last_check": datetime.now().strftime("%H:%M:%S"),
+            "cached": False
+        }
+
+    def _schedule(self, provider: str, result: Dict[str, Any]):
+        """Tính khoảng probe tiếp theo: giãn ra khi ổn định, thu về min_interval khi có vấn đề"""
+        with self._lock:
+            state = self._state.get(provider)
+            if result["status"] == "operational":
+                interval = min(state["interval"] * 2, self.max_interval) if state else self.min_interval
+            else:
+                interval = self.min_interval
+
+            result["next_check_in"] = interval
+            self._state[provider] = {
+                "result": result,
+                "interval": interval,
+                "next_due": time.monotonic() + interval
+            }
+
+    def invalidate(self, provider: str = None):
+        """Bỏ cache (vd. sau khi đổi cấu hình API) để lần check sau probe ngay"""
+        with self._lock:
+            if provider is None:
+                self._state.clear()
+            else:
+                self._state.pop(provider, None)
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Optional, TypeVar
+
+from .metrics import MetricsRegistry
+
+T = TypeVar("T")
+
+DEFAULT_MAX_HEDGE_RATIO = 0.05
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MIN_DELAY_MS = 50
+DEFAULT_HEDGE_WORKERS = 16
+
+
+class Hedger:
+    """Gửi request dự phòng (hedge) cho thao tác idempotent khi request đầu chậm hơn p95
+
+    - Độ trễ chờ trước khi hedge = p95 trong cửa sổ metrics của (provider, operation);
+      chưa đủ min_samples mẫu thì không hedge
+    - Số hedge bị giới hạn max_ratio trên tổng số request đủ điều kiện
+    - Kết quả về trước được dùng; request còn lại bị hủy nếu chưa chạy, nếu đang chạy thì
+      kết quả bị bỏ qua (requests không hỗ trợ hủy giữa chừng)
+    """
+
+    def __init__(self, metrics: MetricsRegistry, max_ratio: float = DEFAULT_MAX_HEDGE_RATIO,
+                 min_samples: int = DEFAULT_MIN_SAMPLES, min_delay_ms: float = DEFAULT_MIN_DELAY_MS,
+                 max_workers: int = DEFAULT_HEDGE_WORKERS):
+        self.metrics = metrics
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.min_delay_ms = min_delay_ms
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+        return self._executor
+
+    def _counter(self, provider: str) -> Dict[str, float]:
+        return self._stats.setdefault(provider, {
+            "requests": 0, "hedged": 0, "hedge_wins": 0, "budget_skipped": 0, "saved_ms": 0.0
+        })
+
+    def hedge_delay(self, provider: str, operation: str) -> Optional[float]:
+        """Số giây chờ trước khi hedge (p95 quan sát được), None nếu chưa đủ dữ liệu"""
+        window = self.metrics.snapshot(provider, operation)["window"]
+        if window["count"] < self.min_samples or window["p95"] is None:
+            return None
+        return max(window["p95"], self.min_delay_ms) / 1000
+
+    def _take_budget(self, provider: str) -> bool:
+        with self._lock:
+            counter = self._counter(provider)
+            if counter["hedged"] + 1 > counter["requests"] * self.max_ratio:
+                counter["budget_skipped"] += 1
+                return False
+            counter["hedged"] += 1
+            return True
+
+    def call(self, provider: str, operation: str, func: Callable[[], T]) -> T:
+        """Chạy func; nếu quá p95 chưa xong và còn hạn mức thì chạy thêm một bản, lấy kết quả về trước"""
+        with self._lock:
+            self._counter(provider)["requests"] += 1
+
+        delay = self.hedge_delay(provider, operation)
+        if delay is None:
+            return func()
+
+        executor = self._get_executor()
+        start = time.perf_counter()
+        primary = executor.submit(func)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_budget(provider):
+            return primary.result()
+
+        hedge = executor.submit(func)
+        futures = {primary, hedge}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            winner = next(iter(done))
+            # Request lỗi thì chờ bản còn lại; chỉ báo lỗi khi cả hai đều lỗi
+            if winner.exception() is not None and futures:
+                continue
+
+            for loser in futures:
+                loser.cancel()
+            if winner is hedge and winner.exception() is None:
+                self._record_win(provider, primary, time.perf_counter() - start)
+            return winner.result()
+
+    def _record_win(self, provider: str, primary, winner_elapsed: float):
+        """Hedge về trước: khi request đầu xong sẽ cộng thời gian tiết kiệm được"""
+        start = time.perf_counter() - winner_elapsed
+        with self._lock:
+            self._counter(provider)["hedge_wins"] += 1
+
+        def on_primary_done(_):
+            saved = (time.perf_counter() - start - winner_elapsed) * 1000
+            with self._lock:
+                self._counter(provider)["saved_ms"] += max(saved, 0)
+
+        primary.add_done_callback(on_primary_done)
+
+    def snapshot(self, provider: str = None) -> Dict[str, Any]:
+        """Bộ đếm hedge: số request, số lần hedge, số lần hedge thắng và thời gian tiết kiệm"""
+        with self._lock:
+            counters = [dict(counter) for key, counter in self._stats.items()
+                        if provider is None or key == provider]
+
+        total = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_skipped": 0, "saved_ms": 0.0}
+        for counter in counters:
+            for key, value in counter.items():
+                total[key] += value
+
+        total["hedge_rate"] = total["hedged"] / total["requests"] * 100 if total["requests"] else 0.0
+        total["win_rate"] = total["hedge_wins"] / total["hedged"] * 100 if total["hedged"] else 0.0
+        return total
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
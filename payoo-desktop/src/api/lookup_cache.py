@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .disk_cache import DiskCache
+
+DEFAULT_MAX_MB = 100
+DEFAULT_PAID_TTL = 24 * 3600
+DEFAULT_UNPAID_TTL = 60
+
+# Trạng thái hóa đơn đã thanh toán: dữ liệu không đổi nữa nên giữ lâu
+PAID_STATUSES = {"paid", "success", "completed", "đã thanh toán"}
+
+# Ước lượng chi phí bộ nhớ của một entry ngoài phần dữ liệu (key, tuple, node OrderedDict)
+ENTRY_OVERHEAD = 200
+
+
+class LookupCache:
+    """Cache kết quả tra cứu hóa đơn trong bộ nhớ: LRU giới hạn theo byte, TTL theo trạng thái hóa đơn
+
+    Giá trị được lưu dạng JSON đã mã hóa: kích thước tính chính xác và mỗi lần get trả về bản sao
+    mới (người gọi sửa kết quả không làm hỏng cache).
+
+    Nếu có disk (DiskCache), miss trong bộ nhớ sẽ tìm tiếp trên đĩa và mọi put/invalidate/clear
+    được ghi xuống cả hai tầng, nên sau khi khởi động lại vẫn trả lời được các tra cứu gần đây.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 paid_ttl: float = DEFAULT_PAID_TTL, unpaid_ttl: float = DEFAULT_UNPAID_TTL,
+                 enabled: bool = True, disk: DiskCache = None):
+        self.max_bytes = max_bytes
+        self.paid_ttl = paid_ttl
+        self.unpaid_ttl = unpaid_ttl
+        self.enabled = enabled
+        self.disk = disk
+
+        # key -> (payload, size, expires_at); thứ tự = thứ tự dùng gần nhất (cuối là mới nhất)
+        self._entries: "OrderedDict[Tuple, Tuple[bytes, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def configure(self, enabled: bool = None, max_bytes: int = None, disk_max_bytes: int = None):
+        """Áp dụng performance_settings (enable_cache, cache_size, disk_cache_size)"""
+        if disk_max_bytes is not None and self.disk is not None:
+            self.disk.configure(disk_max_bytes)
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if max_bytes is not None:
+                self.max_bytes = max(0, max_bytes)
+            if not self.enabled:
+                self._entries.clear()
+                self._bytes = 0
+            self._evict()
+
+    @staticmethod
+    def make_key(bill_number: str, bill_type: str = "", provider: str = "") -> Tuple[str, str, str]:
+        return (str(bill_number).strip(), bill_type or "", provider or "")
+
+    def ttl_for(self, result: Dict[str, Any]) -> float:
+        """TTL theo trạng thái hóa đơn: đã thanh toán giữ lâu, chưa thanh toán giữ ngắn"""
+        status = str(result.get("bill", {}).get("status", "")).strip().lower()
+        return self.paid_ttl if status in PAID_STATUSES else self.unpaid_ttl
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return json.loads(entry[0])
+
+        found = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if found is None:
+                self._stats["misses"] += 1
+                return None
+
+            # Nạp lại vào bộ nhớ với thời hạn còn lại
+            payload, expires_at = found
+            self._stats["disk_hits"] += 1
+            self._store(key, payload, time.monotonic() + expires_at - time.time())
+        return json.loads(payload)
+
+    def put(self, key: Tuple, result: Dict[str, Any], ttl: float = None):
+        """Lưu kết quả (chỉ nên lưu kết quả thành công); entry lớn hơn cả ngân sách bị bỏ qua"""
+        if not self.enabled:
+            return
+
+        payload = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+        ttl = self.ttl_for(result) if ttl is None else ttl
+
+        with self._lock:
+            self._store(key, payload, time.monotonic() + ttl)
+        if self.disk is not None:
+            self.disk.put(key, payload, time.time() + ttl)
+
+    def _store(self, key: Tuple, payload: bytes, expires_at: float):
+        size = len(payload) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (payload, size, expires_at)
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, bill_number: str) -> int:
+        """Xóa mọi entry của một mã hóa đơn (vd. sau khi thanh toán thành công)"""
+        bill_number = str(bill_number).strip()
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == bill_number]
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+        if self.disk is not None:
+            return max(len(keys), self.disk.invalidate(bill_number))
+        return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            count = max(count, self.disk.clear())
+        return count
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "enabled": self.enabled
+            })
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups * 100 if lookups else 0.0
+        return stats
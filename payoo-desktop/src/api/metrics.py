@@ -0,0 +1,253 @@
+import bisect
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# Biên bucket độ trễ (ms) tăng theo cấp số nhân 1.2: sai số percentile tối đa ~10%
+BUCKET_BOUNDS_MS: List[float] = []
+_bound = 1.0
+while _bound < 120_000:
+    BUCKET_BOUNDS_MS.append(round(_bound, 3))
+    _bound *= 1.2
+BUCKET_BOUNDS_MS.append(float("inf"))
+
+DEFAULT_SLOT_SECONDS = 60
+DEFAULT_WINDOW_SLOTS = 60
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Histogram độ trễ với bucket cố định (ghi O(log n), bộ nhớ không tăng theo số request)"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKET_BOUNDS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, latency_ms: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total += latency_ms
+        self.min = latency_ms if self.min is None else min(self.min, latency_ms)
+        self.max = latency_ms if self.max is None else max(self.max, latency_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Cộng dồn histogram khác vào histogram này"""
+        if not other.count:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile q (0-100), nội suy tuyến tính trong bucket và giới hạn trong [min, max]"""
+        if not self.count:
+            return None
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = BUCKET_BOUNDS_MS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS_MS[index]
+                if upper == float("inf"):
+                    return self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(value, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max
+        }
+        for q in PERCENTILES:
+            result[f"p{q}"] = self.percentile(q)
+        return result
+
+
+class OperationStats:
+    """Thống kê một (provider, operation): histogram toàn thời gian và cửa sổ trượt theo slot"""
+
+    def __init__(self, slot_seconds: int = DEFAULT_SLOT_SECONDS, window_slots: int = DEFAULT_WINDOW_SLOTS):
+        self.slot_seconds = slot_seconds
+        self.window_slots = window_slots
+        self.lifetime = LatencyHistogram()
+        self.success = 0
+        self.failure = 0
+        self.errors: Dict[str, int] = {}
+
+        # Vòng slot: mỗi phần tử [slot_id, success, failure, LatencyHistogram]
+        self._slots: List[Optional[list]] = [None] * window_slots
+
+    def _slot(self, now: float) -> list:
+        slot_id = int(now // self.slot_seconds)
+        position = slot_id % self.window_slots
+        slot = self._slots[position]
+        if slot is None or slot[0] != slot_id:
+            slot = [slot_id, 0, 0, LatencyHistogram()]
+            self._slots[position] = slot
+        return slot
+
+    def record(self, latency_ms: float, success: bool, error: Optional[str] = None, now: float = None):
+        slot = self._slot(time.time() if now is None else now)
+        slot[3].record(latency_ms)
+        self.lifetime.record(latency_ms)
+
+        if success:
+            slot[1] += 1
+            self.success += 1
+        else:
+            slot[2] += 1
+            self.failure += 1
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def window(self, now: float = None) -> Tuple[int, int, LatencyHistogram]:
+        """(success, failure, histogram) trong cửa sổ trượt window_slots * slot_seconds"""
+        current = int((time.time() if now is None else now) // self.slot_seconds)
+        success = failure = 0
+        histogram = LatencyHistogram()
+        for slot in self._slots:
+            if slot is not None and current - slot[0] < self.window_slots:
+                success += slot[1]
+                failure += slot[2]
+                histogram.merge(slot[3])
+        return success, failure, histogram
+
+
+class MetricsRegistry:
+    """Nơi ghi nhận độ trễ/kết quả mọi request ra ngoài, theo provider và operation"""
+
+    def __init__(self, slot_seconds: int = DEFAULT_SLOT_SECONDS, window_slots: int = DEFAULT_WINDOW_SLOTS):
+        self.slot_seconds = slot_seconds
+        self.window_slots = window_slots
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def window_seconds(self) -> int:
+        return self.slot_seconds * self.window_slots
+
+    def record(self, provider: str, operation: str, latency_ms: float,
+               success: bool, error: Optional[str] = None):
+        """Ghi nhận một request; error là loại lỗi (timeout, connection, http_5xx...)"""
+        key = (provider, operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = OperationStats(self.slot_seconds, self.window_slots)
+                self._stats[key] = stats
+            stats.record(latency_ms, success, error)
+
+    def providers(self) -> List[str]:
+        with self._lock:
+            return sorted({provider for provider, _ in self._stats})
+
+    def operations(self, provider: str) -> List[str]:
+        with self._lock:
+            return sorted(operation for key_provider, operation in self._stats if key_provider == provider)
+
+    def snapshot(self, provider: str = None, operation: str = None) -> Dict[str, Any]:
+        """Thống kê gộp theo provider/operation (None = tất cả)
+
+        Trả về:
+            - latency: p50/p95/p99/avg/min/max toàn thời gian
+            - window: số request, success_rate và p50/p95/p99 trong cửa sổ trượt
+            - errors: số lỗi theo loại
+        """
+        now = time.time()
+        lifetime = LatencyHistogram()
+        window_histogram = LatencyHistogram()
+        success = failure = window_success = window_failure = 0
+        errors: Dict[str, int] = {}
+
+        with self._lock:
+            for (key_provider, key_operation), stats in self._stats.items():
+                if provider is not None and key_provider != provider:
+                    continue
+                if operation is not None and key_operation != operation:
+                    continue
+
+                lifetime.merge(stats.lifetime)
+                success += stats.success
+                failure += stats.failure
+                for error, count in stats.errors.items():
+                    errors[error] = errors.get(error, 0) + count
+
+                slot_success, slot_failure, histogram = stats.window(now)
+                window_success += slot_success
+                window_failure += slot_failure
+                window_histogram.merge(histogram)
+
+        window_total = window_success + window_failure
+        window = window_histogram.snapshot()
+        window.update({
+            "seconds": self.window_seconds,
+            "count": window_total,
+            "success": window_success,
+            "failure": window_failure,
+            "success_rate": window_success / window_total * 100 if window_total else None
+        })
+
+        total = success + failure
+        return {
+            "provider": provider,
+            "operation": operation,
+            "count": total,
+            "success": success,
+            "failure": failure,
+            "success_rate": success / total * 100 if total else None,
+            "latency": lifetime.snapshot(),
+            "window": window,
+            "errors": errors
+        }
+
+    def timeline(self, provider: str) -> List[Tuple[int, Optional[float]]]:
+        """Độ trễ trung bình theo slot của provider (gộp mọi operation, theo số request)"""
+        now = time.time()
+        sums: Dict[int, list] = {}
+        with self._lock:
+            for (key_provider, _), stats in self._stats.items():
+                if key_provider != provider:
+                    continue
+                current = int(now // stats.slot_seconds)
+                for slot in stats._slots:
+                    if slot is not None and current - slot[0] < stats.window_slots and slot[3].count:
+                        bucket = sums.setdefault(slot[0] * stats.slot_seconds, [0.0, 0])
+                        bucket[0] += slot[3].total
+                        bucket[1] += slot[3].count
+
+        current = int(now // self.slot_seconds)
+        result = []
+        for slot_id in range(current - self.window_slots + 1, current + 1):
+            bucket = sums.get(slot_id * self.slot_seconds)
+            result.append((slot_id * self.slot_seconds, bucket[0] / bucket[1] if bucket else None))
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+_default_metrics: Optional[MetricsRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Lấy registry metrics dùng chung cho toàn ứng dụng"""
+    global _default_metrics
+    if _default_metrics is None:
+        with _default_lock:
+            if _default_metrics is None:
+                _default_metrics = MetricsRegistry()
+    return _default_metrics
@@ -1,16 +1,21 @@
-import requests
 import json
 import hmac
 import hashlib
 import time
 import uuid
-from datetime import datetime
 from typing import Dict, Any, Optional
 
+from .transport import HTTPTransport, get_transport
+from .health import HealthChecker
+from .order_id import get_order_id_generator
+
 class MoMoService:
     """Service tích hợp MoMo Business API thật"""
     
-    def __init__(self):
+    def __init__(self, transport: HTTPTransport = None):
+        self.transport = transport or get_transport()
+        self.health = HealthChecker(self.transport)
+        self.order_ids = get_order_id_generator()
         self.partner_code = ""
         self.access_key = ""
         self.secret_key = ""
@@ -20,6 +25,7 @@ class MoMoService:
         
     def configure(self, partner_code: str, access_key: str, secret_key: str, sandbox: bool = True):
         """Cấu hình thông tin MoMo Business"""
+        self.health.invalidate()
         self.partner_code = partner_code
         self.access_key = access_key
         self.secret_key = secret_key
@@ -40,7 +46,7 @@ class MoMoService:
     def create_payment(self, amount: int, order_info: str, extra_data: str = "") -> Dict[str, Any]:
         """Tạo thanh toán MoMo"""
         try:
-            order_id = f"PAYOO_{int(time.time())}"
+            order_id = self.order_ids.next_id("PAYOO")
             request_id = str(uuid.uuid4())
             
             # Dữ liệu request
@@ -77,11 +83,11 @@ class MoMoService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "momo",
                 f"{self.endpoint}/create",
                 headers=headers,
-                data=json.dumps(request_data),
-                timeout=30
+                data=json.dumps(request_data)
             )
             
             if response.status_code == 200:
@@ -132,11 +138,12 @@ class MoMoService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "momo",
                 f"{self.endpoint}/query",
+                idempotent=True,
                 headers=headers,
-                data=json.dumps(request_data),
-                timeout=30
+                data=json.dumps(request_data)
             )
             
             if response.status_code == 200:
@@ -193,11 +200,11 @@ class MoMoService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "momo",
                 f"{self.endpoint}/refund",
                 headers=headers,
-                data=json.dumps(request_data),
-                timeout=30
+                data=json.dumps(request_data)
             )
             
             if response.status_code == 200:
@@ -220,24 +227,13 @@ class MoMoService:
                 "message": f"Lỗi hoàn tiền: {str(e)}"
             }
     
-    def test_connection(self) -> Dict[str, Any]:
-        """Kiểm tra kết nối API"""
-        try:
-            # Test với một order giả
-            result = self.query_payment("TEST123456")
-            return {
-                "success": True,
-                "status": "operational",
-                "message": "Kết nối MoMo API thành công",
-                "response_time": "145ms"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "status": "error",
-                "message": f"Lỗi kết nối MoMo API: {str(e)}",
-                "response_time": "timeout"
-            }
+    def test_connection(self, force: bool = False) -> Dict[str, Any]:
+        """Kiểm tra kết nối API bằng probe nhẹ (HEAD), kết quả được cache theo trạng thái provider"""
+        return self.health.check(
+            "momo",
+            self.endpoint,
+            force=force
+        )
     
     def get_payment_methods(self) -> Dict[str, Any]:
         """Lấy danh sách phương thức thanh toán"""
@@ -0,0 +1,112 @@
+import itertools
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# 20 bit: 12 bit thấp của PID + 8 bit ngẫu nhiên
+NODE_BITS = 20
+
+
+def _new_node() -> int:
+    return ((os.getpid() & 0xFFF) << 8) | random.getrandbits(8)
+
+
+class OrderIdGenerator:
+    """Sinh mã đơn hàng duy nhất, tăng dần, dùng chung cho mọi service
+
+    Giá trị lấy từ itertools.count bắt đầu tại số micro giây lúc khởi tạo: next() là thao tác
+    nguyên tử nên không cần lock, không trùng giữa các thread và luôn tăng. Chỉ khi sinh liên tục
+    hơn 1 triệu mã/giây thì giá trị mới vượt đồng hồ, nên khởi động lại vẫn không trùng mã cũ.
+    Mã node (PID + bit ngẫu nhiên, tạo lại sau fork) tách các process chạy cùng lúc.
+
+    Định dạng theo quy định provider:
+    - next_id: PREFIX + 13 hex giá trị + 5 hex node, chỉ chữ và số (MoMo orderId <= 50 ký tự)
+    - next_dated_id: yymmdd_[phần thêm_]token (ZaloPay app_trans_id/m_refund_id <= 40 ký tự)
+    - next_numeric_id: 15 chữ số = 3 số từ PID + 12 số cuối giá trị (transactionIdentifier của Visa)
+    - next_stan: 6 chữ số = 2 số từ PID + 4 số của bộ đếm riêng (systemsTraceAuditNumber của Visa),
+      không trùng trong 10.000 mã liên tiếp của một process
+    - retrieval_reference_number: ydddhh + STAN theo định dạng khuyến nghị của Visa (12 chữ số)
+
+    Hai mã số của Visa quá ngắn để chứa cả node nên KHÔNG bảo đảm duy nhất giữa các process:
+    chúng chỉ dùng PID % 1000 (hoặc % 100), nên các process chạy cùng lúc có PID liên tiếp (worker
+    vừa tạo) không trùng, nhưng hai process có PID đồng dư theo 1000 (100) vẫn có thể trùng mã.
+    """
+
+    def __init__(self, node: int = None):
+        self._counter = itertools.count(time.time_ns() // 1000)
+        self._stan_counter = itertools.count(time.time_ns() // 1000)
+        self._set_node(_new_node() if node is None else node & ((1 << NODE_BITS) - 1))
+        # Khoảng [bắt đầu, kết thúc) của ngày đang dùng làm tiền tố yymmdd
+        self._day_start = self._day_end = 0.0
+        self._day_prefix = ""
+
+    def _set_node(self, node: int):
+        self.node = node
+        self._hex_node = f"{node:05X}"
+        # Các bit cao của node là 12 bit thấp của PID (không ngẫu nhiên)
+        self._numeric_node = f"{(node >> 8) % 1000:03d}"
+        self._stan_node = f"{(node >> 8) % 100:02d}"
+
+    def reseed(self):
+        """Gọi trong process con sau fork để không trùng node với process cha"""
+        self._set_node(_new_node())
+
+    def next_value(self) -> int:
+        return next(self._counter)
+
+    def next_id(self, prefix: str = "") -> str:
+        return f"{prefix}{next(self._counter):013X}{self._hex_node}"
+
+    def next_ids(self, count: int, prefix: str = "") -> List[str]:
+        """Sinh hàng loạt (vd. tạo thanh toán theo lô)"""
+        counter, node = self._counter, self._hex_node
+        return [f"{prefix}{next(counter):013X}{node}" for _ in range(count)]
+
+    def next_numeric_id(self) -> str:
+        # 12 số cuối của giá trị micro giây chỉ lặp lại sau ~11,5 ngày
+        return f"{self._numeric_node}{next(self._counter) % 10**12:012d}"
+    
+    def next_stan(self) -> str:
+        return f"{self._stan_node}{next(self._stan_counter) % 10**4:04d}"
+    
+    @staticmethod
+    def retrieval_reference_number(stan: str, when: datetime = None) -> str:
+        """ydddhh + STAN: số cuối của năm, ngày trong năm, giờ"""
+        when = when or datetime.now()
+        return f"{when:%y}"[-1] + f"{when:%j%H}" + stan
+
+    def next_dated_id(self, *parts: str) -> str:
+        """Mã dạng yymmdd_..._token, ngày theo giờ máy lúc sinh mã"""
+        now = time.time()
+        if not self._day_start <= now < self._day_end:
+            today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+            self._day_start = today.timestamp()
+            self._day_end = (today + timedelta(days=1)).timestamp()
+            self._day_prefix = today.strftime("%y%m%d")
+        return "_".join((self._day_prefix,) + parts + (f"{next(self._counter):013X}{self._hex_node}",))
+
+
+_default_generator: Optional[OrderIdGenerator] = None
+_default_lock = threading.Lock()
+
+
+def get_order_id_generator() -> OrderIdGenerator:
+    """Lấy bộ sinh mã dùng chung cho toàn ứng dụng"""
+    global _default_generator
+    if _default_generator is None:
+        with _default_lock:
+            if _default_generator is None:
+                _default_generator = OrderIdGenerator()
+    return _default_generator
+
+
+def _reseed_after_fork():
+    if _default_generator is not None:
+        _default_generator.reseed()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
@@ -0,0 +1,148 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+DEFAULT_RETRY_COUNT = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 10.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Phương thức HTTP an toàn để gửi lại; POST chỉ gửi lại khi service đánh dấu idempotent
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Provider đang bị ngắt mạch: request bị từ chối ngay, không gửi đi"""
+
+    def __init__(self, provider: str, retry_in: float):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider.upper()} đang tạm ngưng do lỗi liên tục, thử lại sau {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """Ngắt mạch theo provider
+
+    - closed: cho request đi, đếm lỗi liên tiếp
+    - open: sau failure_threshold lỗi liên tiếp, từ chối ngay trong reset_timeout giây
+    - half_open: hết reset_timeout thì cho một request thử; thành công thì đóng lại, lỗi thì mở tiếp
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> float:
+        """Trả về 0 nếu được gửi request, ngược lại là số giây còn lại trước khi thử lại"""
+        with self._lock:
+            if self.state == "closed":
+                return 0
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+                self._trial_in_flight = False
+
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return 0
+            return max(remaining, 0.1)
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def release(self):
+        """Request thử kết thúc mà không có kết quả (lỗi không phải của provider): cho request sau thử lại"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+
+class RetryPolicy:
+    """Quyết định có gửi lại không và chờ bao lâu (exponential backoff + full jitter)"""
+
+    def __init__(self, retry_count: int = DEFAULT_RETRY_COUNT,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        self.retry_count = max(0, retry_count)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Thời gian chờ trước lần thử attempt (1, 2, ...): ngẫu nhiên trong [0, base * 2^(attempt-1)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def retry_after(response: requests.Response) -> Optional[float]:
+        """Đọc header Retry-After (số giây hoặc HTTP date)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def is_retryable_error(error: Exception, idempotent: bool) -> bool:
+        """Timeout/lỗi kết nối được gửi lại nếu idempotent
+
+        Với request không idempotent (tạo thanh toán, hoàn tiền...) chỉ gửi lại khi chắc chắn
+        request chưa tới server: timeout hoặc bị từ chối lúc mở kết nối.
+        """
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(reason, NewConnectionError):
+            return True
+        if not idempotent:
+            return False
+        return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+    @staticmethod
+    def is_retryable_response(response: requests.Response, idempotent: bool) -> bool:
+        """5xx gửi lại nếu idempotent; 429 nghĩa là server từ chối chưa xử lý nên luôn gửi lại được"""
+        if response.status_code == 429:
+            return True
+        return idempotent and response.status_code in RETRYABLE_STATUS
+
+    def delay(self, attempt: int, response: requests.Response = None) -> float:
+        """Thời gian chờ trước lần thử attempt; ưu tiên Retry-After của server (giới hạn max_delay)"""
+        if response is not None:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+        return self.backoff(attempt)
@@ -0,0 +1,334 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+DEFAULT_INITIAL_INTERVAL = 3.0
+DEFAULT_MAX_INTERVAL = 120.0
+DEFAULT_BACKOFF_FACTOR = 1.6
+DEFAULT_MAX_AGE = 30 * 60
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+DEFAULT_POLL_WORKERS = 8
+
+FINAL_STATUSES = {"success", "failed", "expired"}
+
+# resultCode MoMo: 0 thành công; 1000/7000/7002/9000 đang chờ người dùng/đang xử lý
+MOMO_PENDING_CODES = {1000, 7000, 7002, 9000}
+VISA_SUCCESS_STATUSES = {"approved", "completed", "success", "settled"}
+VISA_FAILED_STATUSES = {"declined", "failed", "rejected", "reversed", "cancelled"}
+
+
+def classify_momo(result: Dict[str, Any]) -> Optional[str]:
+    """Kết quả MoMoService.query_payment -> pending/success/failed (None nếu truy vấn lỗi)"""
+    if not result.get("success") or result.get("result_code") is None:
+        return None
+    code = int(result["result_code"])
+    if code == 0:
+        return "success"
+    return "pending" if code in MOMO_PENDING_CODES else "failed"
+
+
+def classify_zalopay(result: Dict[str, Any]) -> Optional[str]:
+    """Kết quả ZaloPayService.query_order: return_code 1 thành công, 2 thất bại, 3 đang xử lý"""
+    if not result.get("success") or result.get("return_code") is None:
+        return None
+    if result.get("is_processing"):
+        return "pending"
+    return {1: "success", 2: "failed"}.get(int(result["return_code"]), "pending")
+
+
+def classify_visa(result: Dict[str, Any]) -> Optional[str]:
+    """Kết quả VisaService.query_transaction theo transaction_status"""
+    if not result.get("success"):
+        return None
+    status = str(result.get("transaction_status") or "").strip().lower()
+    if status in VISA_SUCCESS_STATUSES:
+        return "success"
+    if status in VISA_FAILED_STATUSES:
+        return "failed"
+    return "pending"
+
+
+class TokenBucket:
+    """Hạn mức request theo provider: rate request/giây, tối đa burst request dồn"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Số giây tới khi có token (0 nếu có sẵn), không lấy token"""
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> float:
+        """Lấy một token; trả về 0 nếu được, ngược lại số giây phải chờ"""
+        wait_time = self.wait_time()
+        if not wait_time:
+            self.tokens -= 1
+        return wait_time
+
+
+class _PendingOrder:
+    __slots__ = ("provider", "order_id", "transaction_id", "status", "interval", "attempts",
+                 "next_at", "expires_at", "version")
+
+    def __init__(self, provider: str, order_id: str, transaction_id: str, interval: float, expires_at: float):
+        self.provider = provider
+        self.order_id = order_id
+        self.transaction_id = transaction_id
+        self.status = "pending"
+        self.interval = interval
+        self.attempts = 0
+        self.next_at = 0.0
+        self.expires_at = expires_at
+        self.version = 0
+
+
+class PaymentStatusPoller:
+    """Theo dõi trạng thái các đơn thanh toán đang chờ (MoMo/ZaloPay/Visa)
+
+    - Đơn chờ nằm trong heap (một heap mỗi provider) theo thời điểm hỏi tiếp; một thread lập lịch
+      ngủ tới đơn gần nhất, nên chi phí mỗi lần hỏi là O(log n) dù có hàng chục nghìn đơn
+    - Mỗi đơn tự giãn khoảng hỏi (initial_interval * backoff_factor^n, tối đa max_interval, có jitter)
+    - Mỗi provider có TokenBucket riêng: hết hạn mức thì heap của provider đó đứng chờ token,
+      các provider khác vẫn chạy
+    - Dừng khi tới trạng thái cuối (success/failed) hoặc quá max_age (expired); đơn luôn được hỏi
+      ít nhất một lần trước khi expired, kể cả khi track với max_age=0 (kiểm tra lần cuối)
+    - Listener nhận (transaction_id, provider, status, result) mỗi khi trạng thái đổi; được gọi
+      từ thread nền
+    """
+
+    def __init__(self, initial_interval: float = DEFAULT_INITIAL_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 max_age: float = DEFAULT_MAX_AGE,
+                 max_workers: int = DEFAULT_POLL_WORKERS):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.max_age = max_age
+        self.max_workers = max_workers
+
+        self._providers: Dict[str, Dict[str, Any]] = {}
+        self._orders: Dict[str, _PendingOrder] = {}
+        self._heaps: Dict[str, List[tuple]] = {}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._listeners: List[Callable[[str, str, str, Dict[str, Any]], None]] = []
+        self._stats = {"polls": 0, "errors": 0, "throttled": 0, "success": 0, "failed": 0, "expired": 0}
+
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def register_provider(self, provider: str, query: Callable[[str], Dict[str, Any]],
+                          classify: Callable[[Dict[str, Any]], Optional[str]],
+                          rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """query(order_id) gọi API truy vấn; classify(result) -> pending/success/failed hoặc None nếu lỗi"""
+        with self._cond:
+            self._providers[provider] = {"query": query, "classify": classify, "bucket": TokenBucket(rate, burst)}
+            self._heaps.setdefault(provider, [])
+
+    def add_listener(self, listener: Callable[[str, str, str, Dict[str, Any]], None]):
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def track(self, provider: str, order_id: str, transaction_id: str = None,
+              delay: float = None, max_age: float = None) -> bool:
+        """Bắt đầu theo dõi một đơn; order_id là mã dùng để truy vấn provider"""
+        if provider not in self._providers or not order_id:
+            return False
+
+        transaction_id = transaction_id or order_id
+        now = time.monotonic()
+        with self._cond:
+            if transaction_id in self._orders:
+                return True
+            order = _PendingOrder(provider, order_id, transaction_id, self.initial_interval,
+                                  now + (self.max_age if max_age is None else max_age))
+            self._orders[transaction_id] = order
+            self._schedule(order, now + (self.initial_interval if delay is None else delay))
+        return True
+
+    def untrack(self, transaction_id: str) -> bool:
+        with self._cond:
+            # Entry trong heap bị bỏ qua khi tới lượt (không còn trong _orders)
+            return self._orders.pop(transaction_id, None) is not None
+
+    def poll_now(self, transaction_id: str) -> bool:
+        """Hỏi lại ngay một đơn (vd. người dùng bấm kiểm tra) và đặt lại backoff"""
+        with self._cond:
+            order = self._orders.get(transaction_id)
+            if order is None:
+                return False
+            order.interval = self.initial_interval
+            self._schedule(order, time.monotonic())
+        return True
+
+    def _schedule(self, order: _PendingOrder, when: float):
+        """Gọi khi đang giữ _cond; version tăng để entry cũ trong heap bị bỏ qua"""
+        order.version += 1
+        order.next_at = when
+        heapq.heappush(self._heaps[order.provider], (when, next(self._seq), order, order.version))
+        self._cond.notify()
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="status-poll")
+            self._thread = threading.Thread(target=self._run, name="status-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                order = self._next_due()
+                if order is None:
+                    continue
+                executor = self._executor
+
+            try:
+                executor.submit(self._poll, order)
+            except RuntimeError:
+                return
+
+    def _next_due(self) -> Optional[_PendingOrder]:
+        """Chờ (đang giữ _cond) tới khi có đơn đến hạn và provider còn hạn mức
+
+        Trả về None để vòng lặp kiểm tra lại sau mỗi lần chờ.
+        """
+        if self._in_flight >= self.max_workers:
+            # Đủ worker đang chạy: chờ một request xong
+            self._cond.wait(0.5)
+            return None
+
+        now = time.monotonic()
+        ready_at, ready_provider = None, None
+        for provider, heap in self._heaps.items():
+            head = self._head(heap, now)
+            if head is None:
+                continue
+            provider_ready = max(head[0], now + self._providers[provider]["bucket"].wait_time())
+            if ready_at is None or provider_ready < ready_at:
+                ready_at, ready_provider = provider_ready, provider
+
+        if ready_at is None:
+            self._cond.wait()
+            return None
+        if ready_at > now:
+            if ready_at > self._heaps[ready_provider][0][0]:
+                self._stats["throttled"] += 1
+            self._cond.wait(ready_at - now)
+            return None
+
+        _, _, order, _ = heapq.heappop(self._heaps[ready_provider])
+        self._providers[ready_provider]["bucket"].take()
+        self._in_flight += 1
+        return order
+
+    def _head(self, heap: List[tuple], now: float) -> Optional[tuple]:
+        """Entry hợp lệ đầu heap; bỏ entry cũ (đã lên lịch lại/bỏ theo dõi) và đơn quá hạn"""
+        while heap:
+            when, _, order, version = heap[0]
+            if version != order.version or self._orders.get(order.transaction_id) is not order:
+                heapq.heappop(heap)
+            elif now >= order.expires_at and order.attempts:
+                heapq.heappop(heap)
+                self._finish(order, "expired")
+                # Listener chạy trên worker để không giữ lock
+                self._executor.submit(self._notify, list(self._listeners), order, "expired", {})
+            else:
+                return heap[0]
+        return None
+
+    def _poll(self, order: _PendingOrder):
+        provider = self._providers[order.provider]
+        try:
+            result = provider["query"](order.order_id)
+            status = provider["classify"](result)
+        except Exception as e:
+            result, status = {"success": False, "message": str(e)}, None
+
+        changed = False
+        with self._cond:
+            self._in_flight -= 1
+            self._stats["polls"] += 1
+            if self._orders.get(order.transaction_id) is not order:
+                self._cond.notify()
+                return
+
+            order.attempts += 1
+            if status is None:
+                self._stats["errors"] += 1
+            elif status in FINAL_STATUSES:
+                self._finish(order, status)
+                changed = True
+            elif status != order.status:
+                order.status = status
+                changed = True
+
+            if order.status not in FINAL_STATUSES:
+                order.interval = min(order.interval * self.backoff_factor, self.max_interval)
+                self._schedule(order, time.monotonic() + order.interval * random.uniform(0.9, 1.1))
+            listeners = list(self._listeners) if changed else []
+
+        self._notify(listeners, order, status, result)
+
+    def _finish(self, order: _PendingOrder, status: str):
+        """Gọi khi đang giữ _cond: bỏ đơn khỏi danh sách theo dõi"""
+        self._orders.pop(order.transaction_id, None)
+        order.status = status
+        self._stats[status] += 1
+        self._cond.notify()
+
+    def _notify(self, listeners, order: _PendingOrder, status: str, result: Dict[str, Any]):
+        for listener in listeners:
+            try:
+                listener(order.transaction_id, order.provider, status, result)
+            except Exception as e:
+                print(f"Lỗi xử lý trạng thái đơn {order.transaction_id}: {e}")
+
+    def pending(self, provider: str = None) -> int:
+        with self._cond:
+            if provider is None:
+                return len(self._orders)
+            return sum(1 for order in self._orders.values() if order.provider == provider)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            by_provider: Dict[str, int] = {}
+            for order in self._orders.values():
+                by_provider[order.provider] = by_provider.get(order.provider, 0) + 1
+            stats.update({"pending": len(self._orders), "by_provider": by_provider, "in_flight": self._in_flight})
+        return stats
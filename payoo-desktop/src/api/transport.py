@@ -0,0 +1,282 @@
+import ssl
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import MetricsRegistry, get_metrics
+from .hedging import Hedger
+from .retry import CircuitBreaker, CircuitOpenError, RetryPolicy, IDEMPOTENT_METHODS
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONCURRENCY = 5
+
+
+class ClientCertAdapter(HTTPAdapter):
+    """Adapter nạp chứng chỉ client (mTLS) một lần và dùng lại cho mọi kết nối"""
+
+    def __init__(self, cert_path: str, key_path: str = "", **kwargs):
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.load_cert_chain(cert_path, key_path or None)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+
+class HTTPTransport:
+    """Tầng HTTP dùng chung cho các service: giữ kết nối keep-alive theo từng host"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 provider_timeouts: Dict[str, float] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 metrics: MetricsRegistry = None,
+                 retry_policy: RetryPolicy = None):
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.provider_timeouts = dict(provider_timeouts or {})
+        self.concurrency = concurrency
+        self.metrics = metrics or get_metrics()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedger = Hedger(self.metrics)
+        self.hedging_enabled = False
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._sessions: Dict[Tuple[str, str, Optional[Tuple[str, str]]], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, timeout: float = None, pool_connections: int = None,
+                  pool_maxsize: int = None, provider_timeouts: Dict[str, float] = None,
+                  concurrency: int = None, retry_count: int = None,
+                  hedge_requests: bool = None, hedge_max_ratio: float = None):
+        """Cập nhật cấu hình; thay đổi kích thước pool sẽ tạo lại các session"""
+        if timeout is not None:
+            self.timeout = timeout
+        if retry_count is not None:
+            self.retry_policy.retry_count = max(0, retry_count)
+        if hedge_requests is not None:
+            self.hedging_enabled = bool(hedge_requests)
+        if hedge_max_ratio is not None:
+            self.hedger.max_ratio = max(0.0, hedge_max_ratio)
+        if concurrency is not None:
+            self.concurrency = max(1, concurrency)
+        if provider_timeouts is not None:
+            self.provider_timeouts = dict(provider_timeouts)
+
+        pool_changed = (
+            (pool_connections is not None and pool_connections != self.pool_connections) or
+            (pool_maxsize is not None and pool_maxsize != self.pool_maxsize)
+        )
+        if pool_connections is not None:
+            self.pool_connections = pool_connections
+        if pool_maxsize is not None:
+            self.pool_maxsize = pool_maxsize
+        if pool_changed:
+            self.close()
+
+    def get_timeout(self, provider: str) -> float:
+        """Lấy timeout cho provider (mặc định theo api_settings.timeout)"""
+        return self.provider_timeouts.get(provider, self.timeout)
+
+    def _create_session(self, cert: Optional[Tuple[str, str]]) -> requests.Session:
+        """Tạo session mới với connection pool đã cấu hình"""
+        session = requests.Session()
+        adapter_kwargs = {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "max_retries": 0
+        }
+
+        if cert:
+            adapter = ClientCertAdapter(cert[0], cert[1], **adapter_kwargs)
+        else:
+            adapter = HTTPAdapter(**adapter_kwargs)
+
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_session(self, url: str, cert: Optional[Tuple[str, str]] = None) -> requests.Session:
+        """Lấy session theo host (và chứng chỉ client nếu có)"""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc, cert)
+
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = self._create_session(cert)
+                    self._sessions[key] = session
+        return session
+
+    @staticmethod
+    def operation_name(url: str) -> str:
+        """Tên operation mặc định: đoạn cuối của path (vd. .../bills/lookup -> lookup)"""
+        path = urlsplit(url).path.rstrip("/")
+        return path.rsplit("/", 1)[-1] or "/"
+
+    def get_breaker(self, provider: str) -> CircuitBreaker:
+        """Circuit breaker của provider (tạo khi cần)"""
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(provider, CircuitBreaker())
+        return breaker
+
+    def request(self, provider: str, method: str, url: str,
+                cert: Optional[Tuple[str, str]] = None, timeout: float = None,
+                operation: str = None, idempotent: bool = None, retries: int = None,
+                use_breaker: bool = True, hedge: bool = False, **kwargs) -> requests.Response:
+        """Gửi request qua session keep-alive của host tương ứng
+
+        - Timeout, lỗi kết nối, 5xx và 429 được gửi lại tối đa retries lần (mặc định
+          api_settings.retry_count) với backoff + jitter hoặc theo Retry-After
+        - idempotent mặc định theo phương thức (POST là không); request không idempotent
+          chỉ được gửi lại khi chắc chắn chưa tới server
+        - Provider lỗi liên tục bị ngắt mạch: request bị từ chối ngay bằng CircuitOpenError
+        - hedge=True (chỉ với request idempotent, khi bật api_settings.hedge_requests): quá p95
+          chưa có phản hồi thì gửi thêm một bản, lấy phản hồi về trước
+        """
+        operation = operation or self.operation_name(url)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if retries is None:
+            retries = self.retry_policy.retry_count
+        breaker = self.get_breaker(provider) if use_breaker else None
+        hedge = hedge and idempotent and self.hedging_enabled
+
+        def send() -> requests.Response:
+            return self._send(provider, operation, method, url, cert, timeout, **kwargs)
+
+        attempt = 0
+        while True:
+            if breaker is not None:
+                wait = breaker.allow()
+                if wait:
+                    raise CircuitOpenError(provider, wait)
+
+            try:
+                response = self.hedger.call(provider, operation, send) if hedge else send()
+            except requests.exceptions.RequestException as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt < retries and self.retry_policy.is_retryable_error(e, idempotent):
+                    attempt += 1
+                    time.sleep(self.retry_policy.delay(attempt))
+                    continue
+                raise
+            except BaseException:
+                # Lỗi khác (cert sai, KeyboardInterrupt...) không ghi nhận kết quả: nếu đây là
+                # request thử lúc half-open thì phải trả lượt thử, nếu không breaker kẹt mãi
+                if breaker is not None:
+                    breaker.release()
+                raise
+
+            if breaker is not None:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            if attempt < retries and self.retry_policy.is_retryable_response(response, idempotent):
+                attempt += 1
+                delay = self.retry_policy.delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                continue
+            return response
+
+    def _send(self, provider: str, operation: str, method: str, url: str,
+              cert: Optional[Tuple[str, str]], timeout: Optional[float], **kwargs) -> requests.Response:
+        """Gửi một lần và ghi nhận độ trễ/kết quả vào metrics"""
+        session = self.get_session(url, cert)
+        start = time.perf_counter()
+        try:
+            response = session.request(
+                method,
+                url,
+                timeout=timeout if timeout is not None else self.get_timeout(provider),
+                **kwargs
+            )
+        except requests.exceptions.Timeout:
+            self.metrics.record(provider, operation, (time.perf_counter() - start) * 1000, False, "timeout")
+            raise
+        except requests.exceptions.ConnectionError:
+            self.metrics.record(provider, operation, (time.perf_counter() - start) * 1000, False, "connection")
+            raise
+        except Exception:
+            self.metrics.record(provider, operation, (time.perf_counter() - start) * 1000, False, "error")
+            raise
+
+        # 4xx là lỗi của request, provider vẫn phục vụ; 5xx và 429 tính là lỗi phía provider
+        error = None
+        if response.status_code >= 500:
+            error = "http_5xx"
+        elif response.status_code == 429:
+            error = "rate_limit"
+        self.metrics.record(provider, operation, (time.perf_counter() - start) * 1000, error is None, error)
+        return response
+
+    def post(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """Gửi POST request"""
+        return self.request(provider, "POST", url, **kwargs)
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """Gửi GET request"""
+        return self.request(provider, "GET", url, **kwargs)
+
+    def close(self):
+        """Đóng tất cả session và connection pool"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+        self.hedger.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Lấy transport dùng chung cho toàn ứng dụng"""
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+def configure_transport(api_settings: Dict[str, Any]) -> HTTPTransport:
+    """Áp dụng api_settings (timeout, retry_count, pool_size, concurrent_requests...) cho transport dùng chung"""
+    transport = get_transport()
+    pool_size = api_settings.get("pool_size")
+    concurrency = api_settings.get("concurrent_requests")
+
+    # Pool phải đủ chỗ cho số request đồng thời, nếu không kết nối sẽ bị đóng/mở lại
+    if pool_size is not None and concurrency is not None:
+        pool_size = max(pool_size, concurrency)
+    elif concurrency is not None:
+        pool_size = max(transport.pool_maxsize, concurrency)
+
+    transport.configure(
+        timeout=api_settings.get("timeout"),
+        pool_maxsize=pool_size,
+        provider_timeouts=api_settings.get("provider_timeouts"),
+        concurrency=concurrency,
+        retry_count=api_settings.get("retry_count"),
+        hedge_requests=api_settings.get("hedge_requests"),
+        hedge_max_ratio=api_settings.get("hedge_max_ratio")
+    )
+    return transport
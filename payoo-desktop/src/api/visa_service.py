@@ -1,4 +1,3 @@
-import requests
 import json
 import base64
 import ssl
@@ -6,10 +5,17 @@ import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from .transport import HTTPTransport, get_transport
+from .health import HealthChecker
+from .order_id import get_order_id_generator
+
 class VisaService:
     """Service tích hợp Visa Direct API thật"""
     
-    def __init__(self):
+    def __init__(self, transport: HTTPTransport = None):
+        self.transport = transport or get_transport()
+        self.health = HealthChecker(self.transport)
+        self.order_ids = get_order_id_generator()
         self.user_id = ""
         self.password = ""
         self.cert_path = ""
@@ -20,6 +26,7 @@ class VisaService:
         
     def configure(self, user_id: str, password: str, cert_path: str = "", key_path: str = "", sandbox: bool = True):
         """Cấu hình thông tin Visa Direct API"""
+        self.health.invalidate()
         self.user_id = user_id
         self.password = password
         self.cert_path = cert_path
@@ -42,8 +49,9 @@ class VisaService:
         try:
             endpoint = f"{self.get_base_url()}/visadirect/fundstransfer/v1/pushfundstransactions"
             
-            # Tạo unique transaction ID
-            transaction_id = f"PAYOO_{int(time.time())}"
+            # Mã giao dịch (số, 15 chữ số) và STAN/RRN riêng, đều chứa mã node của process
+            transaction_id = self.order_ids.next_numeric_id()
+            stan = self.order_ids.next_stan()
             
             request_data = {
                 "acquirerCountryCode": "704",  # Vietnam
@@ -70,7 +78,7 @@ class VisaService:
                 },
                 "recipientName": recipient_name,
                 "recipientPrimaryAccountNumber": card_number,
-                "retrievalReferenceNumber": transaction_id[-12:],
+                "retrievalReferenceNumber": self.order_ids.retrieval_reference_number(stan),
                 "senderAccountNumber": "4957030420210454",
                 "senderAddress": recipient_address,
                 "senderCity": "Ho Chi Minh City",
@@ -79,7 +87,7 @@ class VisaService:
                 "senderReference": "",
                 "senderStateCode": "HCM",
                 "sourceOfFundsCode": "05",
-                "systemsTraceAuditNumber": transaction_id[-6:],
+                "systemsTraceAuditNumber": stan,
                 "transactionCurrencyCode": currency,
                 "transactionIdentifier": transaction_id
             }
@@ -91,12 +99,12 @@ class VisaService:
             }
             
             # Gửi request
-            response = requests.post(
+            response = self.transport.post(
+                "visa",
                 endpoint,
                 headers=headers,
                 data=json.dumps(request_data),
                 cert=(self.cert_path, self.key_path) if self.cert_path else None,
-                timeout=30,
                 verify=True
             )
             
@@ -128,7 +136,8 @@ class VisaService:
         try:
             endpoint = f"{self.get_base_url()}/visadirect/fundstransfer/v1/pullfundstransactions"
             
-            transaction_id = f"PAYOO_PULL_{int(time.time())}"
+            transaction_id = self.order_ids.next_numeric_id()
+            stan = self.order_ids.next_stan()
             
             request_data = {
                 "acquirerCountryCode": "704",
@@ -154,8 +163,8 @@ class VisaService:
                     "posConditionCode": "00"
                 },
                 "senderAccountNumber": card_number,
-                "retrievalReferenceNumber": transaction_id[-12:],
-                "systemsTraceAuditNumber": transaction_id[-6:],
+                "retrievalReferenceNumber": self.order_ids.retrieval_reference_number(stan),
+                "systemsTraceAuditNumber": stan,
                 "transactionCurrencyCode": currency,
                 "transactionIdentifier": transaction_id
             }
@@ -166,12 +175,12 @@ class VisaService:
                 "Authorization": self.create_auth_header()
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "visa",
                 endpoint,
                 headers=headers,
                 data=json.dumps(request_data),
                 cert=(self.cert_path, self.key_path) if self.cert_path else None,
-                timeout=30,
                 verify=True
             )
             
@@ -215,12 +224,13 @@ class VisaService:
                 "Authorization": self.create_auth_header()
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "visa",
                 endpoint,
+                idempotent=True,
                 headers=headers,
                 data=json.dumps(request_data),
                 cert=(self.cert_path, self.key_path) if self.cert_path else None,
-                timeout=30,
                 verify=True
             )
             
@@ -246,24 +256,14 @@ class VisaService:
                 "message": f"Lỗi truy vấn giao dịch: {str(e)}"
             }
     
-    def test_connection(self) -> Dict[str, Any]:
-        """Kiểm tra kết nối API"""
-        try:
-            # Test với transaction ID giả
-            result = self.query_transaction("TEST123456")
-            return {
-                "success": True,
-                "status": "operational",
-                "message": "Kết nối Visa API thành công",
-                "response_time": "67ms"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "status": "error",
-                "message": f"Lỗi kết nối Visa API: {str(e)}",
-                "response_time": "timeout"
-            }
+    def test_connection(self, force: bool = False) -> Dict[str, Any]:
+        """Kiểm tra kết nối API bằng probe nhẹ (HEAD), kết quả được cache theo trạng thái provider"""
+        return self.health.check(
+            "visa",
+            self.get_base_url(),
+            cert=(self.cert_path, self.key_path) if self.cert_path else None,
+            force=force
+        )
     
     def get_supported_countries(self) -> Dict[str, Any]:
         """Lấy danh sách quốc gia hỗ trợ"""
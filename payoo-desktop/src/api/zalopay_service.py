@@ -1,16 +1,21 @@
-import requests
 import json
 import hmac
 import hashlib
 import time
 import uuid
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from .transport import HTTPTransport, get_transport
+from .health import HealthChecker
+from .order_id import get_order_id_generator
 
 class ZaloPayService:
     """Service tích hợp ZaloPay Business API thật"""
     
-    def __init__(self):
+    def __init__(self, transport: HTTPTransport = None):
+        self.transport = transport or get_transport()
+        self.health = HealthChecker(self.transport)
+        self.order_ids = get_order_id_generator()
         self.app_id = ""
         self.key1 = ""
         self.key2 = ""
@@ -19,6 +24,7 @@ class ZaloPayService:
         
     def configure(self, app_id: str, key1: str, key2: str, sandbox: bool = True):
         """Cấu hình thông tin ZaloPay Business"""
+        self.health.invalidate()
         self.app_id = app_id
         self.key1 = key1
         self.key2 = key2
@@ -36,10 +42,11 @@ class ZaloPayService:
             hashlib.sha256
         ).hexdigest()
     
-    def create_order(self, amount: int, description: str, user_info: Dict[str, Any] = None) -> Dict[str, Any]:
+    def create_order(self, amount: int, description: str, user_info: Dict[str, Any] = None,
+                     bank_code: str = "") -> Dict[str, Any]:
         """Tạo đơn hàng ZaloPay"""
         try:
-            app_trans_id = f"{datetime.now().strftime('%y%m%d')}_{int(time.time())}"
+            app_trans_id = self.order_ids.next_dated_id()
             
             # Embed data
             embed_data = {
@@ -70,7 +77,7 @@ class ZaloPayService:
                 "embed_data": json.dumps(embed_data),
                 "amount": amount,
                 "description": description,
-                "bank_code": "",
+                "bank_code": bank_code,
                 "callback_url": self.callback_url
             }
             
@@ -79,10 +86,10 @@ class ZaloPayService:
             order_data["mac"] = self.create_signature(signature_data, self.key1)
             
             # Gửi request
-            response = requests.post(
+            response = self.transport.post(
+                "zalopay",
                 f"{self.endpoint}/create",
-                data=order_data,
-                timeout=30
+                data=order_data
             )
             
             if response.status_code == 200:
@@ -128,10 +135,11 @@ class ZaloPayService:
                 "mac": mac
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "zalopay",
                 f"{self.endpoint}/query",
-                data=request_data,
-                timeout=30
+                idempotent=True,
+                data=request_data
             )
             
             if response.status_code == 200:
@@ -162,8 +170,9 @@ class ZaloPayService:
     def refund_order(self, zp_trans_id: str, amount: int, description: str = "") -> Dict[str, Any]:
         """Hoàn tiền đơn hàng"""
         try:
-            m_refund_id = f"{datetime.now().strftime('%y%m%d')}_{int(time.time())}"
+            m_refund_id = self.order_ids.next_dated_id(str(self.app_id))
             timestamp = int(time.time() * 1000)
+            description = description or f"Hoàn tiền {zp_trans_id}"
             
             # Tạo signature
             signature_data = f"{self.app_id}|{zp_trans_id}|{amount}|{description}|{timestamp}"
@@ -173,16 +182,16 @@ class ZaloPayService:
                 "app_id": self.app_id,
                 "zp_trans_id": zp_trans_id,
                 "amount": amount,
-                "description": description or f"Hoàn tiền {zp_trans_id}",
+                "description": description,
                 "timestamp": timestamp,
                 "m_refund_id": m_refund_id,
                 "mac": mac
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "zalopay",
                 f"{self.endpoint}/refund",
-                data=request_data,
-                timeout=30
+                data=request_data
             )
             
             if response.status_code == 200:
@@ -212,9 +221,9 @@ class ZaloPayService:
     def get_bank_list(self) -> Dict[str, Any]:
         """Lấy danh sách ngân hàng hỗ trợ"""
         try:
-            response = requests.get(
-                f"{self.endpoint}/getbanklist",
-                timeout=30
+            response = self.transport.get(
+                "zalopay",
+                f"{self.endpoint}/getbanklist"
             )
             
             if response.status_code == 200:
@@ -237,10 +246,29 @@ class ZaloPayService:
                 "message": f"Lỗi lấy danh sách ngân hàng: {str(e)}"
             }
     
+    @staticmethod
+    def normalize_banks(banks: Any) -> List[Dict[str, str]]:
+        """Chuẩn hóa danh sách ngân hàng về [{"code", "name"}]
+
+        API trả về list hoặc dict {pmcid: [bank, ...]}; bỏ trùng theo bankcode.
+        """
+        if isinstance(banks, dict):
+            banks = [bank for group in banks.values() for bank in (group or [])]
+
+        result = []
+        seen = set()
+        for bank in banks or []:
+            code = bank.get("bankcode") or bank.get("code")
+            if not code or code in seen:
+                continue
+            seen.add(code)
+            result.append({"code": code, "name": bank.get("name") or bank.get("bankname") or code})
+        return result
+    
     def quick_pay(self, amount: int, payment_code: str) -> Dict[str, Any]:
         """Thanh toán nhanh"""
         try:
-            app_trans_id = f"{datetime.now().strftime('%y%m%d')}_{int(time.time())}"
+            app_trans_id = self.order_ids.next_dated_id()
             
             # Tạo signature
             signature_data = f"{self.app_id}|{app_trans_id}|{amount}|{payment_code}"
@@ -254,10 +282,10 @@ class ZaloPayService:
                 "mac": mac
             }
             
-            response = requests.post(
+            response = self.transport.post(
+                "zalopay",
                 f"{self.endpoint}/quickpay",
-                data=request_data,
-                timeout=30
+                data=request_data
             )
             
             if response.status_code == 200:
@@ -283,24 +311,13 @@ class ZaloPayService:
                 "message": f"Lỗi thanh toán nhanh: {str(e)}"
             }
     
-    def test_connection(self) -> Dict[str, Any]:
-        """Kiểm tra kết nối API"""
-        try:
-            # Test với app_trans_id giả
-            result = self.query_order("TEST123456")
-            return {
-                "success": True,
-                "status": "operational",
-                "message": "Kết nối ZaloPay API thành công",
-                "response_time": "234ms"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "status": "error",
-                "message": f"Lỗi kết nối ZaloPay API: {str(e)}",
-                "response_time": "timeout"
-            }
+    def test_connection(self, force: bool = False) -> Dict[str, Any]:
+        """Kiểm tra kết nối API bằng probe nhẹ (HEAD), kết quả được cache theo trạng thái provider"""
+        return self.health.check(
+            "zalopay",
+            self.endpoint,
+            force=force
+        )
     
     def get_payment_methods(self) -> Dict[str, Any]:
         """Lấy danh sách phương thức thanh toán"""
@@ -1,16 +1,28 @@
 # GUI Components Module
-from .bill_lookup_frame import BillLookupFrame
-from .payment_frame import PaymentFrame
-from .admin_frame import AdminFrame
-from .history_frame import HistoryFrame
-from .settings_frame import SettingsFrame
-from .status_frame import StatusFrame
+# Các frame chỉ được import khi dùng tới (PEP 562): mở một tab không kéo theo module của tab khác
+import importlib
 
-__all__ = [
-    "BillLookupFrame",
-    "PaymentFrame",
-    "AdminFrame",
-    "HistoryFrame",
-    "SettingsFrame",
-    "StatusFrame"
-]
\ No newline at end of file
+_EXPORTS = {
+    "BillLookupFrame": ".bill_lookup_frame",
+    "PaymentFrame": ".payment_frame",
+    "AdminFrame": ".admin_frame",
+    "HistoryFrame": ".history_frame",
+    "SettingsFrame": ".settings_frame",
+    "StatusFrame": ".status_frame",
+    "VirtualTable": ".virtual_table"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,6 +4,8 @@ import json
 import threading
 from datetime import datetime
 
+from ..api.transport import configure_transport
+
 class AdminFrame:
     """Frame quản trị hệ thống"""
     
@@ -348,13 +350,13 @@ class AdminFrame:
         def test_thread():
             try:
                 if provider == "momo":
-                    result = self.app.momo_service.test_connection()
+                    result = self.app.momo_service.test_connection(force=True)
                 elif provider == "bidv":
-                    result = self.app.bidv_service.test_connection()
+                    result = self.app.bidv_service.test_connection(force=True)
                 elif provider == "zalopay":
-                    result = self.app.zalopay_service.test_connection()
+                    result = self.app.zalopay_service.test_connection(force=True)
                 elif provider == "visa":
-                    result = self.app.visa_service.test_connection()
+                    result = self.app.visa_service.test_connection(force=True)
                 else:
                     result = {"success": False, "message": "Provider không hỗ trợ"}
                 
@@ -447,15 +449,18 @@ class AdminFrame:
             settings = {
                 "theme": self.theme_combo.get(),
                 "language": self.lang_combo.get(),
-                "auto_save": self.auto_save_checkbox.get(),
-                "timeout": int(self.timeout_entry.get() or 30),
-                "retry_count": int(self.retry_entry.get() or 3)
+                "auto_save": self.auto_save_checkbox.get()
             }
             
             # Save to config manager
             for key, value in settings.items():
                 self.app.config_manager.set_setting(f"app_settings.{key}", value)
             
+            # Timeout và retry thuộc api_settings (được đọc lại khi load và áp dụng cho transport)
+            self.app.config_manager.set_setting("api_settings.timeout", int(self.timeout_entry.get() or 30))
+            self.app.config_manager.set_setting("api_settings.retry_count", int(self.retry_entry.get() or 3))
+            configure_transport(self.app.config_manager.get_setting("api_settings", {}))
+            
             self.app.show_message("Thành công", "Đã lưu cài đặt hệ thống", "success")
             
         except Exception as e:
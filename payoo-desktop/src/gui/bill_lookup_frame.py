@@ -1,9 +1,10 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import threading
 import json
 from datetime import datetime
 
+
 class BillLookupFrame:
     """Frame tra cứu hóa đơn"""
     
@@ -100,6 +101,20 @@ class BillLookupFrame:
         )
         search_customer_button.pack(side="left", padx=20)
         
+        # Bulk lookup from Excel
+        bulk_frame = ctk.CTkFrame(search_frame)
+        bulk_frame.pack(fill="x", padx=20, pady=10)
+        
+        ctk.CTkLabel(bulk_frame, text="Tra cứu hàng loạt từ file Excel/CSV:", font=ctk.CTkFont(size=12, weight="bold")).pack(side="left", padx=5)
+        
+        self.bulk_button = ctk.CTkButton(
+            bulk_frame,
+            text="📂 Chọn file",
+            command=self.search_from_file,
+            width=100
+        )
+        self.bulk_button.pack(side="left", padx=5)
+        
         # Progress bar
         self.progress_bar = ctk.CTkProgressBar(search_frame, width=400)
         self.progress_bar.pack(pady=10)
@@ -161,6 +176,103 @@ class BillLookupFrame:
         thread = threading.Thread(target=self._search_customer_thread, args=(customer_id, bill_type, provider))
         thread.start()
     
+    def search_from_file(self):
+        """Tra cứu hàng loạt từ file hóa đơn"""
+        input_path = filedialog.askopenfilename(
+            title="Chọn file hóa đơn",
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not input_path:
+            return
+        
+        output_path = filedialog.asksaveasfilename(
+            title="Lưu kết quả tra cứu",
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")]
+        )
+        if not output_path:
+            return
+        
+        thread = threading.Thread(target=self._search_file_thread, args=(input_path, output_path), daemon=True)
+        thread.start()
+    
+    def _search_file_thread(self, input_path, output_path):
+        """Thread tra cứu hàng loạt"""
+        # openpyxl/asyncio chỉ được import khi tra cứu hàng loạt lần đầu
+        from ..utils.bulk_lookup import BulkLookupPipeline
+        
+        try:
+            self.bulk_button.configure(state="disabled")
+            self.progress_bar.set(0)
+            self.status_label.configure(text="Đang đọc file...")
+            
+            excel_processor = self.app.excel_processor
+            file_check = excel_processor.validate_file_format(input_path, streaming=True)
+            if not file_check["valid"]:
+                self.status_label.configure(text=file_check["message"])
+                self.app.show_message("Lỗi", file_check["message"], "error")
+                return
+            
+            # Đọc file theo từng lô để file lớn không phải nạp hết vào bộ nhớ
+            upload = excel_processor.process_bill_upload(
+                input_path,
+                stream=True,
+                batch_size=self.app.config_manager.get_setting("performance_settings.upload_batch_size", 5000)
+            )
+            if not upload["success"]:
+                errors = "\n".join(upload.get("errors", [])[:10])
+                self.status_label.configure(text=upload["message"])
+                self.app.show_message("Lỗi", f"{upload['message']}\n{errors}", "error")
+                return
+            
+            pipeline = BulkLookupPipeline(
+                self.app.bidv_service,
+                concurrency=self.app.config_manager.get_setting("api_settings.concurrent_requests", 5),
+                progress_callback=self.update_bulk_progress
+            )
+            bills = (bill for batch in upload["batches"] for bill in batch)
+            result = pipeline.run(bills, output_path, total=upload["estimated_rows"])
+            
+            if result["success"]:
+                message = result["message"]
+                if upload["errors"]:
+                    message += f"\nBỏ qua {len(upload['errors'])} dòng lỗi (ví dụ: {upload['errors'][0]})"
+                
+                self.progress_bar.set(1.0)
+                self.status_label.configure(text=result["message"])
+                self.app.show_message("Thành công", f"{message}\nĐã lưu: {result['file_path']}", "success")
+            else:
+                self.progress_bar.set(0)
+                self.status_label.configure(text=result["message"])
+                self.app.show_message("Lỗi", result["message"], "error")
+            
+        except Exception as e:
+            self.progress_bar.set(0)
+            self.status_label.configure(text=f"Lỗi: {str(e)}")
+            self.app.show_message("Lỗi", f"Không thể tra cứu hàng loạt: {str(e)}", "error")
+        
+        finally:
+            self.bulk_button.configure(state="normal")
+    
+    def update_bulk_progress(self, progress):
+        """Cập nhật tiến độ tra cứu hàng loạt (tốc độ và thời gian còn lại)"""
+        total = progress.get("total")
+        processed = progress["processed"]
+        
+        if total:
+            self.progress_bar.set(min(processed / total, 1.0))
+            text = f"{processed:,}/{total:,} hóa đơn"
+        else:
+            text = f"{processed:,} hóa đơn"
+        
+        text += f" - {progress['rate']:.1f} HĐ/s"
+        if progress.get("eta") is not None:
+            text += f" - còn khoảng {int(progress['eta'])}s"
+        if progress["failed"]:
+            text += f" - {progress['failed']} lỗi"
+        
+        self.status_label.configure(text=text)
+    
     def _search_bill_thread(self, bill_number):
         """Thread tìm kiếm hóa đơn"""
         try:
@@ -323,11 +435,8 @@ class BillLookupFrame:
         # Lưu thông tin hóa đơn
         self.app.selected_bill = result
         
-        # Chuyển sang tab thanh toán
-        self.app.tabview.set("💳 Thanh toán")
-        
-        # Cập nhật form thanh toán
-        self.app.payment_frame.load_bill_data(result)
+        # Chuyển sang tab thanh toán và cập nhật form thanh toán
+        self.app.show_tab("💳 Thanh toán").load_bill_data(result)
         
         self.app.show_message("Thành công", "Đã chuyển sang tab thanh toán", "success")
     
@@ -4,15 +4,37 @@ import json
 import threading
 from datetime import datetime, timedelta
 
+from ..utils.payment_store import STATUS_LABELS, METHOD_LABELS
+from ..utils.history_index import HistoryIndex
+from .virtual_table import VirtualTable
+
 class HistoryFrame:
     """Frame lịch sử giao dịch"""
     
+    # Cột hiển thị -> cột sắp xếp trong PaymentStore
+    SORT_COLUMNS = {
+        "date": "payment_date",
+        "transaction_id": "transaction_id",
+        "customer_name": "customer_name",
+        "bill_type": "bill_type",
+        "amount": "amount",
+        "payment_method": "payment_method",
+        "status": "status"
+    }
+    
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
-        self.history_data = []
+        self.filters = {}
+        self.sort_column = "payment_date"
+        self.sort_descending = True
+        self.history_index = HistoryIndex()
+        self.index_ready = False
         self.create_ui()
         self.load_history()
+        
+        # Xây index lọc trong nền, trong lúc chờ thì lọc bằng SQLite
+        threading.Thread(target=self.sync_index, daemon=True).start()
     
     def create_ui(self):
         """Tạo giao diện lịch sử"""
@@ -53,10 +75,12 @@ class HistoryFrame:
         ctk.CTkLabel(date_frame, text="Từ ngày:", font=ctk.CTkFont(size=12)).pack(side="left", padx=5)
         self.start_date_entry = ctk.CTkEntry(date_frame, width=120, placeholder_text="yyyy-mm-dd")
         self.start_date_entry.pack(side="left", padx=5)
+        self.start_date_entry.bind("<Return>", lambda event: self.filter_history())
         
         ctk.CTkLabel(date_frame, text="Đến ngày:", font=ctk.CTkFont(size=12)).pack(side="left", padx=5)
         self.end_date_entry = ctk.CTkEntry(date_frame, width=120, placeholder_text="yyyy-mm-dd")
         self.end_date_entry.pack(side="left", padx=5)
+        self.end_date_entry.bind("<Return>", lambda event: self.filter_history())
         
         # Status filter
         status_frame = ctk.CTkFrame(filter_frame)
@@ -65,7 +89,8 @@ class HistoryFrame:
         ctk.CTkLabel(status_frame, text="Trạng thái:", font=ctk.CTkFont(size=12)).pack(side="left", padx=5)
         self.status_combo = ctk.CTkComboBox(
             status_frame,
-            values=["Tất cả", "Thành công", "Thất bại", "Đang xử lý"],
+            values=["Tất cả"] + list(STATUS_LABELS.values()),
+            command=lambda value: self.filter_history(),
             width=120
         )
         self.status_combo.pack(side="left", padx=5)
@@ -79,6 +104,7 @@ class HistoryFrame:
         self.method_combo = ctk.CTkComboBox(
             method_frame,
             values=["Tất cả", "MoMo", "BIDV", "ZaloPay", "Visa"],
+            command=lambda value: self.filter_history(),
             width=120
         )
         self.method_combo.pack(side="left", padx=5)
@@ -105,45 +131,36 @@ class HistoryFrame:
         ctk.CTkButton(right_buttons, text="🗂️ Backup", command=self.backup_history, width=100).pack(side="left", padx=5)
     
     def create_history_table(self, parent):
-        """Tạo bảng lịch sử giao dịch"""
-        table_frame = ctk.CTkFrame(parent)
-        table_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Table header
-        header_frame = ctk.CTkFrame(table_frame)
-        header_frame.pack(fill="x", padx=5, pady=5)
-        
-        headers = [
-            ("Mã GD", 120),
-            ("Ngày", 100),
-            ("Khách hàng", 150),
-            ("Loại HĐ", 80),
-            ("Số tiền", 100),
-            ("Phương thức", 100),
-            ("Trạng thái", 100),
-            ("Hành động", 100)
-        ]
-        
-        for header, width in headers:
-            ctk.CTkLabel(
-                header_frame,
-                text=header,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=width
-            ).pack(side="left", padx=2)
-        
-        # Scrollable table content
-        self.table_scroll = ctk.CTkScrollableFrame(table_frame, width=800, height=400)
-        self.table_scroll.pack(fill="both", expand=True, padx=5, pady=5)
-        
-        # No data message
-        self.no_data_label = ctk.CTkLabel(
-            self.table_scroll,
-            text="Chưa có dữ liệu lịch sử giao dịch",
-            font=ctk.CTkFont(size=14),
-            text_color="gray"
+        """Tạo bảng lịch sử giao dịch (ảo hóa, chỉ vẽ các dòng đang hiển thị)"""
+        self.history_table = VirtualTable(
+            parent,
+            columns=[
+                {"key": "transaction_id", "title": "Mã GD", "width": 120},
+                {"key": "date", "title": "Ngày", "width": 100},
+                {"key": "customer_name", "title": "Khách hàng", "width": 150},
+                {"key": "bill_type", "title": "Loại HĐ", "width": 80},
+                {"key": "amount", "title": "Số tiền", "width": 100, "bold": True,
+                 "format": lambda amount: f"{amount:,.0f}", "color": lambda t: "green"},
+                {"key": "payment_method", "title": "Phương thức", "width": 100},
+                {"key": "status", "title": "Trạng thái", "width": 100, "bold": True,
+                 "color": self.status_color}
+            ],
+            actions=[
+                ("👁️", self.view_transaction_detail),
+                ("📄", self.print_receipt)
+            ],
+            on_sort=self.sort_history,
+            empty_text="Chưa có dữ liệu lịch sử giao dịch"
         )
-        self.no_data_label.pack(pady=50)
+        self.history_table.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Mặc định: mới nhất trước
+        self.history_table.set_sort("date", descending=True)
+    
+    def status_color(self, transaction):
+        """Màu theo trạng thái giao dịch"""
+        status = transaction.get("status")
+        return {"Thành công": "green", "Thất bại": "red", "Chưa xác nhận": "gray"}.get(status, "orange")
     
     def create_summary(self, parent):
         """Tạo phần tổng kết"""
@@ -185,6 +202,14 @@ class HistoryFrame:
         self.success_rate_label = ctk.CTkLabel(success_card, text="0%", font=ctk.CTkFont(size=20, weight="bold"), text_color="blue")
         self.success_rate_label.pack(pady=2)
         
+        # Expired (chưa xác nhận) transactions
+        expired_card = ctk.CTkFrame(cards_frame)
+        expired_card.pack(side="left", fill="x", expand=True, padx=5)
+        
+        ctk.CTkLabel(expired_card, text="Chưa xác nhận", font=ctk.CTkFont(size=12)).pack(pady=2)
+        self.expired_count_label = ctk.CTkLabel(expired_card, text="0", font=ctk.CTkFont(size=20, weight="bold"), text_color="gray")
+        self.expired_count_label.pack(pady=2)
+        
         # Today's transactions
         today_card = ctk.CTkFrame(cards_frame)
         today_card.pack(side="left", fill="x", expand=True, padx=5)
@@ -194,186 +219,107 @@ class HistoryFrame:
         self.today_count_label.pack(pady=2)
     
     def load_history(self):
-        """Tải lịch sử giao dịch"""
-        # Simulate loading history data
-        self.history_data = self.generate_sample_history()
+        """Tải lịch sử giao dịch (bảng chỉ lấy các khối dòng đang hiển thị)"""
         self.display_history()
         self.update_summary()
     
-    def generate_sample_history(self):
-        """Tạo dữ liệu mẫu cho lịch sử"""
-        import random
-        
-        sample_data = []
-        for i in range(50):
-            date = datetime.now() - timedelta(days=random.randint(0, 30))
-            
-            transaction = {
-                "transaction_id": f"TX{random.randint(100000, 999999)}",
-                "date": date.strftime("%Y-%m-%d %H:%M"),
-                "customer_name": random.choice(["Nguyễn Văn An", "Trần Thị Bình", "Lê Minh Cường", "Phạm Thị Dung"]),
-                "customer_id": f"CUST{random.randint(1000, 9999)}",
-                "bill_type": random.choice(["Điện", "Nước", "Internet", "TV"]),
-                "amount": random.randint(100000, 1000000),
-                "payment_method": random.choice(["MoMo", "BIDV", "ZaloPay", "Visa"]),
-                "status": random.choice(["Thành công", "Thất bại", "Đang xử lý"]),
-                "provider": random.choice(["EVN", "SAWACO", "VNPT", "K+"]),
-                "bill_number": f"HD{random.randint(10000, 99999)}",
-                "description": f"Thanh toán hóa đơn {random.choice(['điện', 'nước', 'internet', 'TV'])}"
-            }
-            sample_data.append(transaction)
-        
-        return sample_data
+    def sync_index(self):
+        """Đồng bộ HistoryIndex với PaymentStore (lần đầu tải toàn bộ, sau đó chỉ dòng mới/đổi)"""
+        try:
+            self.history_index.sync(self.app.payment_store)
+            self.index_ready = True
+        except Exception as e:
+            print(f"Lỗi xây index lịch sử: {e}")
     
-    def display_history(self, data=None):
-        """Hiển thị lịch sử giao dịch"""
-        if data is None:
-            data = self.history_data
-        
-        # Clear existing data
-        for widget in self.table_scroll.winfo_children():
-            widget.destroy()
-        
-        if not data:
-            self.no_data_label = ctk.CTkLabel(
-                self.table_scroll,
-                text="Không có dữ liệu phù hợp với bộ lọc",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            self.no_data_label.pack(pady=50)
-            return
-        
-        # Display transactions
-        for transaction in data:
-            self.create_transaction_row(transaction)
+    def apply_index_filters(self):
+        """Áp dụng bộ lọc hiện tại lên HistoryIndex (chỉ tính lại tiêu chí đã đổi)"""
+        return self.history_index.set_filter(
+            start_date=self.filters.get("start_date"),
+            end_date=self.filters.get("end_date"),
+            status=self.filters.get("status"),
+            payment_method=self.filters.get("payment_method")
+        )
     
-    def create_transaction_row(self, transaction):
-        """Tạo một dòng giao dịch"""
-        row_frame = ctk.CTkFrame(self.table_scroll)
-        row_frame.pack(fill="x", padx=5, pady=2)
-        
-        # Transaction ID
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["transaction_id"],
-            font=ctk.CTkFont(size=10),
-            width=120
-        ).pack(side="left", padx=2)
-        
-        # Date
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["date"],
-            font=ctk.CTkFont(size=10),
-            width=100
-        ).pack(side="left", padx=2)
-        
-        # Customer
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["customer_name"],
-            font=ctk.CTkFont(size=10),
-            width=150
-        ).pack(side="left", padx=2)
-        
-        # Bill type
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["bill_type"],
-            font=ctk.CTkFont(size=10),
-            width=80
-        ).pack(side="left", padx=2)
-        
-        # Amount
-        ctk.CTkLabel(
-            row_frame,
-            text=f"{transaction['amount']:,.0f}",
-            font=ctk.CTkFont(size=10, weight="bold"),
-            text_color="green",
-            width=100
-        ).pack(side="left", padx=2)
-        
-        # Payment method
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["payment_method"],
-            font=ctk.CTkFont(size=10),
-            width=100
-        ).pack(side="left", padx=2)
-        
-        # Status
-        status_color = "green" if transaction["status"] == "Thành công" else "red" if transaction["status"] == "Thất bại" else "orange"
-        ctk.CTkLabel(
-            row_frame,
-            text=transaction["status"],
-            font=ctk.CTkFont(size=10, weight="bold"),
-            text_color=status_color,
-            width=100
-        ).pack(side="left", padx=2)
-        
-        # Actions
-        action_frame = ctk.CTkFrame(row_frame)
-        action_frame.pack(side="left", padx=2)
+    def display_history(self):
+        """Hiển thị lịch sử giao dịch theo bộ lọc và thứ tự hiện tại"""
+        store = self.app.payment_store
+        filters = dict(self.filters)
+        
+        self.history_table.empty_text = "Không có dữ liệu phù hợp với bộ lọc" if filters else \
+            "Chưa có dữ liệu lịch sử giao dịch"
+        self.history_table.empty_label.configure(text=self.history_table.empty_text)
+        
+        # Lọc và sắp xếp trên HistoryIndex; SQLite (LIMIT/OFFSET) chỉ dùng khi index đang được xây
+        if self.index_ready:
+            # Lấy giao dịch mới/đổi trạng thái (thanh toán vừa lưu, kết quả từ status poller) trước khi lọc
+            self.sync_index()
+            self.apply_index_filters()
+            ids = self.history_index.sorted_ids(self.sort_column, self.sort_descending)
+            
+            def fetch_index_rows(offset, limit):
+                return [self.to_display(row) for row in store.get_many(ids[offset:offset + limit].tolist())]
+            
+            self.history_table.set_source(len(ids), fetch_index_rows)
+            return
         
-        ctk.CTkButton(
-            action_frame,
-            text="👁️",
-            command=lambda t=transaction: self.view_transaction_detail(t),
-            width=30,
-            height=20
-        ).pack(side="left", padx=1)
+        def fetch_rows(offset, limit):
+            rows = store.query(
+                limit=limit,
+                offset=offset,
+                order_by=self.sort_column,
+                descending=self.sort_descending,
+                **filters
+            )
+            return [self.to_display(row) for row in rows]
         
-        ctk.CTkButton(
-            action_frame,
-            text="📄",
-            command=lambda t=transaction: self.print_receipt(t),
-            width=30,
-            height=20
-        ).pack(side="left", padx=1)
+        self.history_table.set_source(store.count(**filters), fetch_rows)
     
-    def filter_history(self):
-        """Lọc lịch sử theo điều kiện"""
-        filtered_data = self.history_data.copy()
+    def sort_history(self, key, descending):
+        """Sắp xếp theo cột (trên HistoryIndex, hoặc SQLite khi index chưa sẵn sàng)"""
+        self.sort_column = self.SORT_COLUMNS.get(key, "payment_date")
+        self.sort_descending = descending
+        self.display_history()
+    
+    def to_display(self, payment):
+        """Chuyển bản ghi PaymentStore sang dạng hiển thị"""
+        return dict(
+            payment,
+            date=payment["payment_date"][:16],
+            status=STATUS_LABELS.get(payment["status"], payment["status"]),
+            payment_method=METHOD_LABELS.get(payment["payment_method"], payment["payment_method"])
+        )
+    
+    def get_filters(self):
+        """Đọc bộ lọc từ controls (nhãn hiển thị -> mã lưu trong PaymentStore)"""
+        filters = {}
         
-        # Filter by date range
         start_date = self.start_date_entry.get().strip()
         end_date = self.end_date_entry.get().strip()
+        for key, value in (("start_date", start_date), ("end_date", end_date)):
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                    filters[key] = value
+                except ValueError:
+                    pass
         
-        if start_date or end_date:
-            filtered_data = [t for t in filtered_data if self.date_in_range(t["date"], start_date, end_date)]
-        
-        # Filter by status
         status = self.status_combo.get()
         if status != "Tất cả":
-            filtered_data = [t for t in filtered_data if t["status"] == status]
+            filters["status"] = {label: code for code, label in STATUS_LABELS.items()}.get(status, status)
         
-        # Filter by payment method
         method = self.method_combo.get()
         if method != "Tất cả":
-            filtered_data = [t for t in filtered_data if t["payment_method"] == method]
+            filters["payment_method"] = {label: code for code, label in METHOD_LABELS.items()}.get(method, method)
         
-        self.display_history(filtered_data)
-        self.update_summary(filtered_data)
+        return filters
     
-    def date_in_range(self, date_str, start_date, end_date):
-        """Kiểm tra ngày có trong khoảng không"""
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d %H:%M").date()
-            
-            if start_date:
-                start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                if date < start:
-                    return False
-            
-            if end_date:
-                end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                if date > end:
-                    return False
-            
-            return True
-        except:
-            return True
+    def filter_history(self):
+        """Lọc lịch sử theo điều kiện (gọi mỗi khi một control thay đổi)"""
+        filters = self.get_filters()
+        if filters == self.filters:
+            return
+        self.filters = filters
+        self.load_history()
     
     def refresh_history(self):
         """Làm mới lịch sử"""
@@ -386,26 +332,22 @@ class HistoryFrame:
         self.end_date_entry.delete(0, "end")
         self.status_combo.set("Tất cả")
         self.method_combo.set("Tất cả")
-        self.display_history()
-        self.update_summary()
+        self.filters = {}
+        self.load_history()
     
-    def update_summary(self, data=None):
-        """Cập nhật thống kê tổng kết"""
-        if data is None:
-            data = self.history_data
-        
-        total_count = len(data)
-        total_amount = sum(t["amount"] for t in data)
-        success_count = len([t for t in data if t["status"] == "Thành công"])
-        success_rate = (success_count / total_count * 100) if total_count > 0 else 0
-        
-        today = datetime.now().date()
-        today_count = len([t for t in data if datetime.strptime(t["date"], "%Y-%m-%d %H:%M").date() == today])
-        
-        self.total_count_label.configure(text=str(total_count))
-        self.total_amount_label.configure(text=f"{total_amount:,.0f} VNĐ")
-        self.success_rate_label.configure(text=f"{success_rate:.1f}%")
-        self.today_count_label.configure(text=str(today_count))
+    def update_summary(self):
+        """Cập nhật thống kê tổng kết theo bộ lọc hiện tại"""
+        if self.index_ready:
+            self.apply_index_filters()
+            summary = self.history_index.summary()
+        else:
+            summary = self.app.payment_store.summary(**self.filters)
+        
+        self.total_count_label.configure(text=f"{summary['total']:,}")
+        self.total_amount_label.configure(text=f"{summary['amount']:,.0f} VNĐ")
+        self.success_rate_label.configure(text=f"{summary['success_rate']:.1f}%")
+        self.expired_count_label.configure(text=f"{summary['expired']:,}")
+        self.today_count_label.configure(text=f"{summary['today']:,}")
     
     def view_transaction_detail(self, transaction):
         """Xem chi tiết giao dịch"""
@@ -481,7 +423,7 @@ class HistoryFrame:
         """Tạo báo cáo"""
         try:
             result = self.app.excel_processor.create_payment_report(
-                self.history_data,
+                self.app.payment_store.iter_payments(newest_first=True, **self.filters),
                 start_date=self.start_date_entry.get(),
                 end_date=self.end_date_entry.get()
             )
@@ -504,7 +446,7 @@ class HistoryFrame:
         if file_path:
             try:
                 result = self.app.excel_processor.export_payment_history(
-                    self.history_data,
+                    self.app.payment_store.iter_payments(newest_first=True, **self.filters),
                     file_path
                 )
                 
@@ -524,8 +466,16 @@ class HistoryFrame:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_file = f"{backup_dir}/history_backup_{timestamp}.json"
                 
+                # Ghi theo lô để không phải nạp toàn bộ lịch sử vào bộ nhớ
                 with open(backup_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.history_data, f, indent=2, ensure_ascii=False)
+                    f.write("[")
+                    first = True
+                    for batch in self.app.payment_store.iter_payments():
+                        for payment in batch:
+                            f.write("\n  " if first else ",\n  ")
+                            json.dump(payment, f, ensure_ascii=False)
+                            first = False
+                    f.write("\n]")
                 
                 self.app.show_message("Thành công", f"Đã backup lịch sử: {backup_file}", "success")
             except Exception as e:
@@ -8,6 +8,8 @@ import webbrowser
 class PaymentFrame:
     """Frame xử lý thanh toán"""
     
+    DEFAULT_BANK_LABEL = "Để ZaloPay chọn"
+    
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
@@ -184,6 +186,22 @@ class PaymentFrame:
         # Hide card input initially
         self.card_input_frame.pack_forget()
         
+        # Bank picker for ZaloPay (danh mục lấy từ cache, không chờ mạng)
+        self.bank_select_frame = ctk.CTkFrame(right_frame)
+        self.bank_select_frame.pack(fill="x", padx=10, pady=10)
+        
+        ctk.CTkLabel(self.bank_select_frame, text="Ngân hàng:", font=ctk.CTkFont(size=12)).pack(anchor="w", pady=2)
+        self.bank_combo = ctk.CTkComboBox(self.bank_select_frame, values=[self.DEFAULT_BANK_LABEL], width=300)
+        self.bank_combo.pack(fill="x", padx=5, pady=2)
+        self.bank_combo.set(self.DEFAULT_BANK_LABEL)
+        self.bank_codes = {}
+        
+        catalog = getattr(self.app, "catalog_service", None)
+        if catalog is not None:
+            self.update_bank_list(catalog.get("zalopay_banks", on_update=self.update_bank_list, default=[]))
+        
+        self.bank_select_frame.pack_forget()
+        
         # Set default selection
         self.momo_radio.select()
     
@@ -244,8 +262,22 @@ class PaymentFrame:
         else:
             self.card_input_frame.pack_forget()
         
+        # Show/hide bank picker for ZaloPay
+        if method == "zalopay":
+            self.bank_select_frame.pack(fill="x", padx=10, pady=10)
+        else:
+            self.bank_select_frame.pack_forget()
+        
         print(f"Selected payment method: {method}")
     
+    def update_bank_list(self, banks):
+        """Cập nhật danh sách ngân hàng (gọi lại khi danh mục được làm mới trong nền)"""
+        self.bank_codes = {f"{bank['name']} ({bank['code']})": bank["code"] for bank in banks or []}
+        selected = self.bank_combo.get()
+        self.bank_combo.configure(values=[self.DEFAULT_BANK_LABEL] + list(self.bank_codes))
+        if selected not in self.bank_codes:
+            self.bank_combo.set(self.DEFAULT_BANK_LABEL)
+    
     def load_bill_data(self, bill_result):
         """Tải thông tin hóa đơn"""
         self.selected_bill = bill_result
@@ -393,6 +425,9 @@ class PaymentFrame:
             
             self.progress_bar.set(0.8)
             
+            # Lưu giao dịch vào lịch sử
+            self.save_payment(result, amount)
+            
             # Handle result
             if result.get("success"):
                 self.progress_bar.set(1.0)
@@ -421,6 +456,49 @@ class PaymentFrame:
         finally:
             self.pay_button.configure(state="normal")
     
+    def save_payment(self, result, amount):
+        """Lưu kết quả thanh toán vào PaymentStore"""
+        try:
+            bill = self.selected_bill.get("bill", {})
+            customer = self.selected_bill.get("customer", {})
+            order_id = result.get("order_id") or result.get("app_trans_id") or result.get("transaction_id") or ""
+            
+            # Thanh toán qua ví/cổng (có pay_url) chỉ hoàn tất khi người dùng xác nhận; chỉ để "pending"
+            # khi có mã giao dịch để theo dõi, nếu không sẽ không bao giờ được cập nhật (ví dụ: BIDV giả lập)
+            if not result.get("success"):
+                status = "failed"
+            elif result.get("pay_url") and order_id:
+                status = "pending"
+            else:
+                status = "success"
+            
+            self.app.payment_store.add_payment({
+                "transaction_id": order_id or None,
+                "order_id": order_id,
+                "customer_id": customer.get("id", ""),
+                "customer_name": customer.get("name", ""),
+                "bill_type": bill.get("billType", ""),
+                "bill_number": bill.get("billNumber", ""),
+                "provider": bill.get("provider", ""),
+                "amount": amount,
+                "payment_method": self.payment_method,
+                "status": status,
+                "payment_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "description": result.get("message", "")
+            })
+            
+            # Giao dịch chờ người dùng xác nhận: theo dõi trạng thái trong nền
+            if status == "pending":
+                self.app.status_poller.track(self.payment_method, order_id)
+            
+            # Trạng thái hóa đơn đã đổi: lần tra cứu sau (theo mã hóa đơn hoặc mã khách hàng) phải lấy dữ liệu mới
+            if status != "failed":
+                for key in (bill.get("billNumber"), customer.get("id")):
+                    if key:
+                        self.app.bidv_service.cache.invalidate(key)
+        except Exception as e:
+            print(f"Lỗi lưu giao dịch: {e}")
+    
     def process_momo_payment(self, amount):
         """Xử lý thanh toán MoMo"""
         try:
@@ -465,7 +543,8 @@ class PaymentFrame:
             result = self.app.zalopay_service.create_order(
                 amount=int(amount),
                 description=description,
-                user_info=user_info
+                user_info=user_info,
+                bank_code=self.bank_codes.get(self.bank_combo.get(), "")
             )
             
             if result.get("success"):
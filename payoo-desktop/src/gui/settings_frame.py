@@ -3,6 +3,8 @@ from tkinter import ttk, messagebox, filedialog
 import json
 from datetime import datetime
 
+from ..api.transport import configure_transport
+
 class SettingsFrame:
     """Frame cài đặt ứng dụng"""
     
@@ -161,6 +163,54 @@ class SettingsFrame:
         self.concurrent_entry = ctk.CTkEntry(concurrent_frame, width=100)
         self.concurrent_entry.pack(side="left", padx=5)
         
+        # Hedged requests
+        hedge_frame = ctk.CTkFrame(api_frame)
+        hedge_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.hedge_checkbox = ctk.CTkCheckBox(
+            hedge_frame,
+            text="Gửi request dự phòng khi tra cứu chậm hơn p95"
+        )
+        self.hedge_checkbox.pack(side="left", padx=5)
+        
+        ctk.CTkLabel(hedge_frame, text="Tối đa (% request):").pack(side="left", padx=5)
+        self.hedge_ratio_entry = ctk.CTkEntry(hedge_frame, width=60)
+        self.hedge_ratio_entry.pack(side="left", padx=5)
+        
+        # Upload settings
+        upload_frame = ctk.CTkFrame(performance_tab)
+        upload_frame.pack(fill="x", padx=20, pady=10)
+        
+        ctk.CTkLabel(
+            upload_frame,
+            text="📂 Cài đặt upload file",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(anchor="w", pady=5)
+        
+        # Max upload size
+        max_upload_frame = ctk.CTkFrame(upload_frame)
+        max_upload_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(max_upload_frame, text="File tối đa (MB):", width=150).pack(side="left", padx=5)
+        self.max_upload_entry = ctk.CTkEntry(max_upload_frame, width=100)
+        self.max_upload_entry.pack(side="left", padx=5)
+        
+        # Max stream upload size
+        max_stream_frame = ctk.CTkFrame(upload_frame)
+        max_stream_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(max_stream_frame, text="File tra cứu hàng loạt (MB):", width=150).pack(side="left", padx=5)
+        self.max_stream_upload_entry = ctk.CTkEntry(max_stream_frame, width=100)
+        self.max_stream_upload_entry.pack(side="left", padx=5)
+        
+        # Batch size
+        batch_size_frame = ctk.CTkFrame(upload_frame)
+        batch_size_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(batch_size_frame, text="Số dòng mỗi lô:", width=150).pack(side="left", padx=5)
+        self.upload_batch_entry = ctk.CTkEntry(batch_size_frame, width=100)
+        self.upload_batch_entry.pack(side="left", padx=5)
+        
         # Cache settings
         cache_frame = ctk.CTkFrame(performance_tab)
         cache_frame.pack(fill="x", padx=20, pady=10)
@@ -189,6 +239,14 @@ class SettingsFrame:
         self.cache_size_entry = ctk.CTkEntry(cache_size_frame, width=100)
         self.cache_size_entry.pack(side="left", padx=5)
         
+        # Disk cache size
+        disk_cache_frame = ctk.CTkFrame(cache_frame)
+        disk_cache_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(disk_cache_frame, text="Cache trên đĩa (MB, 0 = tắt):", width=150).pack(side="left", padx=5)
+        self.disk_cache_size_entry = ctk.CTkEntry(disk_cache_frame, width=100)
+        self.disk_cache_size_entry.pack(side="left", padx=5)
+        
         # Clear cache button
         clear_cache_frame = ctk.CTkFrame(cache_frame)
         clear_cache_frame.pack(fill="x", padx=10, pady=5)
@@ -199,6 +257,9 @@ class SettingsFrame:
             command=self.clear_cache,
             width=120
         ).pack(side="left", padx=5)
+        
+        self.cache_stats_label = ctk.CTkLabel(clear_cache_frame, text="", font=ctk.CTkFont(size=10))
+        self.cache_stats_label.pack(side="left", padx=10)
     
     def create_security_tab(self):
         """Tạo tab bảo mật"""
@@ -529,6 +590,24 @@ class SettingsFrame:
             self.concurrent_entry.delete(0, "end")
             self.concurrent_entry.insert(0, str(self.app.config_manager.get_setting("api_settings.concurrent_requests", 5)))
             
+            if self.app.config_manager.get_setting("api_settings.hedge_requests", False):
+                self.hedge_checkbox.select()
+            else:
+                self.hedge_checkbox.deselect()
+            
+            self.hedge_ratio_entry.delete(0, "end")
+            self.hedge_ratio_entry.insert(0, f"{self.app.config_manager.get_setting('api_settings.hedge_max_ratio', 0.05) * 100:g}")
+            
+            # Load upload settings
+            self.max_upload_entry.delete(0, "end")
+            self.max_upload_entry.insert(0, str(self.app.config_manager.get_setting("performance_settings.max_upload_size_mb", 10)))
+            
+            self.max_stream_upload_entry.delete(0, "end")
+            self.max_stream_upload_entry.insert(0, str(self.app.config_manager.get_setting("performance_settings.max_stream_upload_size_mb", 1024)))
+            
+            self.upload_batch_entry.delete(0, "end")
+            self.upload_batch_entry.insert(0, str(self.app.config_manager.get_setting("performance_settings.upload_batch_size", 5000)))
+            
             # Load cache settings
             enable_cache = self.app.config_manager.get_setting("performance_settings.enable_cache", True)
             if enable_cache:
@@ -537,6 +616,10 @@ class SettingsFrame:
             self.cache_size_entry.delete(0, "end")
             self.cache_size_entry.insert(0, str(self.app.config_manager.get_setting("performance_settings.cache_size", 100)))
             
+            self.disk_cache_size_entry.delete(0, "end")
+            self.disk_cache_size_entry.insert(0, str(self.app.config_manager.get_setting("performance_settings.disk_cache_size", 50)))
+            self.update_cache_stats()
+            
             # Load notification settings
             enable_notifications = self.app.config_manager.get_setting("notification_settings.enable_notifications", True)
             if enable_notifications:
@@ -633,11 +716,26 @@ class SettingsFrame:
         """Xóa cache"""
         if messagebox.askyesno("Xác nhận", "Bạn có muốn xóa tất cả cache?"):
             try:
-                # TODO: Implement cache clearing logic
-                self.app.show_message("Thành công", "Đã xóa cache thành công", "success")
+                count = self.app.bidv_service.cache.clear()
+                self.update_cache_stats()
+                self.app.show_message("Thành công", f"Đã xóa {count} kết quả tra cứu trong cache", "success")
             except Exception as e:
                 self.app.show_message("Lỗi", f"Lỗi xóa cache: {str(e)}", "error")
     
+    def update_cache_stats(self):
+        """Hiển thị thống kê cache tra cứu"""
+        try:
+            stats = self.app.bidv_service.cache.stats()
+            text = (f"{stats['entries']} mục, {stats['bytes'] / 1024 / 1024:.1f}/{stats['max_bytes'] / 1024 / 1024:.0f} MB, "
+                    f"hit {stats['hits']}, miss {stats['misses']} ({stats['hit_rate']:.0f}%)")
+            if "disk" in stats:
+                disk = stats["disk"]
+                text += (f" | đĩa: {disk['entries']} mục, {disk['bytes'] / 1024 / 1024:.1f}/"
+                         f"{disk['max_bytes'] / 1024 / 1024:.0f} MB, hit {stats['disk_hits']}")
+            self.cache_stats_label.configure(text=text)
+        except Exception as e:
+            print(f"Error updating cache stats: {e}")
+    
     def choose_backup_location(self):
         """Chọn thư mục backup"""
         folder = filedialog.askdirectory(title="Chọn thư mục backup")
@@ -724,10 +822,23 @@ Backup cuối: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             self.app.config_manager.set_setting("api_settings.timeout", int(self.timeout_entry.get() or 30))
             self.app.config_manager.set_setting("api_settings.retry_count", int(self.retry_count_entry.get() or 3))
             self.app.config_manager.set_setting("api_settings.concurrent_requests", int(self.concurrent_entry.get() or 5))
+            self.app.config_manager.set_setting("api_settings.hedge_requests", bool(self.hedge_checkbox.get()))
+            self.app.config_manager.set_setting("api_settings.hedge_max_ratio", float(self.hedge_ratio_entry.get() or 5) / 100)
+            configure_transport(self.app.config_manager.get_setting("api_settings", {}))
+            
+            # Save upload settings
+            self.app.config_manager.set_setting("performance_settings.max_upload_size_mb", int(self.max_upload_entry.get() or 10))
+            self.app.config_manager.set_setting("performance_settings.max_stream_upload_size_mb", int(self.max_stream_upload_entry.get() or 1024))
+            self.app.config_manager.set_setting("performance_settings.upload_batch_size", int(self.upload_batch_entry.get() or 5000))
+            self.app.excel_processor.max_file_size_mb = self.app.config_manager.get_setting("performance_settings.max_upload_size_mb", 10)
+            self.app.excel_processor.max_stream_file_size_mb = self.app.config_manager.get_setting("performance_settings.max_stream_upload_size_mb", 1024)
             
             # Save cache settings
             self.app.config_manager.set_setting("performance_settings.enable_cache", self.enable_cache_checkbox.get())
             self.app.config_manager.set_setting("performance_settings.cache_size", int(self.cache_size_entry.get() or 100))
+            self.app.config_manager.set_setting("performance_settings.disk_cache_size", int(self.disk_cache_size_entry.get() or 0))
+            self.app.configure_lookup_cache()
+            self.update_cache_stats()
             
             # Save notification settings
             self.app.config_manager.set_setting("notification_settings.enable_notifications", self.enable_notifications_checkbox.get())
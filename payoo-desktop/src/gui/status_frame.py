@@ -3,16 +3,31 @@ from tkinter import ttk, messagebox
 import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 
+from ..api.metrics import get_metrics
+from ..api.transport import get_transport
+
 class StatusFrame:
     """Frame theo dõi trạng thái API"""
     
+    PROVIDERS = ["momo", "bidv", "zalopay", "visa"]
+    MAX_PROBE_DEADLINE = 10
+    
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
         self.api_status = {}
         self.monitoring_active = False
+        
+        # Mỗi provider một worker; probe chưa xong của chu kỳ trước không bị gửi lại
+        self.probe_executor = ThreadPoolExecutor(max_workers=len(self.PROVIDERS), thread_name_prefix="status-probe")
+        self.probes_in_flight = {}
+        self.probe_lock = threading.Lock()
+        
+        # Độ trễ và tỷ lệ thành công đo thật từ mọi request qua HTTPTransport
+        self.metrics = get_metrics()
         self.create_ui()
         self.start_monitoring()
     
@@ -311,9 +326,12 @@ class StatusFrame:
         chart_frame = ctk.CTkFrame(metrics_container)
         chart_frame.pack(side="left", fill="both", expand=True, padx=5)
         
-        ctk.CTkLabel(chart_frame, text="📊 Response Time (24h)", font=ctk.CTkFont(size=12, weight="bold")).pack(pady=5)
+        ctk.CTkLabel(
+            chart_frame,
+            text=f"📊 Response Time ({self.metrics.window_seconds // 60} phút)",
+            font=ctk.CTkFont(size=12, weight="bold")
+        ).pack(pady=5)
         
-        # Simulated chart data
         self.chart_text = ctk.CTkTextbox(chart_frame, width=400, height=150)
         self.chart_text.pack(fill="both", expand=True, padx=5, pady=5)
         
@@ -372,12 +390,13 @@ class StatusFrame:
             try:
                 # Get refresh interval
                 refresh_interval = self.get_refresh_interval()
+                cycle_start = time.monotonic()
                 
                 # Update API status
                 self.update_api_status()
                 
-                # Sleep for refresh interval
-                time.sleep(refresh_interval)
+                # Sleep for the rest of the refresh interval
+                time.sleep(max(0, refresh_interval - (time.monotonic() - cycle_start)))
                 
             except Exception as e:
                 print(f"Monitoring error: {e}")
@@ -402,17 +421,49 @@ class StatusFrame:
         except:
             return 10
     
-    def update_api_status(self):
+    def get_probe_deadline(self):
+        """Deadline cho mỗi probe: ngắn hơn chu kỳ refresh, tối đa MAX_PROBE_DEADLINE giây"""
+        return max(1, min(self.get_refresh_interval() - 1, self.MAX_PROBE_DEADLINE))
+    
+    def probe_all(self, providers, deadline, on_result, force=False):
+        """Chạy probe đồng thời, gọi on_result(provider, status) ngay khi từng probe xong
+        
+        Thời gian một chu kỳ bị chặn bởi probe chậm nhất nhưng không quá deadline; probe quá hạn
+        được báo timeout và tiếp tục chạy nền (không gửi probe mới cho provider đó tới khi xong).
+        """
+        futures = {}
+        with self.probe_lock:
+            for provider in providers:
+                future = self.probes_in_flight.get(provider)
+                if future is None or future.done():
+                    future = self.probe_executor.submit(self.test_api_status, provider, force)
+                    self.probes_in_flight[provider] = future
+                futures[future] = provider
+        
+        pending = set(futures.values())
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                provider = futures[future]
+                pending.discard(provider)
+                on_result(provider, future.result())
+        except FutureTimeoutError:
+            for provider in pending:
+                on_result(provider, {
+                    "active": False,
+                    "response_time": int(deadline * 1000),
+                    "uptime": 0,
+                    "message": f"Quá thời gian {deadline}s",
+                    "last_check": datetime.now().strftime("%H:%M:%S")
+                })
+    
+    def update_api_status(self, force=False):
         """Cập nhật trạng thái API"""
         try:
-            # Test all APIs
-            providers = ["momo", "bidv", "zalopay", "visa"]
-            active_count = 0
-            total_response_time = 0
-            total_uptime = 0
+            # Test all APIs concurrently
+            providers = self.PROVIDERS
+            totals = {"active": 0, "response_time": 0, "uptime": 0}
             
-            for provider in providers:
-                status = self.test_api_status(provider)
+            def on_result(provider, status):
                 self.api_status[provider] = status
                 
                 # Update card
@@ -420,45 +471,60 @@ class StatusFrame:
                     self.update_api_card(provider, status)
                 
                 if status.get("active", False):
-                    active_count += 1
-                    total_response_time += status.get("response_time", 0)
-                    total_uptime += status.get("uptime", 0)
+                    totals["active"] += 1
+                    totals["response_time"] += status.get("response_time", 0)
+                    totals["uptime"] += status.get("uptime", 0)
+            
+            self.probe_all(providers, self.get_probe_deadline(), on_result, force)
+            self.update_chart()
             
             # Update overall status
-            self.update_overall_status(active_count, len(providers), total_response_time, total_uptime)
+            self.update_overall_status(totals["active"], len(providers), totals["response_time"], totals["uptime"])
             
             # Update last check time
             self.last_updated_label.configure(text=datetime.now().strftime("%H:%M:%S"))
             
             # Add log
-            self.add_log(f"Status updated - {active_count}/{len(providers)} APIs active")
+            self.add_log(f"Status updated - {totals['active']}/{len(providers)} APIs active")
             
         except Exception as e:
             self.add_log(f"Error updating status: {str(e)}")
     
-    def test_api_status(self, provider):
-        """Test trạng thái một API"""
+    def test_api_status(self, provider, force=False):
+        """Test trạng thái một API (probe nhẹ, dùng kết quả cache nếu chưa tới lượt probe)"""
         try:
             start_time = time.time()
             
             # Call appropriate service
             if provider == "momo":
-                result = self.app.momo_service.test_connection()
+                result = self.app.momo_service.test_connection(force=force)
             elif provider == "bidv":
-                result = self.app.bidv_service.test_connection()
+                result = self.app.bidv_service.test_connection(force=force)
             elif provider == "zalopay":
-                result = self.app.zalopay_service.test_connection()
+                result = self.app.zalopay_service.test_connection(force=force)
             elif provider == "visa":
-                result = self.app.visa_service.test_connection()
+                result = self.app.visa_service.test_connection(force=force)
             else:
                 return {"active": False, "response_time": 0, "uptime": 0}
             
-            response_time = int((time.time() - start_time) * 1000)
+            response_time = result.get("latency_ms", int((time.time() - start_time) * 1000))
+            
+            # Uptime là tỷ lệ request thành công trong cửa sổ trượt, không phải giá trị cố định
+            snapshot = self.metrics.snapshot(provider)
+            window = snapshot["window"]
+            uptime = window["success_rate"]
+            if uptime is None:
+                uptime = 100.0 if result.get("success", False) else 0
             
             return {
                 "active": result.get("success", False),
+                "health": result.get("status", ""),
                 "response_time": response_time,
-                "uptime": 99.5 if result.get("success", False) else 0,
+                "uptime": uptime,
+                "p50": window["p50"],
+                "p95": window["p95"],
+                "p99": window["p99"],
+                "requests": window["count"],
                 "message": result.get("message", ""),
                 "last_check": datetime.now().strftime("%H:%M:%S")
             }
@@ -478,13 +544,18 @@ class StatusFrame:
             card = self.api_cards[provider]
             
             # Update status
-            if status.get("active", False):
+            if status.get("health") == "degraded":
+                card['status_label'].configure(text="🟡 Degraded", text_color="orange")
+            elif status.get("active", False):
                 card['status_label'].configure(text="🟢 Online", text_color="green")
             else:
                 card['status_label'].configure(text="🔴 Offline", text_color="red")
             
             # Update response time
-            card['response_label'].configure(text=f"Response: {status.get('response_time', 0)}ms")
+            response_text = f"Response: {status.get('response_time', 0)}ms"
+            if status.get("p95") is not None:
+                response_text += f" (p95 {status['p95']:.0f}ms)"
+            card['response_label'].configure(text=response_text)
             
             # Update uptime
             card['uptime_label'].configure(text=f"Uptime: {status.get('uptime', 0):.1f}%")
@@ -525,62 +596,85 @@ class StatusFrame:
             print(f"Error updating overall status: {e}")
     
     def update_chart(self):
-        """Cập nhật biểu đồ"""
+        """Cập nhật biểu đồ từ metrics đo được"""
         try:
-            # Simulated chart data
-            chart_data = """
-RESPONSE TIME CHART (Last 24h)
-==============================
-
-MoMo:    ████████████████████████████████████████ 125ms
-BIDV:    ████████████████████████████████████████ 120ms  
-ZaloPay: ████████████████████████████████████████ 234ms
-Visa:    ███████████████████████████████████████  67ms
-
-HOURLY AVERAGE (ms)
-00:00  01:00  02:00  03:00  04:00  05:00
- 145    132    128    135    142    138
-
-06:00  07:00  08:00  09:00  10:00  11:00
- 140    155    162    158    145    142
-
-12:00  13:00  14:00  15:00  16:00  17:00
- 148    152    145    140    138    142
-
-18:00  19:00  20:00  21:00  22:00  23:00
- 150    145    142    138    135    140
-"""
+            window_minutes = self.metrics.window_seconds // 60
+            snapshots = {provider: self.metrics.snapshot(provider) for provider in self.PROVIDERS}
+            peak = max([snap["window"]["p95"] or 0 for snap in snapshots.values()] + [1])
+            
+            lines = [f"RESPONSE TIME ({window_minutes} phút gần nhất, p95)", "=" * 40, ""]
+            for provider, snap in snapshots.items():
+                window = snap["window"]
+                if not window["count"]:
+                    lines.append(f"{provider.upper():<9}(chưa có request)")
+                    continue
+                bar = "█" * max(1, int(window["p95"] / peak * 30))
+                lines.append(f"{provider.upper():<9}{bar} {window['p95']:.0f}ms")
+            
+            lines += ["", "PERCENTILES (ms)       p50     p95     p99     n"]
+            for provider, snap in snapshots.items():
+                window = snap["window"]
+                if window["count"]:
+                    lines.append(
+                        f"{provider.upper():<20}{window['p50']:>6.0f}  {window['p95']:>6.0f}  "
+                        f"{window['p99']:>6.0f}  {window['count']:>4}"
+                    )
+            
+            for provider in self.PROVIDERS:
+                timeline = [avg for _, avg in self.metrics.timeline(provider)[-12:]]
+                if any(avg is not None for avg in timeline):
+                    values = " ".join("  - " if avg is None else f"{avg:>4.0f}" for avg in timeline)
+                    lines += ["", f"{provider.upper()} - trung bình theo phút (12 phút)", values]
             
             self.chart_text.delete("1.0", "end")
-            self.chart_text.insert("1.0", chart_data)
+            self.chart_text.insert("1.0", "\n".join(lines))
             
             # Update metrics
-            metrics_data = f"""
-CURRENT METRICS
-===============
-Total Requests: 1,247
-Success Rate: 99.2%
-Error Rate: 0.8%
-Avg Response: 142ms
-Peak Response: 890ms
-Min Response: 45ms
-
-ERRORS (24h)
-============
-Timeout: 5
-Connection: 2
-Invalid Response: 3
-Rate Limit: 0
-
-TRAFFIC PATTERN
-===============
-Peak Hours: 14:00-16:00
-Low Hours: 02:00-05:00
-Current Load: Medium
-"""
+            total = self.metrics.snapshot()
+            window = total["window"]
+            latency = total["latency"]
+            
+            def fmt(value, suffix=""):
+                if value is None:
+                    return "--"
+                return f"{value:.1f}%" if suffix == "%" else f"{value:.0f}{suffix}"
+            
+            error_rate = None if window["success_rate"] is None else 100 - window["success_rate"]
+            metrics_lines = [
+                "CURRENT METRICS",
+                "===============",
+                f"Total Requests: {total['count']:,}",
+                f"Requests ({window_minutes} phút): {window['count']:,}",
+                f"Success Rate: {fmt(window['success_rate'], '%')}",
+                f"Error Rate: {fmt(error_rate, '%')}",
+                f"Avg Response: {fmt(window['avg'], 'ms')}",
+                f"p50/p95/p99: {fmt(window['p50'])}/{fmt(window['p95'])}/{fmt(window['p99'])}ms",
+                f"Peak Response: {fmt(latency['max'], 'ms')}",
+                f"Min Response: {fmt(latency['min'], 'ms')}",
+                "",
+                "ERRORS",
+                "======",
+                f"Timeout: {total['errors'].get('timeout', 0)}",
+                f"Connection: {total['errors'].get('connection', 0)}",
+                f"Server Error (5xx): {total['errors'].get('http_5xx', 0)}",
+                f"Rate Limit: {total['errors'].get('rate_limit', 0)}",
+                f"Other: {total['errors'].get('error', 0)}",
+            ]
+            
+            hedging = get_transport().hedger.snapshot()
+            if hedging["requests"]:
+                metrics_lines += [
+                    "",
+                    "HEDGING",
+                    "=======",
+                    f"Hedged: {hedging['hedged']:,} ({hedging['hedge_rate']:.1f}%)",
+                    f"Hedge wins: {hedging['hedge_wins']:,} ({hedging['win_rate']:.0f}%)",
+                    f"Time saved: {hedging['saved_ms'] / 1000:.1f}s",
+                    f"Skipped (budget): {hedging['budget_skipped']:,}",
+                ]
             
             self.metrics_text.delete("1.0", "end")
-            self.metrics_text.insert("1.0", metrics_data)
+            self.metrics_text.insert("1.0", "\n".join(metrics_lines))
             
         except Exception as e:
             print(f"Error updating chart: {e}")
@@ -599,20 +693,26 @@ Current Load: Medium
     def refresh_status(self):
         """Làm mới trạng thái"""
         self.add_log("Manual refresh initiated")
-        threading.Thread(target=self.update_api_status, daemon=True).start()
+        threading.Thread(target=self.update_api_status, args=(True,), daemon=True).start()
     
     def test_all_apis(self):
         """Test tất cả APIs"""
         self.add_log("Testing all APIs...")
         
+        def on_result(provider, status):
+            self.api_status[provider] = status
+            
+            if provider in self.api_cards:
+                self.update_api_card(provider, status)
+            
+            if status.get("active", False):
+                self.add_log(f"{provider.upper()} API - Online ({status.get('response_time', 0)}ms)")
+            else:
+                self.add_log(f"{provider.upper()} API - Offline ({status.get('message', '')})")
+        
         def test_thread():
             try:
-                providers = ["momo", "bidv", "zalopay", "visa"]
-                for provider in providers:
-                    self.add_log(f"Testing {provider.upper()} API...")
-                    self.test_single_api(provider)
-                    time.sleep(1)  # Small delay between tests
-                
+                self.probe_all(self.PROVIDERS, self.get_probe_deadline(), on_result, force=True)
                 self.add_log("All API tests completed")
             except Exception as e:
                 self.add_log(f"Error testing APIs: {str(e)}")
@@ -625,7 +725,7 @@ Current Load: Medium
         
         def test_thread():
             try:
-                status = self.test_api_status(provider)
+                status = self.test_api_status(provider, force=True)
                 self.api_status[provider] = status
                 
                 if provider in self.api_cards:
@@ -646,8 +746,7 @@ Current Load: Medium
         self.add_log(f"Opening {provider.upper()} configuration...")
         
         # Switch to admin tab
-        self.app.tabview.set("⚙️ Quản trị")
-        self.app.admin_frame.admin_tabview.set("🔑 Cấu hình API")
+        self.app.show_tab("⚙️ Quản trị").admin_tabview.set("🔑 Cấu hình API")
         
         self.app.show_message("Thông báo", f"Đã chuyển đến cấu hình {provider.upper()}", "info")
     
@@ -672,6 +771,13 @@ Current Load: Medium
                         "average_uptime": sum([s.get("uptime", 0) for s in self.api_status.values()]) / len(self.api_status) if self.api_status else 0
                     },
                     "api_status": self.api_status,
+                    "metrics": {
+                        provider: {
+                            operation: self.metrics.snapshot(provider, operation)
+                            for operation in self.metrics.operations(provider)
+                        }
+                        for provider in self.metrics.providers()
+                    },
                     "logs": self.logs_text.get("1.0", "end")
                 }
                 
@@ -686,6 +792,15 @@ Current Load: Medium
                         f.write(f"API Details:\n")
                         for provider, status in self.api_status.items():
                             f.write(f"{provider.upper()}: {status}\n")
+                        f.write(f"\nLatency by operation (ms):\n")
+                        for provider, operations in report_data["metrics"].items():
+                            for operation, snap in operations.items():
+                                latency = snap["latency"]
+                                f.write(
+                                    f"{provider.upper()} {operation}: n={snap['count']} "
+                                    f"p50={latency['p50']:.0f} p95={latency['p95']:.0f} p99={latency['p99']:.0f} "
+                                    f"success={snap['success_rate']:.1f}% errors={snap['errors']}\n"
+                                )
                         f.write(f"\nLogs:\n{report_data['logs']}")
                 
                 self.add_log(f"Report exported to {file_path}")
@@ -720,4 +835,5 @@ Current Load: Medium
     
     def __del__(self):
         """Cleanup when frame is destroyed"""
-        self.monitoring_active = False
\ No newline at end of file
+        self.monitoring_active = False
+        self.probe_executor.shutdown(wait=False)
\ No newline at end of file
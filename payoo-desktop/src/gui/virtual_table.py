@@ -0,0 +1,333 @@
+import tkinter as tk
+import customtkinter as ctk
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+
+class VirtualTable:
+    """Bảng ảo hóa: chỉ tạo widget cho các dòng đang hiển thị (cộng thêm overscan)
+
+    Widget của dòng được tái sử dụng khi cuộn, dữ liệu lấy theo khối qua
+    fetch_rows(offset, limit) nên bảng 100k+ dòng vẫn cuộn mượt và bộ nhớ không
+    tăng theo số dòng.
+
+    columns: list dict {"key", "title", "width", "format" (tùy chọn), "color" (tùy chọn),
+    "bold" (tùy chọn), "sortable" (mặc định True)}.
+    actions: list (nhãn nút, callback(row)).
+    on_sort: callback(key, descending) khi bấm tiêu đề cột; nếu không có thì sắp xếp trong bộ nhớ
+    (chỉ với set_rows).
+    """
+
+    MAX_CACHED_BLOCKS = 20
+
+    def __init__(self, parent, columns: List[Dict[str, Any]], row_height: int = 30,
+                 overscan: int = 5, block_size: int = 200,
+                 actions: List[Tuple[str, Callable[[Dict[str, Any]], None]]] = None,
+                 on_sort: Callable[[str, bool], None] = None,
+                 empty_text: str = "Không có dữ liệu"):
+        self.columns = columns
+        self.row_height = row_height
+        self.overscan = overscan
+        self.block_size = block_size
+        self.actions = actions or []
+        self.on_sort = on_sort
+        self.empty_text = empty_text
+
+        self.total = 0
+        self.fetch_rows: Callable[[int, int], List[Dict[str, Any]]] = lambda offset, limit: []
+        self.rows: Optional[List[Dict[str, Any]]] = None
+        self.sort_key: Optional[str] = None
+        self.sort_descending = False
+
+        self._blocks: Dict[int, List[Dict[str, Any]]] = {}
+        self._pool: List[Dict[str, Any]] = []
+
+        self.create_ui(parent)
+
+    def create_ui(self, parent):
+        """Tạo tiêu đề cột, canvas và thanh cuộn"""
+        self.frame = ctk.CTkFrame(parent)
+
+        # Header
+        header_frame = ctk.CTkFrame(self.frame)
+        header_frame.pack(fill="x", padx=5, pady=5)
+
+        self.header_buttons = {}
+        for column in self.columns:
+            button = ctk.CTkButton(
+                header_frame,
+                text=column["title"],
+                font=ctk.CTkFont(size=12, weight="bold"),
+                width=column["width"],
+                fg_color="transparent",
+                text_color=("gray10", "gray90"),
+                hover=column.get("sortable", True),
+                command=lambda key=column["key"]: self.sort_by(key)
+            )
+            button.pack(side="left", padx=2)
+            self.header_buttons[column["key"]] = button
+
+        if self.actions:
+            ctk.CTkLabel(
+                header_frame,
+                text="Hành động",
+                font=ctk.CTkFont(size=12, weight="bold"),
+                width=35 * len(self.actions) + 30
+            ).pack(side="left", padx=2)
+
+        # Body: canvas cuộn theo pixel, các dòng là canvas window được đặt lại vị trí khi cuộn
+        body_frame = ctk.CTkFrame(self.frame)
+        body_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.canvas = tk.Canvas(
+            body_frame,
+            highlightthickness=0,
+            bd=0,
+            bg=self._canvas_color(),
+            yscrollincrement=self.row_height
+        )
+        self.scrollbar = ctk.CTkScrollbar(body_frame, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.empty_label = ctk.CTkLabel(
+            self.canvas,
+            text=self.empty_text,
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        )
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        self._bind_scroll(self.canvas)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def _canvas_color(self) -> str:
+        """Màu nền canvas theo theme CustomTkinter hiện tại"""
+        color = ctk.ThemeManager.theme["CTkFrame"]["top_fg_color"]
+        if isinstance(color, (list, tuple)):
+            return color[0] if ctk.get_appearance_mode() == "Light" else color[1]
+        return color
+
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", self._on_mousewheel)
+        widget.bind("<Button-5>", self._on_mousewheel)
+
+    # ----- Nguồn dữ liệu -----
+
+    def set_source(self, total: int, fetch_rows: Callable[[int, int], List[Dict[str, Any]]]):
+        """Đặt nguồn dữ liệu: tổng số dòng và hàm lấy dòng theo (offset, limit)"""
+        self.total = max(0, total)
+        self.fetch_rows = fetch_rows
+        self._blocks.clear()
+        for row in self._pool:
+            row["index"] = None
+
+        self._update_scrollregion()
+        self.canvas.yview_moveto(0)
+        self.render()
+
+    def set_rows(self, rows: List[Dict[str, Any]]):
+        """Đặt dữ liệu là list trong bộ nhớ"""
+        self.rows = list(rows)
+        if self.sort_key and not self.on_sort:
+            self._sort_rows()
+        self.set_source(len(self.rows), lambda offset, limit: self.rows[offset:offset + limit])
+
+    def refresh(self):
+        """Lấy lại dữ liệu cho các dòng đang hiển thị"""
+        self._blocks.clear()
+        for row in self._pool:
+            row["index"] = None
+        self.render()
+
+    def get_row(self, index: int) -> Optional[Dict[str, Any]]:
+        """Lấy dòng theo vị trí (cache theo khối block_size dòng)"""
+        if index < 0 or index >= self.total:
+            return None
+
+        block_index = index // self.block_size
+        block = self._blocks.get(block_index)
+        if block is None:
+            block = self.fetch_rows(block_index * self.block_size, self.block_size)
+            self._blocks[block_index] = block
+            if len(self._blocks) > self.MAX_CACHED_BLOCKS:
+                self._blocks.pop(next(iter(self._blocks)))
+
+        position = index - block_index * self.block_size
+        return block[position] if position < len(block) else None
+
+    # ----- Sắp xếp -----
+
+    def sort_by(self, key: str):
+        """Sắp xếp theo cột (bấm lần nữa để đảo chiều)"""
+        column = next((col for col in self.columns if col["key"] == key), None)
+        if column is None or not column.get("sortable", True):
+            return
+
+        if self.sort_key == key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = key
+            self.sort_descending = False
+        self._update_header()
+
+        if self.on_sort:
+            self.on_sort(self.sort_key, self.sort_descending)
+        elif self.rows is not None:
+            self._sort_rows()
+            self.set_source(len(self.rows), self.fetch_rows)
+
+    def set_sort(self, key: str, descending: bool = False):
+        """Đặt chiều sắp xếp hiện tại (chỉ cập nhật tiêu đề, không lấy lại dữ liệu)"""
+        self.sort_key = key
+        self.sort_descending = descending
+        self._update_header()
+
+    def _sort_rows(self):
+        key = self.sort_key
+        # Giá trị None luôn nằm cuối dù sắp xếp chiều nào
+        values = [row for row in self.rows if row.get(key) is not None]
+        missing = [row for row in self.rows if row.get(key) is None]
+        values.sort(key=lambda row: row[key], reverse=self.sort_descending)
+        self.rows = values + missing
+
+    def _update_header(self):
+        for column in self.columns:
+            title = column["title"]
+            if column["key"] == self.sort_key:
+                title += " ▼" if self.sort_descending else " ▲"
+            self.header_buttons[column["key"]].configure(text=title)
+
+    # ----- Hiển thị -----
+
+    def _update_scrollregion(self):
+        width = max(self.canvas.winfo_width(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, self.total * self.row_height))
+
+    def _on_resize(self, event):
+        for row in self._pool:
+            self.canvas.itemconfigure(row["window"], width=event.width)
+        self._update_scrollregion()
+        self.render()
+
+    def _on_view_changed(self, first, last):
+        """Canvas gọi khi vùng nhìn thay đổi (cuộn, đổi kích thước)"""
+        self.scrollbar.set(first, last)
+        self.render()
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(delta * 3, "units")
+        return "break"
+
+    def render(self):
+        """Gán dữ liệu cho các dòng trong vùng nhìn, tái sử dụng widget dòng"""
+        if self.total == 0:
+            for row in self._pool:
+                self._hide_row(row)
+            self.empty_label.place(relx=0.5, y=50, anchor="n")
+            return
+        self.empty_label.place_forget()
+
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(self.total, int((top + height) // self.row_height) + 1 + self.overscan)
+
+        while len(self._pool) < last - first:
+            self._pool.append(self._create_row())
+
+        # Dòng đã gán đúng vị trí thì giữ nguyên, còn lại đưa vào danh sách tái sử dụng
+        visible = set()
+        free = []
+        for row in self._pool:
+            if row["index"] is not None and first <= row["index"] < last:
+                visible.add(row["index"])
+            else:
+                free.append(row)
+
+        for index in range(first, last):
+            if index not in visible:
+                self._bind_row(free.pop(), index)
+
+        for row in free:
+            self._hide_row(row)
+
+    def _create_row(self) -> Dict[str, Any]:
+        """Tạo widget cho một dòng (chỉ gọi khi pool chưa đủ)"""
+        frame = ctk.CTkFrame(self.canvas, height=self.row_height, corner_radius=0)
+        row = {"frame": frame, "labels": [], "index": None}
+
+        for column in self.columns:
+            label = ctk.CTkLabel(
+                frame,
+                text="",
+                font=ctk.CTkFont(size=10, weight="bold" if column.get("bold") else "normal"),
+                width=column["width"]
+            )
+            label.pack(side="left", padx=2)
+            self._bind_scroll(label)
+            row["labels"].append(label)
+
+        if self.actions:
+            action_frame = ctk.CTkFrame(frame)
+            action_frame.pack(side="left", padx=2)
+            for text, callback in self.actions:
+                ctk.CTkButton(
+                    action_frame,
+                    text=text,
+                    command=lambda cb=callback, r=row: self._invoke(cb, r),
+                    width=30,
+                    height=20
+                ).pack(side="left", padx=1)
+
+        self._bind_scroll(frame)
+        row["window"] = self.canvas.create_window(
+            0, 0,
+            anchor="nw",
+            window=frame,
+            width=max(self.canvas.winfo_width(), 1),
+            height=self.row_height,
+            state="hidden"
+        )
+        return row
+
+    def _bind_row(self, row: Dict[str, Any], index: int):
+        """Gán dữ liệu dòng index cho widget dòng"""
+        data = self.get_row(index) or {}
+        row["index"] = index
+
+        for label, column in zip(row["labels"], self.columns):
+            value = data.get(column["key"])
+            formatter = column.get("format")
+            if value is None or value == "":
+                text = ""
+            else:
+                text = formatter(value) if formatter else str(value)
+
+            options = {"text": text}
+            if column.get("color"):
+                options["text_color"] = column["color"](data)
+            label.configure(**options)
+
+        self.canvas.coords(row["window"], 0, index * self.row_height)
+        self.canvas.itemconfigure(row["window"], state="normal")
+
+    def _hide_row(self, row: Dict[str, Any]):
+        row["index"] = None
+        self.canvas.itemconfigure(row["window"], state="hidden")
+
+    def _invoke(self, callback: Callable[[Dict[str, Any]], None], row: Dict[str, Any]):
+        if row["index"] is not None:
+            data = self.get_row(row["index"])
+            if data is not None:
+                callback(data)
@@ -1,8 +1,29 @@
 # Utilities Module
-from .config_manager import ConfigManager
-from .excel_processor import ExcelProcessor
+# Các class chỉ được import khi dùng tới (PEP 562), nên import src.utils.config_manager
+# hay src.utils.payment_store không kéo theo pandas/openpyxl
+import importlib
 
-__all__ = [
-    "ConfigManager",
-    "ExcelProcessor"
-]
\ No newline at end of file
+_EXPORTS = {
+    "ConfigManager": ".config_manager",
+    "ExcelProcessor": ".excel_processor",
+    "BulkLookupPipeline": ".bulk_lookup",
+    "PaymentStore": ".payment_store",
+    "HistoryIndex": ".history_index",
+    "SyntheticDataGenerator": ".synthetic_data",
+    "generate_dataset": ".synthetic_data"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Iterable, Iterator, Callable, Optional, Tuple
+
+from openpyxl import Workbook
+
+from ..api.async_clients import AsyncBIDVService, run_bounded
+
+
+class BulkLookupPipeline:
+    """Tra cứu hàng loạt hóa đơn từ kết quả ExcelProcessor.process_bill_upload
+
+    Hóa đơn được loại trùng theo (customer_id, bill_type), tra cứu BIDV với số request
+    đồng thời giới hạn và ghi từng dòng vào workbook write-only ngay khi có kết quả,
+    nên bộ nhớ không tăng theo số dòng. BIDV tra cứu theo mã khách hàng nên mỗi mã chỉ gọi
+    một lần; các dòng cùng mã khác loại hóa đơn dùng chung kết quả đó.
+
+    Kết quả đã tra được giữ trong LRU tối đa RESULT_CACHE_SIZE mã khách hàng (mã bị loại
+    khỏi LRU mà xuất hiện lại thì được tra cứu lại), dòng chờ ghi được ghi ngay khi vượt
+    READY_LIMIT. Riêng tập khóa đã gặp để loại trùng vẫn tăng theo số cặp
+    (customer_id, bill_type) khác nhau, vì loại trùng phải chính xác.
+    """
+
+    RESULT_CACHE_SIZE = 10000
+    READY_LIMIT = 1000
+
+    OUTPUT_COLUMNS = [
+        'row_number', 'customer_id', 'bill_type', 'amount', 'provider', 'period',
+        'lookup_status', 'bill_number', 'bill_amount', 'bill_status', 'due_date',
+        'customer_name', 'error'
+    ]
+
+    def __init__(self, bidv_service, concurrency: int = None,
+                 progress_callback: Callable[[Dict[str, Any]], None] = None,
+                 progress_interval: float = 0.5):
+        self.client = AsyncBIDVService(bidv_service, concurrency)
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+
+    def dedupe(self, bills: Iterable[Dict[str, Any]], stats: Dict[str, Any],
+               waiting: Dict[str, List[Dict[str, Any]]], results: "OrderedDict[str, List[Any]]",
+               ready: List[Tuple[Dict[str, Any], List[Any]]],
+               flush: Callable[[], None]) -> Iterator[Dict[str, Any]]:
+        """Bỏ các hóa đơn trùng (customer_id, bill_type), chỉ trả về dòng đầu tiên của mỗi mã khách hàng
+        
+        Dòng cùng mã khách hàng tới sau: chờ trong waiting nếu đang tra cứu, hoặc được ghép ngay
+        kết quả đã có (results) và đưa vào ready; gọi flush khi ready đạt READY_LIMIT.
+        """
+        seen = set()
+        for bill in bills:
+            customer_id = bill.get('customer_id', '')
+            key = (customer_id, bill.get('bill_type', ''))
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            
+            if customer_id in results:
+                results.move_to_end(customer_id)
+                ready.append((bill, results[customer_id]))
+                if len(ready) >= self.READY_LIMIT:
+                    flush()
+            elif customer_id in waiting:
+                waiting[customer_id].append(bill)
+            else:
+                waiting[customer_id] = []
+                yield bill
+
+    @staticmethod
+    def bill_columns(bill: Dict[str, Any]) -> List[Any]:
+        return [
+            bill.get('row_number'),
+            bill.get('customer_id', ''),
+            bill.get('bill_type', ''),
+            bill.get('amount'),
+            bill.get('provider', ''),
+            bill.get('period', '')
+        ]
+
+    @staticmethod
+    def result_columns(result: Dict[str, Any]) -> List[Any]:
+        """Các cột kết quả tra cứu (giữ lại cho các dòng cùng mã khách hàng)"""
+        bill_info = result.get("bill") or {}
+        customer = result.get("customer") or bill_info.get("customer") or {}
+
+        return [
+            "success" if result.get("success") else "failed",
+            bill_info.get('billNumber', ''),
+            bill_info.get('amount'),
+            bill_info.get('status', ''),
+            bill_info.get('dueDate', ''),
+            customer.get('name', ''),
+            '' if result.get("success") else result.get("message", '')
+        ]
+
+    def run(self, bills: Iterable[Dict[str, Any]], output_path: str, total: int = None) -> Dict[str, Any]:
+        """Chạy pipeline và ghi kết quả ra output_path (.xlsx)"""
+        try:
+            return asyncio.run(self._run_async(bills, output_path, total))
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Lỗi tra cứu hàng loạt: {str(e)}"
+            }
+        finally:
+            self.client.close()
+
+    async def _run_async(self, bills: Iterable[Dict[str, Any]], output_path: str,
+                         total: Optional[int]) -> Dict[str, Any]:
+        stats = {"done": 0, "lookups": 0, "success": 0, "failed": 0, "duplicates": 0}
+        waiting: Dict[str, List[Dict[str, Any]]] = {}
+        results: "OrderedDict[str, List[Any]]" = OrderedDict()
+        ready: List[Tuple[Dict[str, Any], List[Any]]] = []
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Lookup Results')
+        sheet.append(self.OUTPUT_COLUMNS)
+
+        start_time = time.monotonic()
+        last_report = 0.0
+
+        async def lookup(bill):
+            return await self.client.lookup_bill(bill['customer_id'])
+
+        def write(bill, columns):
+            sheet.append(self.bill_columns(bill) + columns)
+            stats["done"] += 1
+            stats[columns[0]] += 1
+
+        def flush():
+            for row_bill, row_columns in ready:
+                write(row_bill, row_columns)
+            ready.clear()
+
+        unique_bills = self.dedupe(bills, stats, waiting, results, ready, flush)
+        async for bill, result in run_bounded(lookup, unique_bills, self.client.concurrency):
+            stats["lookups"] += 1
+            customer_id = bill.get('customer_id', '')
+            columns = results[customer_id] = self.result_columns(result)
+            if len(results) > self.RESULT_CACHE_SIZE:
+                results.popitem(last=False)
+            for row_bill in [bill] + waiting.pop(customer_id, []):
+                write(row_bill, columns)
+            flush()
+
+            now = time.monotonic()
+            if self.progress_callback and now - last_report >= self.progress_interval:
+                last_report = now
+                self.progress_callback(self._progress(stats, total, now - start_time))
+
+        flush()
+        workbook.save(output_path)
+
+        elapsed = time.monotonic() - start_time
+        if self.progress_callback:
+            self.progress_callback(self._progress(stats, stats["done"] + stats["duplicates"], elapsed))
+
+        return {
+            "success": True,
+            "file_path": output_path,
+            "looked_up": stats["done"],
+            "lookups": stats["lookups"],
+            "found": stats["success"],
+            "failed": stats["failed"],
+            "duplicates": stats["duplicates"],
+            "elapsed": elapsed,
+            "message": f"Đã tra cứu {stats['done']} hóa đơn ({stats['success']} thành công, "
+                       f"{stats['duplicates']} trùng lặp)"
+        }
+
+    def _progress(self, stats: Dict[str, Any], total: Optional[int], elapsed: float) -> Dict[str, Any]:
+        """Tạo thông tin tiến độ: số lượng, tốc độ (HĐ/s) và thời gian còn lại"""
+        processed = stats["done"] + stats["duplicates"]
+        rate = stats["done"] / elapsed if elapsed > 0 else 0.0
+
+        eta = None
+        if total and rate > 0:
+            eta = max(total - processed, 0) / rate
+
+        return {
+            "processed": processed,
+            "total": total,
+            "looked_up": stats["done"],
+            "success": stats["success"],
+            "failed": stats["failed"],
+            "duplicates": stats["duplicates"],
+            "rate": rate,
+            "elapsed": elapsed,
+            "eta": eta
+        }
@@ -92,8 +92,20 @@ class ConfigManager:
             "api_settings": {
                 "timeout": 30,
                 "retry_count": 3,
+                "pool_size": 10,
+                "concurrent_requests": 5,
+                "hedge_requests": False,
+                "hedge_max_ratio": 0.05,
                 "sandbox_mode": True
             },
+            "performance_settings": {
+                "enable_cache": True,
+                "cache_size": 100,
+                "disk_cache_size": 50,
+                "max_upload_size_mb": 10,
+                "max_stream_upload_size_mb": 1024,
+                "upload_batch_size": 5000
+            },
             "ui_settings": {
                 "show_notifications": True,
                 "sound_enabled": True,
@@ -1,15 +1,48 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Iterable, Tuple
 import os
+import itertools
 from datetime import datetime
 import tempfile
 
+DEFAULT_BATCH_SIZE = 5000
+
+PAYMENT_COLUMNS = [
+    'transaction_id', 'customer_id', 'customer_name', 'bill_type', 'provider',
+    'amount', 'payment_method', 'status', 'payment_date', 'description'
+]
+
+HISTORY_HEADERS = {
+    'transaction_id': 'Mã giao dịch',
+    'customer_id': 'Mã khách hàng',
+    'customer_name': 'Tên khách hàng',
+    'bill_type': 'Loại hóa đơn',
+    'provider': 'Nhà cung cấp',
+    'amount': 'Số tiền',
+    'payment_method': 'Phương thức',
+    'status': 'Trạng thái',
+    'payment_date': 'Ngày thanh toán',
+    'description': 'Mô tả'
+}
+
+REPORT_DETAIL_HEADERS = {
+    'transaction_id': 'Mã GD',
+    'payment_date': 'Ngày',
+    'customer_name': 'Khách hàng',
+    'bill_type': 'Loại HĐ',
+    'amount': 'Số tiền',
+    'payment_method': 'Phương thức',
+    'status': 'Trạng thái'
+}
+
 class ExcelProcessor:
     """Xử lý file Excel cho bulk operations"""
     
-    def __init__(self):
+    def __init__(self, max_file_size_mb: int = 10, max_stream_file_size_mb: int = 1024):
         self.supported_formats = ['.xlsx', '.xls', '.csv']
+        self.max_file_size_mb = max_file_size_mb
+        self.max_stream_file_size_mb = max_stream_file_size_mb
         
     def read_excel_file(self, file_path: str) -> Dict[str, Any]:
         """Đọc file Excel"""
@@ -40,6 +73,69 @@ class ExcelProcessor:
                 "message": f"Lỗi đọc file: {str(e)}"
             }
     
+    def iter_excel_chunks(self, file_path: str, chunk_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """Đọc file theo từng khối chunk_size dòng (index liên tục giữa các khối)"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        
+        if file_ext == '.csv':
+            yield from pd.read_csv(file_path, encoding='utf-8', chunksize=chunk_size)
+        elif file_ext == '.xlsx':
+            yield from self._iter_xlsx_chunks(file_path, chunk_size)
+        elif file_ext == '.xls':
+            # xlrd không hỗ trợ đọc stream, đọc cả file rồi chia khối
+            df = pd.read_excel(file_path, engine='xlrd')
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+        else:
+            raise ValueError(f"Định dạng file không hỗ trợ: {file_ext}")
+    
+    def _iter_xlsx_chunks(self, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Đọc .xlsx bằng openpyxl read_only, không nạp cả workbook vào bộ nhớ"""
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            # Sheet đầu tiên như pd.read_excel, không phụ thuộc sheet đang chọn khi lưu file
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+            
+            offset = 0
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                yield pd.DataFrame(chunk, columns=columns, index=pd.RangeIndex(offset, offset + len(chunk)))
+                offset += len(chunk)
+        finally:
+            workbook.close()
+    
+    def estimate_rows(self, file_path: str) -> Optional[int]:
+        """Ước lượng số dòng dữ liệu mà không đọc nội dung (dùng cho tiến độ/ETA)"""
+        try:
+            file_ext = os.path.splitext(file_path)[1].lower()
+            
+            if file_ext == '.csv':
+                lines = 0
+                with open(file_path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        lines += block.count(b'\n')
+                return max(lines - 1, 0)
+            
+            if file_ext == '.xlsx':
+                from openpyxl import load_workbook
+                workbook = load_workbook(file_path, read_only=True)
+                try:
+                    max_row = workbook.worksheets[0].max_row
+                finally:
+                    workbook.close()
+                return max(max_row - 1, 0) if max_row else None
+        except Exception:
+            pass
+        return None
+    
     def validate_bill_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Validate dữ liệu hóa đơn"""
         required_columns = ['customer_id', 'bill_type', 'amount']
@@ -57,38 +153,130 @@ class ExcelProcessor:
             validation_result["errors"].append(f"Thiếu cột bắt buộc: {', '.join(missing_columns)}")
             return validation_result
         
-        # Kiểm tra dữ liệu từng dòng
-        for index, row in df.iterrows():
+        # Kiểm tra theo cột (vectorized) thay vì duyệt từng dòng
+        error_mask, errors = self._row_errors(df)
+        validation_result["errors"].extend(errors)
+        validation_result["processed_rows"] = int(len(df) - error_mask.sum())
+        
+        if validation_result["errors"]:
+            validation_result["valid"] = False
+        
+        return validation_result
+    
+    def _row_errors(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+        """Trả về mask các dòng lỗi và thông báo lỗi từng dòng (Dòng N theo index)"""
+        missing_customer = self._blank_mask(df['customer_id'])
+        missing_bill_type = self._blank_mask(df['bill_type'])
+        invalid_amount, non_positive_amount = self._amount_masks(df['amount'])
+        
+        error_mask = missing_customer | missing_bill_type | invalid_amount | non_positive_amount
+        
+        # Chỉ tạo thông báo cho các dòng lỗi
+        errors = []
+        for position in np.flatnonzero(error_mask):
             row_errors = []
-            
-            # Kiểm tra customer_id
-            if pd.isna(row['customer_id']) or str(row['customer_id']).strip() == '':
+            if missing_customer[position]:
                 row_errors.append("Thiếu mã khách hàng")
-            
-            # Kiểm tra bill_type
-            if pd.isna(row['bill_type']) or str(row['bill_type']).strip() == '':
+            if missing_bill_type[position]:
                 row_errors.append("Thiếu loại hóa đơn")
+            if invalid_amount[position]:
+                row_errors.append("Số tiền không hợp lệ")
+            elif non_positive_amount[position]:
+                row_errors.append("Số tiền phải lớn hơn 0")
             
-            # Kiểm tra amount
+            errors.append(f"Dòng {df.index[position] + 2}: {', '.join(row_errors)}")
+        
+        return error_mask, errors
+    
+    @staticmethod
+    def _blank_mask(column: pd.Series) -> np.ndarray:
+        """Mask các ô trống: NaN/None hoặc chuỗi chỉ có khoảng trắng"""
+        mask = column.isna().to_numpy(dtype=bool)
+        if not pd.api.types.is_numeric_dtype(column.dtype):
             try:
-                amount = float(row['amount'])
-                if amount <= 0:
-                    row_errors.append("Số tiền phải lớn hơn 0")
-            except (ValueError, TypeError):
-                row_errors.append("Số tiền không hợp lệ")
+                # .str trả về NaN cho các ô không phải chuỗi
+                blank = column.str.strip().eq('')
+            except AttributeError:
+                # Cột không chứa chuỗi nào (ví dụ: datetime)
+                return mask
+            mask = mask | blank.to_numpy(dtype=bool, na_value=False)
+        return mask
+    
+    @staticmethod
+    def _amount_masks(column: pd.Series):
+        """Mask số tiền không hợp lệ và số tiền <= 0 (cùng quy tắc với float())"""
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            values = column.to_numpy(dtype=float, na_value=np.nan)
+            invalid = np.zeros(len(column), dtype=bool)
+        else:
+            values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float, na_value=np.nan, copy=True)
             
-            if row_errors:
-                validation_result["errors"].append(f"Dòng {index + 2}: {', '.join(row_errors)}")
-            else:
-                validation_result["processed_rows"] += 1
+            # Ô trống không hợp lệ (float(None) lỗi), không để lọt xuống _build_bills
+            invalid = column.isna().to_numpy(dtype=bool, copy=True)
+            
+            # Các ô to_numeric không chuyển được: kiểm tra lại bằng float() như trước
+            unresolved = np.flatnonzero(np.isnan(values) & ~invalid)
+            raw_values = column.to_numpy(dtype=object)
+            for position in unresolved:
+                try:
+                    values[position] = float(raw_values[position])
+                except (ValueError, TypeError):
+                    invalid[position] = True
         
-        if validation_result["errors"]:
-            validation_result["valid"] = False
+        with np.errstate(invalid='ignore'):
+            non_positive = values <= 0
+        return invalid, non_positive & ~invalid
+    
+    def _build_bills(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Chuyển các dòng đã validate thành danh sách hóa đơn"""
+        def column(name):
+            return df[name].tolist() if name in df.columns else [''] * len(df)
         
-        return validation_result
+        processed_bills = []
+        rows = zip(
+            df.index.tolist(), column('customer_id'), column('bill_type'), column('amount'),
+            column('provider'), column('description'), column('due_date'), column('period')
+        )
+        for index, customer_id, bill_type, amount, provider, description, due_date, period in rows:
+            try:
+                processed_bills.append({
+                    "customer_id": str(customer_id).strip(),
+                    "bill_type": str(bill_type).strip(),
+                    "amount": float(amount),
+                    "provider": str(provider).strip(),
+                    "description": str(description).strip(),
+                    "due_date": str(due_date).strip(),
+                    "period": str(period).strip(),
+                    "row_number": index + 2
+                })
+            except Exception as e:
+                continue
+        
+        return processed_bills
+    
+    def iter_bill_batches(self, chunks: Iterable[pd.DataFrame],
+                          errors: List[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Validate và chuyển từng khối thành lô hóa đơn; dòng lỗi được bỏ qua và ghi vào errors"""
+        for chunk in chunks:
+            error_mask, chunk_errors = self._row_errors(chunk)
+            if errors is not None:
+                errors.extend(chunk_errors)
+            
+            bills = self._build_bills(chunk[~error_mask] if chunk_errors else chunk)
+            if bills:
+                yield bills
     
-    def process_bill_upload(self, file_path: str) -> Dict[str, Any]:
-        """Xử lý upload file hóa đơn"""
+    def process_bill_upload(self, file_path: str, stream: bool = False,
+                            batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """Xử lý upload file hóa đơn
+        
+        stream=True: đọc file theo khối (openpyxl read_only cho .xlsx, chunksize cho .csv) và
+        trả về "batches" là generator các lô hóa đơn hợp lệ, tối đa batch_size hóa đơn mỗi lô.
+        Dòng lỗi không làm dừng cả file mà được thêm dần vào "errors" khi duyệt batches.
+        """
+        if stream:
+            return self._process_bill_upload_stream(file_path, batch_size)
+        
         try:
             # Đọc file
             read_result = self.read_excel_file(file_path)
@@ -107,22 +295,7 @@ class ExcelProcessor:
                 }
             
             # Xử lý dữ liệu
-            processed_bills = []
-            for index, row in df.iterrows():
-                try:
-                    bill_data = {
-                        "customer_id": str(row['customer_id']).strip(),
-                        "bill_type": str(row['bill_type']).strip(),
-                        "amount": float(row['amount']),
-                        "provider": str(row.get('provider', '')).strip(),
-                        "description": str(row.get('description', '')).strip(),
-                        "due_date": str(row.get('due_date', '')).strip(),
-                        "period": str(row.get('period', '')).strip(),
-                        "row_number": index + 2
-                    }
-                    processed_bills.append(bill_data)
-                except Exception as e:
-                    continue
+            processed_bills = self._build_bills(df)
             
             return {
                 "success": True,
@@ -138,6 +311,42 @@ class ExcelProcessor:
                 "message": f"Lỗi xử lý file: {str(e)}"
             }
     
+    def _process_bill_upload_stream(self, file_path: str, batch_size: int) -> Dict[str, Any]:
+        """Xử lý upload file hóa đơn theo chế độ stream"""
+        try:
+            chunks = self.iter_excel_chunks(file_path, batch_size)
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                return {
+                    "success": False,
+                    "message": "File không có dữ liệu"
+                }
+            
+            # Kiểm tra cột bắt buộc ngay từ khối đầu tiên
+            required_columns = ['customer_id', 'bill_type', 'amount']
+            missing_columns = [col for col in required_columns if col not in first_chunk.columns]
+            if missing_columns:
+                return {
+                    "success": False,
+                    "message": "Dữ liệu không hợp lệ",
+                    "errors": [f"Thiếu cột bắt buộc: {', '.join(missing_columns)}"]
+                }
+            
+            errors = []
+            return {
+                "success": True,
+                "batches": self.iter_bill_batches(itertools.chain([first_chunk], chunks), errors),
+                "errors": errors,
+                "estimated_rows": self.estimate_rows(file_path),
+                "message": "Đang xử lý file theo từng khối"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Lỗi xử lý file: {str(e)}"
+            }
+    
     def create_bill_template(self) -> Dict[str, Any]:
         """Tạo template Excel cho hóa đơn"""
         try:
@@ -198,62 +407,133 @@ class ExcelProcessor:
                 "message": f"Lỗi tạo template: {str(e)}"
             }
     
-    def export_payment_history(self, payments: List[Dict[str, Any]], file_path: str) -> Dict[str, Any]:
-        """Xuất lịch sử thanh toán ra Excel"""
+    def _payments_frame(self, payments) -> pd.DataFrame:
+        """Tạo DataFrame cột từ một lô giao dịch (một lần cho mọi sheet)"""
+        if isinstance(payments, pd.DataFrame):
+            df = payments.reindex(columns=PAYMENT_COLUMNS)
+        else:
+            df = pd.DataFrame.from_records(payments, columns=PAYMENT_COLUMNS)
+        
+        amount = pd.to_numeric(df['amount'], errors='coerce')
+        if amount.hasnans:
+            amount = amount.fillna(0)
+        df['amount'] = amount
+        
+        text_columns = [col for col in PAYMENT_COLUMNS if col != 'amount']
+        df[text_columns] = df[text_columns].fillna('')
+        return df
+    
+    def _payment_frames(self, payments) -> Iterator[pd.DataFrame]:
+        """Các khối DataFrame từ list dict/DataFrame (một khối) hoặc iterable các lô
+        (ví dụ PaymentStore.iter_payments), để không phải giữ toàn bộ lịch sử trong bộ nhớ"""
+        if payments is None:
+            return
+        if isinstance(payments, pd.DataFrame) or (isinstance(payments, list) and payments and isinstance(payments[0], dict)):
+            payments = [payments]
+        for batch in payments:
+            if len(batch):
+                yield self._payments_frame(batch)
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {"total": 0, "amount": 0.0, "success": 0, "failed": 0, "groups": {}}
+    
+    @staticmethod
+    def _add_stats(stats: Dict[str, Any], df: pd.DataFrame, group_columns: Iterable[str] = ()):
+        """Cộng dồn tổng số, tổng tiền, thành công/thất bại và số lượng/tổng tiền theo nhóm của một khối"""
+        status_counts = df['status'].value_counts()
+        stats["total"] += len(df)
+        stats["amount"] += float(df['amount'].sum())
+        stats["success"] += int(status_counts.get('success', 0))
+        stats["failed"] += int(status_counts.get('failed', 0))
+        
+        for column in group_columns:
+            # Giữ thứ tự xuất hiện đầu tiên qua các khối
+            groups = stats["groups"].setdefault(column, {})
+            keys = df[column].replace('', 'Khác')
+            grouped = df['amount'].groupby(keys, sort=False).agg(['size', 'sum'])
+            for key, count, amount in zip(grouped.index, grouped['size'], grouped['sum']):
+                previous = groups.get(key, (0, 0.0))
+                groups[key] = (previous[0] + int(count), previous[1] + float(amount))
+    
+    @staticmethod
+    def _success_rate(stats: Dict[str, Any]) -> float:
+        return stats["success"] / stats["total"] * 100 if stats["total"] else 0.0
+    
+    @staticmethod
+    def _group_summary(stats: Dict[str, Any], column: str, label: str) -> pd.DataFrame:
+        """Bảng số lượng/tổng tiền/tỷ lệ theo nhóm đã cộng dồn"""
+        groups = stats["groups"].get(column, {})
+        total = stats["total"]
+        return pd.DataFrame({
+            label: list(groups),
+            'Số lượng': [count for count, _ in groups.values()],
+            'Tổng tiền': [f"{amount:,.0f} VNĐ" for _, amount in groups.values()],
+            'Tỷ lệ': [f"{count / total * 100:.1f}%" for count, _ in groups.values()]
+        })
+    
+    @staticmethod
+    def _append_frame(sheet, df: pd.DataFrame, headers: List[str] = None):
+        """Ghi DataFrame vào sheet write-only theo từng dòng (không giữ cell trong bộ nhớ)"""
+        sheet.append(headers or [str(col) for col in df.columns])
+        for row in df.itertuples(index=False, name=None):
+            sheet.append(row)
+    
+    def _write_sheet(self, workbook, title: str, df: pd.DataFrame, headers: List[str] = None):
+        self._append_frame(workbook.create_sheet(title), df, headers)
+    
+    def export_payment_history(self, payments, file_path: str) -> Dict[str, Any]:
+        """Xuất lịch sử thanh toán ra Excel
+        
+        payments: list dict, DataFrame hoặc iterable các lô (PaymentStore.iter_payments); các lô
+        được ghi lần lượt vào sheet write-only nên bộ nhớ không tăng theo số giao dịch.
+        """
         try:
-            if not payments:
+            frames = self._payment_frames(payments)
+            first = next(frames, None)
+            if first is None:
                 return {
                     "success": False,
                     "message": "Không có dữ liệu để xuất"
                 }
             
-            # Chuyển đổi dữ liệu
-            export_data = []
-            for payment in payments:
-                export_data.append({
-                    'Mã giao dịch': payment.get('transaction_id', ''),
-                    'Mã khách hàng': payment.get('customer_id', ''),
-                    'Tên khách hàng': payment.get('customer_name', ''),
-                    'Loại hóa đơn': payment.get('bill_type', ''),
-                    'Nhà cung cấp': payment.get('provider', ''),
-                    'Số tiền': payment.get('amount', 0),
-                    'Phương thức': payment.get('payment_method', ''),
-                    'Trạng thái': payment.get('status', ''),
-                    'Ngày thanh toán': payment.get('payment_date', ''),
-                    'Mô tả': payment.get('description', '')
-                })
+            from openpyxl import Workbook
             
-            df = pd.DataFrame(export_data)
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet('Payment History')
+            sheet.append([HISTORY_HEADERS[col] for col in PAYMENT_COLUMNS])
             
-            # Ghi file
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Payment History', index=False)
-                
-                # Thêm sheet thống kê
-                stats_data = {
-                    'Thống kê': [
-                        'Tổng số giao dịch',
-                        'Tổng số tiền',
-                        'Giao dịch thành công',
-                        'Giao dịch thất bại',
-                        'Tỷ lệ thành công'
-                    ],
-                    'Giá trị': [
-                        len(payments),
-                        sum([p.get('amount', 0) for p in payments]),
-                        len([p for p in payments if p.get('status') == 'success']),
-                        len([p for p in payments if p.get('status') == 'failed']),
-                        f"{len([p for p in payments if p.get('status') == 'success']) / len(payments) * 100:.1f}%"
-                    ]
-                }
-                stats_df = pd.DataFrame(stats_data)
-                stats_df.to_excel(writer, sheet_name='Statistics', index=False)
+            stats = self._new_stats()
+            for df in itertools.chain([first], frames):
+                self._add_stats(stats, df)
+                for row in df.itertuples(index=False, name=None):
+                    sheet.append(row)
+            
+            # Thêm sheet thống kê
+            stats_df = pd.DataFrame({
+                'Thống kê': [
+                    'Tổng số giao dịch',
+                    'Tổng số tiền',
+                    'Giao dịch thành công',
+                    'Giao dịch thất bại',
+                    'Tỷ lệ thành công'
+                ],
+                'Giá trị': [
+                    stats["total"],
+                    stats["amount"],
+                    stats["success"],
+                    stats["failed"],
+                    f"{self._success_rate(stats):.1f}%"
+                ]
+            })
+            self._write_sheet(workbook, 'Statistics', stats_df)
+            workbook.save(file_path)
             
             return {
                 "success": True,
                 "file_path": file_path,
-                "total_records": len(payments),
-                "message": f"Đã xuất {len(payments)} bản ghi"
+                "total_records": stats["total"],
+                "message": f"Đã xuất {stats['total']} bản ghi"
             }
             
         except Exception as e:
@@ -262,100 +542,71 @@ class ExcelProcessor:
                 "message": f"Lỗi xuất file: {str(e)}"
             }
     
-    def create_payment_report(self, payments: List[Dict[str, Any]], 
+    def create_payment_report(self, payments, 
                              start_date: str = None, end_date: str = None) -> Dict[str, Any]:
-        """Tạo báo cáo thanh toán"""
+        """Tạo báo cáo thanh toán (payments: list dict, DataFrame hoặc iterable các lô)
+        
+        Sheet chi tiết được ghi theo từng lô; các sheet tổng hợp được tạo trước (để giữ thứ tự
+        sheet) và điền sau khi đã cộng dồn hết các lô.
+        """
         try:
-            if not payments:
+            frames = self._payment_frames(payments)
+            first = next(frames, None)
+            if first is None:
                 return {
                     "success": False,
                     "message": "Không có dữ liệu để tạo báo cáo"
                 }
             
+            from openpyxl import Workbook
+            
+            workbook = Workbook(write_only=True)
+            overview_sheet = workbook.create_sheet('Tổng quan')
+            bill_type_sheet = workbook.create_sheet('Theo loại hóa đơn')
+            method_sheet = workbook.create_sheet('Theo phương thức')
+            
+            # Sheet 4: Chi tiết giao dịch
+            detail_sheet = workbook.create_sheet('Chi tiết')
+            detail_sheet.append(list(REPORT_DETAIL_HEADERS.values()))
+            
+            stats = self._new_stats()
+            for df in itertools.chain([first], frames):
+                self._add_stats(stats, df, ('bill_type', 'payment_method'))
+                for row in df[list(REPORT_DETAIL_HEADERS)].itertuples(index=False, name=None):
+                    detail_sheet.append(row)
+            
+            # Sheet 1: Tổng quan
+            overview_df = pd.DataFrame({
+                'Thống kê tổng quan': [
+                    'Tổng số giao dịch',
+                    'Tổng giá trị',
+                    'Giao dịch thành công',
+                    'Giao dịch thất bại',
+                    'Tỷ lệ thành công',
+                    'Giá trị trung bình'
+                ],
+                'Giá trị': [
+                    stats["total"],
+                    f"{stats['amount']:,.0f} VNĐ",
+                    stats["success"],
+                    stats["failed"],
+                    f"{self._success_rate(stats):.1f}%",
+                    f"{stats['amount'] / stats['total']:,.0f} VNĐ"
+                ]
+            })
+            
+            # Sheet 2, 3: Theo loại hóa đơn, theo phương thức thanh toán
+            for sheet, df in (
+                (overview_sheet, overview_df),
+                (bill_type_sheet, self._group_summary(stats, 'bill_type', 'Loại hóa đơn')),
+                (method_sheet, self._group_summary(stats, 'payment_method', 'Phương thức'))
+            ):
+                self._append_frame(sheet, df)
+            
             # Tạo file tạm
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
             temp_file.close()
-            
-            with pd.ExcelWriter(temp_file.name, engine='openpyxl') as writer:
-                # Sheet 1: Tổng quan
-                overview_data = {
-                    'Thống kê tổng quan': [
-                        'Tổng số giao dịch',
-                        'Tổng giá trị',
-                        'Giao dịch thành công',
-                        'Giao dịch thất bại',
-                        'Tỷ lệ thành công',
-                        'Giá trị trung bình'
-                    ],
-                    'Giá trị': [
-                        len(payments),
-                        f"{sum([p.get('amount', 0) for p in payments]):,.0f} VNĐ",
-                        len([p for p in payments if p.get('status') == 'success']),
-                        len([p for p in payments if p.get('status') == 'failed']),
-                        f"{len([p for p in payments if p.get('status') == 'success']) / len(payments) * 100:.1f}%",
-                        f"{sum([p.get('amount', 0) for p in payments]) / len(payments):,.0f} VNĐ"
-                    ]
-                }
-                overview_df = pd.DataFrame(overview_data)
-                overview_df.to_excel(writer, sheet_name='Tổng quan', index=False)
-                
-                # Sheet 2: Theo loại hóa đơn
-                bill_types = {}
-                for payment in payments:
-                    bill_type = payment.get('bill_type', 'Khác')
-                    if bill_type not in bill_types:
-                        bill_types[bill_type] = {"count": 0, "amount": 0}
-                    bill_types[bill_type]["count"] += 1
-                    bill_types[bill_type]["amount"] += payment.get('amount', 0)
-                
-                bill_type_data = []
-                for bill_type, stats in bill_types.items():
-                    bill_type_data.append({
-                        'Loại hóa đơn': bill_type,
-                        'Số lượng': stats["count"],
-                        'Tổng tiền': f"{stats['amount']:,.0f} VNĐ",
-                        'Tỷ lệ': f"{stats['count'] / len(payments) * 100:.1f}%"
-                    })
-                
-                bill_type_df = pd.DataFrame(bill_type_data)
-                bill_type_df.to_excel(writer, sheet_name='Theo loại hóa đơn', index=False)
-                
-                # Sheet 3: Theo phương thức thanh toán
-                payment_methods = {}
-                for payment in payments:
-                    method = payment.get('payment_method', 'Khác')
-                    if method not in payment_methods:
-                        payment_methods[method] = {"count": 0, "amount": 0}
-                    payment_methods[method]["count"] += 1
-                    payment_methods[method]["amount"] += payment.get('amount', 0)
-                
-                method_data = []
-                for method, stats in payment_methods.items():
-                    method_data.append({
-                        'Phương thức': method,
-                        'Số lượng': stats["count"],
-                        'Tổng tiền': f"{stats['amount']:,.0f} VNĐ",
-                        'Tỷ lệ': f"{stats['count'] / len(payments) * 100:.1f}%"
-                    })
-                
-                method_df = pd.DataFrame(method_data)
-                method_df.to_excel(writer, sheet_name='Theo phương thức', index=False)
-                
-                # Sheet 4: Chi tiết giao dịch
-                detail_data = []
-                for payment in payments:
-                    detail_data.append({
-                        'Mã GD': payment.get('transaction_id', ''),
-                        'Ngày': payment.get('payment_date', ''),
-                        'Khách hàng': payment.get('customer_name', ''),
-                        'Loại HĐ': payment.get('bill_type', ''),
-                        'Số tiền': payment.get('amount', 0),
-                        'Phương thức': payment.get('payment_method', ''),
-                        'Trạng thái': payment.get('status', '')
-                    })
-                
-                detail_df = pd.DataFrame(detail_data)
-                detail_df.to_excel(writer, sheet_name='Chi tiết', index=False)
+            workbook.save(temp_file.name)
             
             return {
                 "success": True,
@@ -369,8 +620,8 @@ class ExcelProcessor:
                 "message": f"Lỗi tạo báo cáo: {str(e)}"
             }
     
-    def validate_file_format(self, file_path: str) -> Dict[str, Any]:
-        """Validate định dạng file"""
+    def validate_file_format(self, file_path: str, streaming: bool = False) -> Dict[str, Any]:
+        """Validate định dạng file (streaming=True cho phép file lớn hơn khi đọc theo khối)"""
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
             
@@ -387,12 +638,13 @@ class ExcelProcessor:
                     "message": "File không tồn tại"
                 }
             
-            # Kiểm tra kích thước file (max 10MB)
+            # Kiểm tra kích thước file
+            max_size_mb = self.max_stream_file_size_mb if streaming else self.max_file_size_mb
             file_size = os.path.getsize(file_path)
-            if file_size > 10 * 1024 * 1024:
+            if file_size > max_size_mb * 1024 * 1024:
                 return {
                     "valid": False,
-                    "message": "File quá lớn (tối đa 10MB)"
+                    "message": f"File quá lớn (tối đa {max_size_mb}MB)"
                 }
             
             return {
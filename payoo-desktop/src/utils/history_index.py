@@ -0,0 +1,235 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import numpy as np
+
+# Cột chuỗi giữ thêm để sắp xếp, theo thứ tự sau (id, payment_date, status, payment_method, amount)
+TEXT_COLUMNS = ("transaction_id", "customer_name", "bill_type")
+
+
+class HistoryIndex:
+    """Index trong bộ nhớ để lọc lịch sử giao dịch
+
+    - Mảng timestamp đã sắp xếp, khoảng ngày được tìm bằng bisect (np.searchsorted)
+    - Bitmap cho từng trạng thái và phương thức thanh toán
+    - Đoạn ngày đã tìm được giữ lại; đổi trạng thái/phương thức chỉ giao (AND) bitmap
+      trên đoạn đó, đổi ngày chỉ chạy lại bisect
+    - Sắp xếp theo cột khác ngày dùng hạng (rank) của từng dòng, tính một lần cho mỗi cột
+
+    Dữ liệu được đồng bộ từ PaymentStore theo updated_at (chỉ lấy dòng mới/thay đổi).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.amounts = np.empty(0, dtype=np.float64)
+        self.statuses = np.empty(0, dtype=object)
+        self.methods = np.empty(0, dtype=object)
+        self.texts: Dict[str, np.ndarray] = {name: np.empty(0, dtype=object) for name in TEXT_COLUMNS}
+        self.last_sync: Optional[str] = None
+
+        self._status_bitmaps: Dict[str, np.ndarray] = {}
+        self._method_bitmaps: Dict[str, np.ndarray] = {}
+        self._ranks: Dict[str, np.ndarray] = {}
+
+        # Tiêu chí hiện tại, đoạn ngày và vị trí các dòng khớp (tăng dần theo thời gian)
+        self.criteria = {"start_date": None, "end_date": None, "status": None, "payment_method": None}
+        self._date_range: Tuple[int, int] = (0, 0)
+        self._result: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ----- Xây dựng / đồng bộ -----
+
+    @staticmethod
+    def to_timestamps(dates: Iterable[str]) -> np.ndarray:
+        """Chuyển chuỗi 'yyyy-mm-dd HH:MM[:SS]' sang giây (parse vectorized một lần)"""
+        values = np.array([date.replace(" ", "T") for date in dates], dtype="datetime64[s]")
+        return values.astype(np.int64)
+
+    def build(self, rows: List[Tuple]):
+        """Xây index từ list (id, payment_date, status, payment_method, amount, *TEXT_COLUMNS)"""
+        with self._lock:
+            columns = list(zip(*rows)) if rows else [()] * (5 + len(TEXT_COLUMNS))
+            ids, dates, statuses, methods, amounts = columns[:5]
+
+            timestamps = self.to_timestamps(dates)
+            order = np.argsort(timestamps, kind="stable")
+
+            self.ids = np.asarray(ids, dtype=np.int64)[order]
+            self.timestamps = timestamps[order]
+            self.amounts = np.asarray(amounts, dtype=np.float64)[order]
+            self.statuses = np.asarray(statuses, dtype=object)[order]
+            self.methods = np.asarray(methods, dtype=object)[order]
+            self.texts = {name: np.asarray(values, dtype=object)[order]
+                          for name, values in zip(TEXT_COLUMNS, columns[5:])}
+            self._rebuild_bitmaps()
+
+    def _rebuild_bitmaps(self):
+        self._status_bitmaps = {value: self.statuses == value for value in set(self.statuses.tolist())}
+        self._method_bitmaps = {value: self.methods == value for value in set(self.methods.tolist())}
+        self._ranks = {}
+        self._apply_criteria()
+
+    def sync(self, store) -> int:
+        """Đồng bộ các giao dịch mới/thay đổi kể từ lần trước, trả về số dòng đã áp dụng"""
+        sync_time, rows = store.changed_since(self.last_sync)
+
+        with self._lock:
+            if self.last_sync is None:
+                self.build(rows)
+            elif rows:
+                self._merge(rows)
+            self.last_sync = sync_time
+        return len(rows)
+
+    def _merge(self, rows: List[Tuple]):
+        """Áp dụng dòng mới hoặc đã đổi trạng thái"""
+        known = np.isin(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)), self.ids)
+        new_rows = [row for row, exists in zip(rows, known) if not exists]
+
+        for (payment_id, payment_date, status, method, amount, *texts), exists in zip(rows, known):
+            if not exists:
+                continue
+            # Ít dòng thay đổi mỗi lần đồng bộ nên tìm tuyến tính là đủ
+            position = int(np.flatnonzero(self.ids == payment_id)[0])
+            self.statuses[position] = status
+            self.methods[position] = method
+            self.amounts[position] = amount
+            self.timestamps[position] = self.to_timestamps([payment_date])[0]
+            for name, value in zip(TEXT_COLUMNS, texts):
+                self.texts[name][position] = value
+
+        if new_rows:
+            columns = list(zip(*new_rows))
+            ids, dates, statuses, methods, amounts = columns[:5]
+            self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+            self.timestamps = np.concatenate([self.timestamps, self.to_timestamps(dates)])
+            self.amounts = np.concatenate([self.amounts, np.asarray(amounts, dtype=np.float64)])
+            self.statuses = np.concatenate([self.statuses, np.asarray(statuses, dtype=object)])
+            self.methods = np.concatenate([self.methods, np.asarray(methods, dtype=object)])
+            self.texts = {name: np.concatenate([self.texts[name], np.asarray(values, dtype=object)])
+                          for name, values in zip(TEXT_COLUMNS, columns[5:])}
+
+        # Giao dịch mới thường là mới nhất nên thứ tự vẫn giữ nguyên; chỉ sắp xếp lại khi cần
+        if len(self.timestamps) > 1 and np.any(np.diff(self.timestamps) < 0):
+            order = np.argsort(self.timestamps, kind="stable")
+            self.ids = self.ids[order]
+            self.timestamps = self.timestamps[order]
+            self.amounts = self.amounts[order]
+            self.statuses = self.statuses[order]
+            self.methods = self.methods[order]
+            self.texts = {name: values[order] for name, values in self.texts.items()}
+
+        self._rebuild_bitmaps()
+
+    # ----- Lọc -----
+
+    def set_filter(self, **criteria) -> np.ndarray:
+        """Cập nhật một hoặc nhiều tiêu chí, trả về id giao dịch khớp (mới nhất trước)
+
+        Tiêu chí: start_date, end_date (yyyy-mm-dd), status, payment_method; None = bỏ lọc.
+        """
+        with self._lock:
+            changed = {key: value or None for key, value in criteria.items()
+                       if key in self.criteria and self.criteria[key] != (value or None)}
+            if changed or self._result is None:
+                self.criteria.update(changed)
+                self._apply_criteria(date_changed=bool({"start_date", "end_date"} & changed.keys()))
+            return self.ids[self._result][::-1]
+
+    def sorted_ids(self, column: str = "payment_date", descending: bool = True) -> np.ndarray:
+        """id của kết quả lọc hiện tại sắp theo column (cùng thứ tự ORDER BY column, id của PaymentStore)"""
+        with self._lock:
+            if self._result is None:
+                self._apply_criteria()
+            positions = self._result
+            if column != "payment_date":
+                positions = positions[np.argsort(self._rank(column)[positions], kind="stable")]
+            ids = self.ids[positions]
+            return ids[::-1] if descending else ids
+
+    def _rank(self, column: str) -> np.ndarray:
+        """Hạng của từng dòng theo (column, id); tính lại sau mỗi lần build/merge"""
+        rank = self._ranks.get(column)
+        if rank is None:
+            if column == "amount":
+                keys = self.amounts
+            else:
+                values = {"status": self.statuses, "payment_method": self.methods}.get(column)
+                if values is None:
+                    values = self.texts.get(column)
+                if values is None:
+                    raise ValueError(f"Không thể sắp xếp theo cột: {column}")
+                # Chuỗi numpy so sánh theo code point, giống collation BINARY (UTF-8) của SQLite
+                keys = values.astype(str)
+            order = np.lexsort((self.ids, keys))
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._ranks[column] = rank
+        return rank
+
+    def _apply_criteria(self, date_changed: bool = True):
+        """Tính lại kết quả: đoạn ngày bằng bisect rồi giao với bitmap trên đoạn đó"""
+        if date_changed or self._result is None:
+            self._date_range = self._date_bounds(self.criteria["start_date"], self.criteria["end_date"])
+        low, high = self._date_range
+
+        mask = None
+        for bitmaps, key in ((self._status_bitmaps, "status"), (self._method_bitmaps, "payment_method")):
+            value = self.criteria[key]
+            if value is None:
+                continue
+            bitmap = bitmaps.get(value)
+            if bitmap is None:
+                self._result = np.empty(0, dtype=np.int64)
+                return
+            mask = bitmap[low:high] if mask is None else mask & bitmap[low:high]
+
+        if mask is None:
+            self._result = np.arange(low, high)
+        else:
+            self._result = np.flatnonzero(mask) + low
+
+    def _date_bounds(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """Vị trí [low, high) của khoảng ngày trong mảng timestamp (bisect)"""
+        low, high = 0, len(self.timestamps)
+        if start_date:
+            start = self.to_timestamps([datetime.strptime(start_date, "%Y-%m-%d").strftime("%Y-%m-%d %H:%M:%S")])[0]
+            low = int(np.searchsorted(self.timestamps, start, side="left"))
+        if end_date:
+            end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            end = self.to_timestamps([end.strftime("%Y-%m-%d %H:%M:%S")])[0]
+            high = int(np.searchsorted(self.timestamps, end, side="left"))
+        return low, max(low, high)
+
+    def summary(self) -> Dict[str, Any]:
+        """Thống kê trên kết quả lọc hiện tại"""
+        with self._lock:
+            if self._result is None:
+                self._apply_criteria()
+            positions = self._result
+
+            total = len(positions)
+            success = int(self._status_bitmaps["success"][positions].sum()) if "success" in self._status_bitmaps else 0
+            failed, expired = (
+                int(self._status_bitmaps[status][positions].sum()) if status in self._status_bitmaps else 0
+                for status in ("failed", "expired")
+            )
+
+            today = self.to_timestamps([datetime.now().strftime("%Y-%m-%d 00:00:00")])[0]
+            # positions tăng dần theo thời gian nên đếm hôm nay cũng bằng bisect
+            today_count = total - int(np.searchsorted(self.timestamps[positions], today, side="left"))
+
+            return {
+                "total": total,
+                "amount": float(self.amounts[positions].sum()),
+                "success": success,
+                "failed": failed,
+                "expired": expired,
+                "success_rate": success / total * 100 if total else 0.0,
+                "today": today_count
+            }
@@ -0,0 +1,371 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+from ..api.order_id import get_order_id_generator
+
+STATUS_LABELS = {
+    "success": "Thành công",
+    "failed": "Thất bại",
+    "pending": "Đang xử lý",
+    # Quá thời gian theo dõi mà chưa có xác nhận; khách vẫn có thể đã thanh toán trên ví
+    "expired": "Chưa xác nhận"
+}
+
+METHOD_LABELS = {
+    "momo": "MoMo",
+    "bidv": "BIDV",
+    "zalopay": "ZaloPay",
+    "visa": "Visa"
+}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class PaymentStore:
+    """Lưu lịch sử giao dịch trong SQLite (~/.payoo/payments.db)
+
+    Dùng WAL để đọc không bị chặn khi đang ghi, insert theo lô bằng executemany và
+    truy vấn theo trang nên chi phí mở tab lịch sử không tăng theo số giao dịch.
+    """
+
+    COLUMNS = [
+        'transaction_id', 'order_id', 'customer_id', 'customer_name', 'bill_type',
+        'bill_number', 'provider', 'amount', 'payment_method', 'status',
+        'payment_date', 'description'
+    ]
+
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".payoo", "payments.db")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_db()
+
+    def _init_db(self):
+        """Tạo bảng, index và bật WAL"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute("PRAGMA cache_size=-65536")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS payments (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        transaction_id TEXT NOT NULL UNIQUE,
+                        order_id TEXT DEFAULT '',
+                        customer_id TEXT DEFAULT '',
+                        customer_name TEXT DEFAULT '',
+                        bill_type TEXT DEFAULT '',
+                        bill_number TEXT DEFAULT '',
+                        provider TEXT DEFAULT '',
+                        amount REAL NOT NULL DEFAULT 0,
+                        payment_method TEXT DEFAULT '',
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        payment_date TEXT NOT NULL,
+                        description TEXT DEFAULT '',
+                        updated_at TEXT
+                    )
+                """)
+                # Index ghép (cột lọc, ngày) phục vụ cả lọc lẫn sắp xếp theo ngày
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_date ON payments(payment_date)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status, payment_date)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_method ON payments(payment_method, payment_date)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_customer ON payments(customer_id)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_bill ON payments(bill_number)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_updated ON payments(updated_at)")
+                self._init_stats()
+    
+    def _init_stats(self):
+        """Bảng thống kê theo (ngày, trạng thái, phương thức), cập nhật bằng trigger
+        
+        summary() cộng vài trăm dòng của bảng này thay vì quét toàn bộ payments.
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'payment_stats'"
+        ).fetchone()
+        
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS payment_stats (
+                day TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payment_method TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                amount REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, payment_method)
+            ) WITHOUT ROWID
+        """)
+        
+        add_new = """
+            INSERT INTO payment_stats (day, status, payment_method, count, amount)
+            VALUES (substr(NEW.payment_date, 1, 10), NEW.status, NEW.payment_method, 1, NEW.amount)
+            ON CONFLICT(day, status, payment_method) DO UPDATE SET
+                count = count + 1, amount = amount + excluded.amount;
+        """
+        remove_old = """
+            UPDATE payment_stats SET count = count - 1, amount = amount - OLD.amount
+            WHERE day = substr(OLD.payment_date, 1, 10) AND status = OLD.status
+                AND payment_method = OLD.payment_method;
+        """
+        self._conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payments_insert AFTER INSERT ON payments
+            BEGIN {add_new} END
+        """)
+        self._conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payments_update
+            AFTER UPDATE OF status, amount, payment_method, payment_date ON payments
+            BEGIN {remove_old} {add_new} END
+        """)
+        self._conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payments_delete AFTER DELETE ON payments
+            BEGIN {remove_old} END
+        """)
+        
+        if not exists:
+            # Database cũ chưa có bảng thống kê: tính lại một lần
+            self._conn.execute("""
+                INSERT INTO payment_stats (day, status, payment_method, count, amount)
+                SELECT substr(payment_date, 1, 10), status, payment_method, COUNT(*), SUM(amount)
+                FROM payments GROUP BY 1, 2, 3
+            """)
+
+    def _to_row(self, payment: Dict[str, Any]) -> Tuple:
+        """Chuẩn hóa giao dịch thành tuple theo COLUMNS"""
+        payment_date = payment.get('payment_date') or payment.get('date') or datetime.now().strftime(DATE_FORMAT)
+        # Giao dịch không có mã (vd. thất bại trước khi provider trả mã): sinh mã duy nhất, không dùng
+        # thời gian vì hai dòng cùng thời điểm sẽ bị ON CONFLICT gộp làm một
+        transaction_id = payment.get('transaction_id') or payment.get('order_id') or \
+            get_order_id_generator().next_id("TX")
+
+        return (
+            str(transaction_id),
+            str(payment.get('order_id') or ''),
+            str(payment.get('customer_id') or ''),
+            str(payment.get('customer_name') or ''),
+            str(payment.get('bill_type') or ''),
+            str(payment.get('bill_number') or ''),
+            str(payment.get('provider') or ''),
+            float(payment.get('amount') or 0),
+            str(payment.get('payment_method') or ''),
+            str(payment.get('status') or 'pending'),
+            str(payment_date),
+            str(payment.get('description') or '')
+        )
+
+    def add_payment(self, payment: Dict[str, Any]) -> Dict[str, Any]:
+        """Lưu một giao dịch (ghi đè trạng thái nếu transaction_id đã có)"""
+        try:
+            transaction_id = self._to_row(payment)[0]
+            self.add_payments([dict(payment, transaction_id=transaction_id)])
+            return {
+                "success": True,
+                "transaction_id": transaction_id,
+                "message": "Đã lưu giao dịch"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Lỗi lưu giao dịch: {str(e)}"
+            }
+
+    def add_payments(self, payments: Iterable[Dict[str, Any]], batch_size: int = 5000) -> int:
+        """Lưu nhiều giao dịch, mỗi lô batch_size dòng trong một transaction"""
+        sql = (
+            f"INSERT INTO payments ({', '.join(self.COLUMNS)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(self.COLUMNS))}, ?) "
+            "ON CONFLICT(transaction_id) DO UPDATE SET "
+            "status = excluded.status, amount = excluded.amount, "
+            "description = excluded.description, updated_at = excluded.updated_at"
+        )
+        total = 0
+        batch = []
+        for payment in payments:
+            batch.append(self._to_row(payment))
+            if len(batch) >= batch_size:
+                total += self._insert_batch(sql, batch)
+                batch = []
+        if batch:
+            total += self._insert_batch(sql, batch)
+        return total
+
+    def _insert_batch(self, sql: str, rows: List[Tuple]) -> int:
+        with self._lock, self._conn:
+            # updated_at lấy khi đã giữ lock: changed_since chạy giữa hai lô có sync_time <= updated_at
+            # của các lô sau nên HistoryIndex không bỏ sót dòng nào
+            now = datetime.now().strftime(DATE_FORMAT)
+            self._conn.executemany(sql, [row + (now,) for row in rows])
+        return len(rows)
+
+    def update_status(self, transaction_id: str, status: str) -> bool:
+        """Cập nhật trạng thái giao dịch"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE payments SET status = ?, updated_at = ? WHERE transaction_id = ?",
+                (status, datetime.now().strftime(DATE_FORMAT), transaction_id)
+            )
+        return cursor.rowcount > 0
+
+    def get_payment(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """Lấy một giao dịch theo mã"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM payments WHERE transaction_id = ?", (transaction_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _where(start_date: str = None, end_date: str = None, status: str = None,
+               payment_method: str = None, customer_id: str = None,
+               bill_number: str = None) -> Tuple[str, List[Any]]:
+        """Tạo mệnh đề WHERE từ bộ lọc (ngày dạng yyyy-mm-dd, đến ngày tính cả ngày đó)"""
+        clauses = []
+        params = []
+
+        if start_date:
+            clauses.append("payment_date >= ?")
+            params.append(datetime.strptime(start_date, "%Y-%m-%d").strftime(DATE_FORMAT))
+        if end_date:
+            clauses.append("payment_date < ?")
+            params.append((datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime(DATE_FORMAT))
+        for column, value in (("status", status), ("payment_method", payment_method),
+                              ("customer_id", customer_id), ("bill_number", bill_number)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: int = 100, offset: int = 0, order_by: str = "payment_date",
+              descending: bool = True, **filters) -> List[Dict[str, Any]]:
+        """Lấy một trang giao dịch (mặc định mới nhất trước)"""
+        if order_by not in self.COLUMNS:
+            raise ValueError(f"Không thể sắp xếp theo cột: {order_by}")
+        
+        where, params = self._where(**filters)
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM payments{where} ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, **filters) -> int:
+        """Đếm số giao dịch theo bộ lọc (qua bảng thống kê)"""
+        return self.summary(**filters)["total"]
+
+    def summary(self, start_date: str = None, end_date: str = None, status: str = None,
+                payment_method: str = None, customer_id: str = None,
+                bill_number: str = None) -> Dict[str, Any]:
+        """Thống kê tổng số, tổng tiền, tỷ lệ thành công và số giao dịch hôm nay"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        if customer_id or bill_number:
+            # Lọc theo khách hàng/hóa đơn trả về ít dòng, tính trực tiếp qua index
+            where, params = self._where(start_date, end_date, status, payment_method, customer_id, bill_number)
+            sql = (
+                "SELECT COUNT(*), COALESCE(SUM(amount), 0), "
+                "COALESCE(SUM(status = 'success'), 0), COALESCE(SUM(status = 'failed'), 0), "
+                "COALESCE(SUM(status = 'expired'), 0), "
+                f"COALESCE(SUM(payment_date >= ?), 0) FROM payments{where}"
+            )
+        else:
+            clauses = []
+            params = []
+            for condition, value in (("day >= ?", start_date), ("day <= ?", end_date),
+                                     ("status = ?", status), ("payment_method = ?", payment_method)):
+                if value:
+                    clauses.append(condition)
+                    params.append(value)
+            where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+            sql = (
+                "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(amount), 0), "
+                "COALESCE(SUM(CASE WHEN status = 'success' THEN count END), 0), "
+                "COALESCE(SUM(CASE WHEN status = 'failed' THEN count END), 0), "
+                "COALESCE(SUM(CASE WHEN status = 'expired' THEN count END), 0), "
+                f"COALESCE(SUM(CASE WHEN day >= ? THEN count END), 0) FROM payment_stats{where}"
+            )
+        
+        with self._lock:
+            row = self._conn.execute(sql, [today] + params).fetchone()
+
+        total, amount, success, failed, expired, today_count = row
+        return {
+            "total": total,
+            "amount": amount,
+            "success": success,
+            "failed": failed,
+            "expired": expired,
+            "success_rate": success / total * 100 if total else 0.0,
+            "today": today_count
+        }
+
+    def changed_since(self, since: str = None) -> Tuple[str, List[Tuple]]:
+        """Lấy (id, payment_date, status, payment_method, amount, transaction_id, customer_name,
+        bill_type) của các dòng mới/thay đổi
+        
+        Trả về (thời điểm đồng bộ, rows); since=None lấy toàn bộ. Dùng cho HistoryIndex.
+        """
+        sync_time = datetime.now().strftime(DATE_FORMAT)
+        sql = ("SELECT id, payment_date, status, payment_method, amount, transaction_id, customer_name, "
+               "bill_type FROM payments")
+        params = []
+        if since:
+            sql += " WHERE updated_at >= ?"
+            params.append(since)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return sync_time, [tuple(row) for row in rows]
+    
+    def get_many(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """Lấy giao dịch theo danh sách id, giữ nguyên thứ tự đầu vào"""
+        if not ids:
+            return []
+        placeholders = ", ".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM payments WHERE id IN ({placeholders})", [int(i) for i in ids]
+            ).fetchall()
+        by_id = {row["id"]: dict(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+    
+    def iter_payments(self, batch_size: int = 10000, newest_first: bool = False,
+                      **filters) -> Iterator[List[Dict[str, Any]]]:
+        """Duyệt toàn bộ giao dịch theo lô (keyset, không dùng OFFSET)
+        
+        newest_first=True: theo (payment_date, id) giảm dần qua index ngày, thứ tự dùng cho
+        xuất Excel/báo cáo; mặc định theo id tăng dần.
+        """
+        where, params = self._where(**filters)
+        if newest_first:
+            seek, order = "(payment_date, id) < (?, ?)", "payment_date DESC, id DESC"
+        else:
+            seek, order = "id > ?", "id"
+        
+        last_key = None
+        while True:
+            if last_key is None:
+                sql, values = f"SELECT * FROM payments{where} ORDER BY {order} LIMIT ?", params
+            else:
+                condition = f"{where} AND {seek}" if where else f" WHERE {seek}"
+                sql, values = f"SELECT * FROM payments{condition} ORDER BY {order} LIMIT ?", params + list(last_key)
+            with self._lock:
+                rows = self._conn.execute(sql, values + [batch_size]).fetchall()
+            if not rows:
+                break
+            last = rows[-1]
+            last_key = (last["payment_date"], last["id"]) if newest_first else (last["id"],)
+            yield [dict(row) for row in rows]
+
+    def close(self):
+        """Đóng kết nối"""
+        with self._lock:
+            self._conn.close()
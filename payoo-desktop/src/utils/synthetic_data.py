@@ -0,0 +1,376 @@
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .payment_store import PaymentStore
+
+# Số dòng sinh mỗi khối; mỗi khối có seed riêng nên N dòng đầu giống nhau với mọi count >= N
+BLOCK_SIZE = 10_000
+
+# Giới hạn dòng của một sheet Excel (trừ dòng tiêu đề)
+XLSX_MAX_ROWS = 1_048_575
+
+BILL_COLUMNS = [
+    'customer_id', 'bill_type', 'amount', 'provider', 'description', 'due_date', 'period',
+    'bill_number', 'customer_name'
+]
+
+BILL_TYPE_WEIGHTS = {
+    "electric": 0.45,
+    "water": 0.25,
+    "internet": 0.2,
+    "tv": 0.1
+}
+
+BILL_TYPE_LABELS = {
+    "electric": "Tiền điện",
+    "water": "Tiền nước",
+    "internet": "Cước internet",
+    "tv": "Cước truyền hình"
+}
+
+# Nhà cung cấp theo loại hóa đơn: (mã, tỷ trọng, tiền tố mã khách hàng/số hóa đơn)
+PROVIDERS = {
+    "electric": [("EVN_HCMC", 0.45, "PE"), ("EVN_HANOI", 0.4, "PD"), ("EVN_DANANG", 0.15, "PP")],
+    "water": [("SAWACO", 0.6, "SW"), ("HAWACO", 0.4, "HW")],
+    "internet": [("VNPT", 0.4, "VN"), ("VIETTEL", 0.35, "VT"), ("FPT", 0.25, "FT")],
+    "tv": [("VTVCab", 0.4, "VC"), ("SCTV", 0.35, "SC"), ("K+", 0.25, "KP")]
+}
+
+# Số tiền theo phân phối log-normal: (trung vị VNĐ, sigma)
+AMOUNT_PROFILES = {
+    "electric": (650_000, 0.6),
+    "water": (180_000, 0.5),
+    "internet": (250_000, 0.25),
+    "tv": (190_000, 0.3)
+}
+
+SURNAMES = [
+    ("Nguyễn", 38), ("Trần", 11), ("Lê", 9.5), ("Phạm", 7), ("Hoàng", 4), ("Huỳnh", 3),
+    ("Phan", 4.5), ("Vũ", 2.5), ("Võ", 2), ("Đặng", 2), ("Bùi", 2), ("Đỗ", 1.5),
+    ("Hồ", 1.5), ("Ngô", 1.5), ("Dương", 1), ("Lý", 0.5)
+]
+MIDDLE_NAMES = ["Văn", "Thị", "Đức", "Minh", "Ngọc", "Thanh", "Hoàng", "Quốc", "Thu", "Hữu", "Gia", "Bảo"]
+GIVEN_NAMES = [
+    "An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hoa", "Hùng", "Hương",
+    "Khánh", "Lan", "Linh", "Long", "Mai", "Minh", "Nam", "Ngọc", "Phong", "Phúc", "Quân", "Quang",
+    "Sơn", "Tâm", "Thảo", "Thắng", "Trang", "Trung", "Tuấn", "Vy", "Yến", "Khoa", "Nhung", "Duy"
+]
+
+METHOD_WEIGHTS = {
+    "momo": 0.4,
+    "zalopay": 0.25,
+    "bidv": 0.2,
+    "visa": 0.15
+}
+
+# Tỷ lệ (thành công, thất bại, đang xử lý) theo phương thức: thẻ bị từ chối nhiều hơn ví
+STATUS_WEIGHTS = {
+    "momo": (0.93, 0.05, 0.02),
+    "zalopay": (0.92, 0.05, 0.03),
+    "bidv": (0.95, 0.04, 0.01),
+    "visa": (0.85, 0.12, 0.03)
+}
+STATUSES = np.array(["success", "failed", "pending"], dtype=object)
+
+# Phân bố giao dịch theo giờ trong ngày (cao điểm sáng và tối)
+HOUR_WEIGHTS = np.array([
+    1, 0.5, 0.3, 0.2, 0.2, 0.5, 1.5, 3, 5, 6.5, 7, 6.5,
+    5.5, 5, 5.5, 6, 6, 6, 6.5, 7.5, 8, 7, 4.5, 2.5
+])
+HOUR_WEIGHTS = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+
+# Hoán vị chỉ số khách hàng -> 9 chữ số (nhân với số nguyên tố cùng nhau với 10^9 là song ánh)
+CUSTOMER_DIGITS = 10**9
+CUSTOMER_MULTIPLIER = 387_420_489
+CUSTOMER_OFFSET = 290_073_504
+
+
+def _weighted_pick(fractions: np.ndarray, weights) -> np.ndarray:
+    """Chọn chỉ số theo tỷ trọng từ các giá trị đều trong [0, 1)"""
+    cumulative = np.cumsum(np.asarray(weights, dtype=float))
+    return np.searchsorted(cumulative / cumulative[-1], fractions, side="right")
+
+
+def _hash_fraction(keys: np.ndarray, salt: int) -> np.ndarray:
+    """Giá trị giả ngẫu nhiên cố định trong [0, 1) cho mỗi key (splitmix64)"""
+    with np.errstate(over="ignore"):
+        x = keys.astype(np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class SyntheticDataGenerator:
+    """Sinh dữ liệu hóa đơn và lịch sử thanh toán giả lập với seed cố định
+
+    Dữ liệu được sinh theo khối BLOCK_SIZE dòng (DataFrame), không giữ toàn bộ trong bộ nhớ nên
+    dùng được cho hàng triệu dòng. Thông tin khách hàng (tên, mã, nhà cung cấp) suy ra từ chỉ số
+    khách hàng nên một khách có nhiều hóa đơn qua các kỳ; vài khách hàng chiếm phần lớn giao dịch.
+    """
+
+    def __init__(self, seed: int = 42, customers: int = 100_000, start_date: str = "2024-01-01", days: int = 365):
+        if not 0 < customers <= CUSTOMER_DIGITS:
+            raise ValueError(f"Số khách hàng phải trong khoảng 1..{CUSTOMER_DIGITS:,}")
+        self.seed = seed
+        self.customers = customers
+        self.start = np.datetime64(datetime.strptime(start_date, "%Y-%m-%d").date(), "D")
+        self.days = days
+
+        self._bill_types = np.array(list(BILL_TYPE_WEIGHTS), dtype=object)
+        self._bill_type_labels = np.array([BILL_TYPE_LABELS[t] for t in self._bill_types], dtype=object)
+        self._methods = np.array(list(METHOD_WEIGHTS), dtype=object)
+        self._surnames = np.array([name for name, _ in SURNAMES], dtype=object)
+        self._middle_names = np.array(MIDDLE_NAMES, dtype=object)
+        self._given_names = np.array(GIVEN_NAMES, dtype=object)
+
+    def _rng(self, stream: int, block: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream, block])
+
+    def _blocks(self, count: int, build) -> Iterator[pd.DataFrame]:
+        """Sinh đủ count dòng; khối cuối được sinh đầy đủ rồi cắt để N dòng đầu luôn giống nhau"""
+        for block, start in enumerate(range(0, count, BLOCK_SIZE)):
+            frame = build(block, start)
+            yield frame if count - start >= BLOCK_SIZE else frame.iloc[:count - start]
+
+    def _customer_names(self, customer: np.ndarray) -> np.ndarray:
+        surnames = self._surnames[_weighted_pick(_hash_fraction(customer, 1), [w for _, w in SURNAMES])]
+        middle = self._middle_names[(_hash_fraction(customer, 2) * len(MIDDLE_NAMES)).astype(int)]
+        given = self._given_names[(_hash_fraction(customer, 3) * len(GIVEN_NAMES)).astype(int)]
+        return surnames + " " + middle + " " + given
+
+    def _bill_block(self, block: int) -> Dict[str, np.ndarray]:
+        """Các cột hóa đơn của một khối (mảng numpy, chưa chèn lỗi)"""
+        rng = self._rng(1, block)
+        size = BLOCK_SIZE
+
+        # Phân phối lệch: khách hàng chỉ số nhỏ xuất hiện nhiều hơn
+        customer = (self.customers * rng.random(size) ** 2).astype(np.int64)
+        type_index = _weighted_pick(rng.random(size), list(BILL_TYPE_WEIGHTS.values()))
+        bill_type = self._bill_types[type_index]
+
+        # Mỗi khách hàng dùng cố định một nhà cung cấp cho từng loại hóa đơn
+        provider = np.empty(size, dtype=object)
+        prefix = np.empty(size, dtype=object)
+        amount = np.empty(size, dtype=np.int64)
+        for index, name in enumerate(BILL_TYPE_WEIGHTS):
+            rows = type_index == index
+            choices = PROVIDERS[name]
+            picked = _weighted_pick(_hash_fraction(customer[rows], 10 + index), [w for _, w, _ in choices])
+            provider[rows] = np.array([code for code, _, _ in choices], dtype=object)[picked]
+            prefix[rows] = np.array([p for _, _, p in choices], dtype=object)[picked]
+
+            median, sigma = AMOUNT_PROFILES[name]
+            values = rng.lognormal(np.log(median), sigma, int(rows.sum()))
+            amount[rows] = np.maximum(np.round(values / 1000), 10) * 1000
+
+        # Kỳ hóa đơn là tháng trong khoảng ngày, hạn thanh toán ngày 15 tháng sau
+        day = self.start + rng.integers(0, self.days, size).astype("timedelta64[D]")
+        month = day.astype("datetime64[M]")
+        period = np.datetime_as_string(month, unit="M").astype(object)
+        due_date = np.datetime_as_string(
+            (month + np.timedelta64(1, "M")).astype("datetime64[D]") + np.timedelta64(14, "D"), unit="D"
+        ).astype(object)
+
+        digits = (customer * CUSTOMER_MULTIPLIER + CUSTOMER_OFFSET) % CUSTOMER_DIGITS
+        digits = np.char.zfill(digits.astype(str), 9).astype(object)
+        month_of_year = np.char.zfill((month.astype(np.int64) % 12 + 1).astype(str), 2).astype(object)
+
+        return {
+            "customer": customer,
+            "month": month,
+            "customer_id": prefix + digits,
+            "bill_type": bill_type,
+            "amount": amount,
+            "provider": provider,
+            "description": self._bill_type_labels[type_index] + " tháng " + period,
+            "due_date": due_date,
+            "period": period,
+            "bill_number": prefix + digits + month_of_year,
+            "customer_name": self._customer_names(customer)
+        }
+
+    def bill_frames(self, count: int, error_rate: float = 0.0) -> Iterator[pd.DataFrame]:
+        """Hóa đơn theo mẫu file upload (BILL_COLUMNS); error_rate > 0 chèn dòng lỗi để thử validate"""
+        def build(block, start):
+            columns = self._bill_block(block)
+            frame = pd.DataFrame({name: columns[name] for name in BILL_COLUMNS})
+            if error_rate > 0:
+                self._inject_errors(frame, self._rng(2, block), error_rate)
+            frame.index = pd.RangeIndex(start, start + BLOCK_SIZE)
+            return frame
+        return self._blocks(count, build)
+
+    @staticmethod
+    def _inject_errors(frame: pd.DataFrame, rng: np.random.Generator, error_rate: float):
+        """Chèn các lỗi validate_bill_data phát hiện: thiếu mã, thiếu loại, số tiền sai/âm/bằng 0"""
+        rows = rng.choice(len(frame), int(len(frame) * error_rate), replace=False)
+        frame['amount'] = frame['amount'].astype(object)
+        kinds = [
+            ('customer_id', None), ('bill_type', "   "), ('amount', "abc"), ('amount', -1000), ('amount', "0")
+        ]
+        for i, position in enumerate(rows):
+            column, value = kinds[i % len(kinds)]
+            frame.iat[position, frame.columns.get_loc(column)] = value
+
+    def payment_frames(self, count: int) -> Iterator[pd.DataFrame]:
+        """Lịch sử thanh toán theo cột của PaymentStore, mỗi giao dịch thanh toán một hóa đơn"""
+        def build(block, start):
+            bills = self._bill_block(block)
+            rng = self._rng(3, block)
+            size = BLOCK_SIZE
+
+            method_index = _weighted_pick(rng.random(size), list(METHOD_WEIGHTS.values()))
+            status = np.empty(size, dtype=object)
+            fractions = rng.random(size)
+            for index, method in enumerate(METHOD_WEIGHTS):
+                rows = method_index == index
+                status[rows] = STATUSES[_weighted_pick(fractions[rows], STATUS_WEIGHTS[method])]
+
+            # Thanh toán sau kỳ hóa đơn 0-20 ngày, giờ theo HOUR_WEIGHTS
+            paid_day = np.maximum(bills["month"].astype("datetime64[D]"), self.start)
+            paid_day = paid_day + rng.integers(0, 21, size).astype("timedelta64[D]")
+            seconds = rng.choice(24, size, p=HOUR_WEIGHTS) * 3600 + rng.integers(0, 3600, size)
+            paid_at = paid_day.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+            payment_date = np.char.replace(np.datetime_as_string(paid_at, unit="s"), "T", " ").astype(object)
+
+            index = np.arange(start, start + size)
+            frame = pd.DataFrame({
+                "transaction_id": np.char.add("TXN", np.char.zfill(index.astype(str), 10)).astype(object),
+                "order_id": np.char.add("PAYOO", np.char.zfill(index.astype(str), 12)).astype(object),
+                "customer_id": bills["customer_id"],
+                "customer_name": bills["customer_name"],
+                "bill_type": bills["bill_type"],
+                "bill_number": bills["bill_number"],
+                "provider": bills["provider"],
+                "amount": bills["amount"],
+                "payment_method": self._methods[method_index],
+                "status": status,
+                "payment_date": payment_date,
+                "description": "Thanh toán " + bills["description"]
+            }, index=pd.RangeIndex(start, start + size))
+            return frame
+        return self._blocks(count, build)
+
+    def iter_bills(self, count: int, error_rate: float = 0.0) -> Iterator[List[Dict[str, Any]]]:
+        """Như bill_frames nhưng mỗi lô là list dict"""
+        for frame in self.bill_frames(count, error_rate):
+            yield frame.to_dict("records")
+
+    def iter_payments(self, count: int) -> Iterator[List[Dict[str, Any]]]:
+        """Như payment_frames nhưng mỗi lô là list dict (dùng cho PaymentStore.add_payments)"""
+        for frame in self.payment_frames(count):
+            yield frame.to_dict("records")
+
+
+def _tmp_path(path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return f"{path}.tmp"
+
+
+def write_csv(frames: Iterable[pd.DataFrame], path: str) -> Dict[str, Any]:
+    """Ghi các khối ra CSV UTF-8 (đọc lại được bằng ExcelProcessor)"""
+    try:
+        rows = 0
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            for frame in frames:
+                frame.to_csv(f, header=rows == 0, index=False, quoting=csv.QUOTE_MINIMAL)
+                rows += len(frame)
+        os.replace(tmp_path, path)
+        return {"success": True, "file_path": path, "rows": rows, "message": f"Đã ghi {rows:,} dòng"}
+    except Exception as e:
+        return {"success": False, "message": f"Lỗi ghi CSV: {str(e)}"}
+
+
+def write_xlsx(frames: Iterable[pd.DataFrame], path: str, sheet_name: str = "Bills") -> Dict[str, Any]:
+    """Ghi các khối ra .xlsx bằng openpyxl write_only (không giữ workbook trong bộ nhớ)"""
+    try:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        rows = 0
+        for frame in frames:
+            if rows == 0:
+                sheet.append(list(frame.columns))
+            if rows + len(frame) > XLSX_MAX_ROWS:
+                return {"success": False, "message": f"File Excel tối đa {XLSX_MAX_ROWS:,} dòng, dùng CSV"}
+            for row in frame.itertuples(index=False, name=None):
+                sheet.append(row)
+            rows += len(frame)
+
+        tmp_path = _tmp_path(path)
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+        return {"success": True, "file_path": path, "rows": rows, "message": f"Đã ghi {rows:,} dòng"}
+    except Exception as e:
+        return {"success": False, "message": f"Lỗi ghi Excel: {str(e)}"}
+
+
+def write_json(frames: Iterable[pd.DataFrame], path: str) -> Dict[str, Any]:
+    """Ghi lịch sử theo định dạng file backup của tab lịch sử (mảng JSON, mỗi dòng một giao dịch)"""
+    try:
+        rows = 0
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for frame in frames:
+                for payment in frame.to_dict("records"):
+                    f.write("\n  " if rows == 0 else ",\n  ")
+                    json.dump(payment, f, ensure_ascii=False, default=int)
+                    rows += 1
+            f.write("\n]")
+        os.replace(tmp_path, path)
+        return {"success": True, "file_path": path, "rows": rows, "message": f"Đã ghi {rows:,} dòng"}
+    except Exception as e:
+        return {"success": False, "message": f"Lỗi ghi JSON: {str(e)}"}
+
+
+def write_payment_store(frames: Iterable[pd.DataFrame], store) -> Dict[str, Any]:
+    """Nạp lịch sử vào PaymentStore (store hoặc đường dẫn file .db)"""
+    owned = not isinstance(store, PaymentStore)
+    try:
+        if owned:
+            store = PaymentStore(store)
+        rows = sum(store.add_payments(frame.to_dict("records")) for frame in frames)
+        return {"success": True, "file_path": store.db_path, "rows": rows, "message": f"Đã ghi {rows:,} giao dịch"}
+    except Exception as e:
+        return {"success": False, "message": f"Lỗi ghi PaymentStore: {str(e)}"}
+    finally:
+        if owned and isinstance(store, PaymentStore):
+            store.close()
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".xlsx": write_xlsx,
+    ".json": write_json,
+    ".db": write_payment_store
+}
+
+
+def generate_dataset(kind: str, count: int, path: str, seed: int = 42, error_rate: float = 0.0,
+                     **options) -> Dict[str, Any]:
+    """Sinh count hóa đơn (kind="bills") hoặc giao dịch (kind="payments") và ghi theo đuôi file
+
+    .csv/.xlsx/.json ghi file, .db nạp vào PaymentStore. options truyền cho SyntheticDataGenerator.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    writer = WRITERS.get(ext)
+    if writer is None:
+        return {"success": False, "message": f"Định dạng file không hỗ trợ: {ext}"}
+    if kind not in ("bills", "payments"):
+        return {"success": False, "message": f"Loại dữ liệu không hỗ trợ: {kind}"}
+    if kind == "bills" and ext == ".db":
+        return {"success": False, "message": "PaymentStore chỉ lưu giao dịch, dùng kind=\"payments\""}
+
+    generator = SyntheticDataGenerator(seed=seed, **options)
+    frames = generator.bill_frames(count, error_rate) if kind == "bills" else generator.payment_frames(count)
+    return writer(frames, path)